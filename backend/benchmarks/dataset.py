@@ -0,0 +1,305 @@
+"""Fill the configured database with a large, deterministic synthetic dataset.
+
+Run from the backend directory::
+
+    python -m benchmarks.dataset --customers 100000 --vendors 10000 --bookings 1000000
+
+Users, vendor profiles, bookings across every status, the vendor_slots
+reservations their vendors hold and reviews of completed bookings are
+written with unordered ``insert_many`` batches, ``--workers`` at a time.
+Every batch draws from its own RNG seeded from ``--seed``, batches are
+generated in order, and ids are derived from the seed, so a run produces
+the same rows regardless of scheduling (timestamps are relative to the
+current time) and re-running it skips rows that already exist.
+Service names come from the seeded catalog. Afterwards the derived data
+(vendor ratings, earnings rollup, dashboard counters) is rebuilt.
+
+Every generated user shares one password (``--password``), hashed once.
+"""
+import argparse
+import asyncio
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from pymongo.errors import BulkWriteError
+
+import server
+
+FIRST_NAMES = [
+    "Aarav", "Vivaan", "Aditya", "Arjun", "Sai", "Reyansh", "Krishna", "Ishaan", "Rohan", "Kabir",
+    "Ananya", "Diya", "Aadhya", "Saanvi", "Pari", "Anika", "Navya", "Meera", "Isha", "Kavya",
+]
+LAST_NAMES = [
+    "Sharma", "Verma", "Iyer", "Reddy", "Nair", "Patel", "Gupta", "Singh", "Khan", "Das",
+    "Mehta", "Rao", "Joshi", "Kulkarni", "Banerjee", "Menon", "Chopra", "Pillai", "Bose", "Shetty",
+]
+STREETS = ["MG Road", "Park Street", "Linking Road", "Brigade Road", "Anna Salai", "FC Road", "Banjara Hills"]
+# Booking status -> weight; most of a mature marketplace's history is completed work
+STATUS_WEIGHTS = {
+    "pending": 8, "assigned": 4, "confirmed": 8, "in_progress": 4, "completed": 64, "cancelled": 12,
+}
+APPROVAL_WEIGHTS = {"approved": 80, "pending": 15, "rejected": 5}
+# Vendor/slot picks tried before a booking is left unassigned because every one was taken
+SLOT_ATTEMPTS = 5
+PAYMENT_METHODS = ["upi", "card", "cash", "netbanking"]
+HISTORY_DAYS = 365
+
+ID_NAMESPACE = uuid.UUID("6f1c2a57-3b0e-4d51-9a7e-2f5c8d9b0e41")
+
+
+def entity_id(seed: int, kind: str, index: int) -> str:
+    """Stable id for the ``index``-th generated ``kind``, so batches can refer to rows they didn't create."""
+    return str(uuid.uuid5(ID_NAMESPACE, f"{seed}:{kind}:{index}"))
+
+
+def batch_rng(seed: int, kind: str, batch: int) -> random.Random:
+    return random.Random(f"{seed}:{kind}:{batch}")
+
+
+def weighted(rng: random.Random, weights: dict) -> str:
+    return rng.choices(list(weights), list(weights.values()))[0]
+
+
+class Generator:
+    def __init__(self, args, services: list, pincode_prefixes: list, password_hash: str):
+        self.args = args
+        self.seed = args.seed
+        self.services = services  # [(category slug, service name)]
+        self.pincode_prefixes = pincode_prefixes
+        self.password_hash = password_hash
+        self.now = datetime.now(timezone.utc)
+        self.vendors_by_service = {}  # service name -> [vendor user id], approved vendors only
+        self.reserved = set()         # (vendor user id, booking_date, time_slot) already held
+
+    def timestamp(self, rng: random.Random) -> datetime:
+        return self.now - timedelta(seconds=rng.randrange(HISTORY_DAYS * 86400))
+
+    def pincode(self, rng: random.Random) -> str:
+        return f"{rng.choice(self.pincode_prefixes)}{rng.randint(1, 99):03d}"
+
+    def user(self, rng: random.Random, kind: str, index: int) -> dict:
+        return {
+            "id": entity_id(self.seed, kind, index),
+            "email": f"{kind}{index}.{self.seed}@example.com",
+            "full_name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            "phone": f"9{rng.randrange(10 ** 9):09d}",
+            "role": "vendor" if kind == "vendor" else "customer",
+            "password_hash": self.password_hash,
+            "created_at": self.timestamp(rng).isoformat(),
+        }
+
+    def vendor_profile(self, rng: random.Random, index: int) -> dict:
+        # Most vendors stick to one category
+        slug = rng.choice(self.services)[0]
+        in_category = [name for category, name in self.services if category == slug]
+        services = rng.sample(in_category, min(len(in_category), rng.randint(1, 3)))
+        home = self.pincode(rng)
+        return {
+            "id": entity_id(self.seed, "vendor-profile", index),
+            "user_id": entity_id(self.seed, "vendor", index),
+            "services": services,
+            "experience_years": rng.randint(0, 25),
+            "bio": f"{rng.choice(FIRST_NAMES)} has {rng.randint(1, 20)} years of hands-on {services[0].lower()} work.",
+            "availability": {
+                "days": sorted(rng.sample(server.WEEKDAYS, rng.randint(4, 7)), key=server.WEEKDAYS.index),
+                "slots": sorted(rng.sample(server.TIME_SLOTS, rng.randint(2, 5)), key=server.TIME_SLOTS.index),
+            },
+            "pincodes": [home] + [self.pincode(rng) for _ in range(rng.randint(0, 3))],
+            "home_pincode": home,
+            "hourly_rate": float(rng.randrange(200, 1200, 50)),
+            "fixed_rate": None,
+            "approval_status": weighted(rng, APPROVAL_WEIGHTS),
+            # Rebuilt from the generated reviews once everything is written
+            "rating": 0.0,
+            "rating_sum": 0.0,
+            "total_reviews": 0,
+            "created_at": self.timestamp(rng).isoformat(),
+        }
+
+    def booking_and_review(self, rng: random.Random, index: int) -> tuple:
+        category, service = rng.choice(self.services)
+        created_at = self.timestamp(rng)
+        status = weighted(rng, STATUS_WEIGHTS)
+        vendors = self.vendors_by_service.get(service)
+        if not vendors and status != "cancelled":
+            status = "pending"  # nobody offers this service, so nothing past pending is plausible
+        booking = {
+            "id": entity_id(self.seed, "booking", index),
+            "customer_id": entity_id(self.seed, "customer", rng.randrange(self.args.customers)),
+            "service_name": service,
+            "service_category": category,
+            "booking_date": (created_at + timedelta(days=rng.randint(0, 14))).date().isoformat(),
+            "time_slot": rng.choice(server.TIME_SLOTS),
+            "location": f"{rng.randint(1, 999)}, {rng.choice(STREETS)}",
+            "pincode": self.pincode(rng),
+            "description": f"{service} needed for a {rng.choice(['small', 'routine', 'urgent', 'large'])} job.",
+            "pricing_type": rng.choice(["fixed", "hourly", "inspection"]),
+            "estimated_price": float(rng.randrange(300, 8000, 50)),
+            "status": status,
+            "payment_status": "unpaid",
+            "version": 0,
+            "created_at": created_at.isoformat(),
+        }
+        reservation = None
+        if vendors and (status not in ("pending", "cancelled") or rng.random() < 0.5):
+            reservation = self.reserve(rng, booking, vendors)
+            if reservation is None:
+                status = booking["status"] = "pending"  # every vendor tried was already booked then
+            else:
+                booking["vendor_id"] = reservation["vendor_id"]
+                booking["version"] = rng.randint(1, 4)
+                if status == "cancelled":
+                    reservation = None  # cancelling releases the slot
+        review = None
+        if status == "completed":
+            booking["final_price"] = round(booking["estimated_price"] * rng.uniform(0.8, 1.3), 2)
+            if rng.random() < 0.9:
+                booking["payment_status"] = "paid"
+                booking["payment_method"] = rng.choice(PAYMENT_METHODS)
+            if rng.random() < self.args.review_rate:
+                review = {
+                    "id": entity_id(self.seed, "review", index),
+                    "booking_id": booking["id"],
+                    "customer_id": booking["customer_id"],
+                    "vendor_id": booking["vendor_id"],
+                    "rating": rng.choices([1, 2, 3, 4, 5], [2, 3, 10, 35, 50])[0],
+                    "comment": rng.choice(["Great work", "On time and tidy", "Good value", "Okay", "Would hire again"]),
+                    "created_at": (created_at + timedelta(days=rng.randint(1, 20))).isoformat(),
+                }
+        return booking, reservation, review
+
+    def reserve(self, rng: random.Random, booking: dict, vendors: list) -> dict:
+        """Pick a vendor free at the booking's date and slot, moving the slot if needed; None if all tries clash."""
+        for attempt in range(SLOT_ATTEMPTS):
+            vendor_id = rng.choice(vendors)
+            if attempt:
+                booking["time_slot"] = rng.choice(server.TIME_SLOTS)
+            key = (vendor_id, booking["booking_date"], booking["time_slot"])
+            if key not in self.reserved:
+                self.reserved.add(key)
+                return {
+                    "vendor_id": vendor_id,
+                    "booking_date": booking["booking_date"],
+                    "time_slot": booking["time_slot"],
+                    "booking_id": booking["id"],
+                    "created_at": booking["created_at"],
+                }
+        return None
+
+
+async def insert_all(collection, docs: list) -> int:
+    """Unordered insert that counts rows already present (duplicate keys) as skipped."""
+    if not docs:
+        return 0
+    try:
+        result = await collection.insert_many(docs, ordered=False)
+        return len(result.inserted_ids)
+    except BulkWriteError as e:
+        if any(error["code"] != 11000 for error in e.details.get("writeErrors", [])):
+            raise
+        return e.details["nInserted"]
+
+
+async def run_batches(label: str, total: int, args, write_batch) -> int:
+    """Call ``write_batch(batch, start, stop)`` over ``total`` rows, ``args.workers`` batches at a time.
+
+    Workers claim batches in order, so whatever ``write_batch`` does before
+    its first await runs in batch order on every run.
+    """
+    batches = -(-total // args.batch_size)
+    next_batch = 0
+    inserted = 0
+    started = time.perf_counter()
+
+    async def worker():
+        nonlocal next_batch, inserted
+        while next_batch < batches:
+            batch = next_batch
+            next_batch += 1
+            start = batch * args.batch_size
+            inserted += await write_batch(batch, start, min(total, start + args.batch_size))
+
+    await asyncio.gather(*(worker() for _ in range(args.workers)))
+    elapsed = time.perf_counter() - started
+    print(f"{label:16} {inserted:>10} inserted of {total:>10} in {elapsed:7.1f}s ({inserted / max(elapsed, 1e-9):,.0f}/s)")
+    return inserted
+
+
+async def generate(args) -> int:
+    await server.ensure_indexes()
+    await server.startup_seed_data()
+    categories = await server.db.service_categories.find({}, {"_id": 0, "slug": 1, "services": 1}).to_list(None)
+    services = [(category["slug"], name) for category in categories for name in category["services"]]
+    prefixes = sorted(key for key in server.load_pincode_table(server.PINCODE_TABLE) if len(key) == 3) or ["560"]
+    generator = Generator(args, services, prefixes, server.hash_password(args.password))
+    db = server.db
+
+    async def customers(batch, start, stop):
+        rng = batch_rng(args.seed, "customer", batch)
+        return await insert_all(db.users, [generator.user(rng, "customer", index) for index in range(start, stop)])
+
+    async def vendors(batch, start, stop):
+        rng = batch_rng(args.seed, "vendor", batch)
+        users, profiles = [], []
+        for index in range(start, stop):
+            users.append(generator.user(rng, "vendor", index))
+            profiles.append(generator.vendor_profile(rng, index))
+        for profile in profiles:
+            if profile["approval_status"] == "approved":
+                for service in profile["services"]:
+                    generator.vendors_by_service.setdefault(service, []).append(profile["user_id"])
+        inserted = await insert_all(db.users, users)
+        await insert_all(db.service_providers, profiles)
+        return inserted
+
+    async def bookings(batch, start, stop):
+        # Generated before the first await, so slots are claimed in batch order
+        rng = batch_rng(args.seed, "booking", batch)
+        rows = [generator.booking_and_review(rng, index) for index in range(start, stop)]
+        inserted = await insert_all(db.bookings, [booking for booking, _, _ in rows])
+        await insert_all(db.vendor_slots, [reservation for _, reservation, _ in rows if reservation])
+        await insert_all(db.reviews, [review for _, _, review in rows if review])
+        return inserted
+
+    await run_batches("customers", args.customers, args, customers)
+    await run_batches("vendors", args.vendors, args, vendors)
+    # Batches finish out of order; sort so booking batches see the same vendor lists on every run
+    for vendor_ids in generator.vendors_by_service.values():
+        vendor_ids.sort()
+    await run_batches("bookings", args.bookings, args, bookings)
+
+    if args.skip_reconcile:
+        return 0
+    started = time.perf_counter()
+    await server.reconcile_vendor_ratings()
+    await server.rebuild_earnings_rollup()
+    await server.reconcile_stats()
+    print(f"{'derived data':16} rebuilt in {time.perf_counter() - started:7.1f}s")
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--customers", type=int, default=10000)
+    parser.add_argument("--vendors", type=int, default=1000)
+    parser.add_argument("--bookings", type=int, default=100000)
+    parser.add_argument("--review-rate", type=float, default=0.6, help="share of completed bookings that get a review")
+    parser.add_argument("--batch-size", type=int, default=1000, help="documents per insert_many")
+    parser.add_argument("--workers", type=int, default=4, help="insert_many batches in flight at once")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--password", default="password123", help="password shared by every generated user")
+    parser.add_argument("--skip-reconcile", action="store_true", help="don't rebuild ratings, rollups and counters")
+    args = parser.parse_args(argv)
+    if args.customers < 1:
+        parser.error("--customers must be at least 1")
+
+    try:
+        return asyncio.run(generate(args))
+    finally:
+        server.client.close()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,272 @@
+"""Drive a mixed API workload against ``server.app`` in-process and report per-route latency.
+
+Run from the backend directory::
+
+    python -m benchmarks.load --concurrency 50 --duration 30 --output load.json
+    python -m benchmarks.load --db memory --duration 10
+
+Requests go through httpx's ASGI transport, so no HTTP server is started.
+``--db mongo`` (the default) uses MONGO_URL with a throwaway database that
+is dropped afterwards; ``--db memory`` swaps in mongomock-motor, which is
+handy in CI but far slower and differently shaped than a real server, so
+only compare memory runs with other memory runs.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+import httpx
+
+# Operation name -> relative weight in the mix
+WORKLOAD = {
+    "login": 1,
+    "browse_categories": 4,
+    "search_services": 1,
+    "list_vendors": 2,
+    "create_booking": 2,
+    "list_bookings": 2,
+    "admin_stats": 1,
+}
+PASSWORD = "bench-password"
+SERVICES = ["Plumber", "Electrician", "Deep Cleaning", "Cook", "IT Support"]
+SEARCH_TERMS = ["plumb", "electrcian", "clean", "paint", "cctv", "cook", "movers"]
+
+
+def percentile(sorted_values: list, fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+class Recorder:
+    """Latencies and status codes per route template."""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)  # route -> [ms]
+        self.statuses = defaultdict(lambda: defaultdict(int))  # route -> status -> count
+        self.recording = False
+
+    async def call(self, client: httpx.AsyncClient, route: str, method: str, url: str, **kwargs) -> httpx.Response:
+        started = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        if self.recording:
+            self.latencies[route].append((time.perf_counter() - started) * 1000)
+            self.statuses[route][response.status_code] += 1
+        return response
+
+    def summary(self, elapsed: float) -> dict:
+        routes = {}
+        for route, values in sorted(self.latencies.items()):
+            values.sort()
+            errors = sum(count for code, count in self.statuses[route].items() if code >= 400)
+            routes[route] = {
+                "count": len(values),
+                "errors": errors,
+                "rps": round(len(values) / elapsed, 2),
+                "mean_ms": round(sum(values) / len(values), 3),
+                "p50_ms": round(percentile(values, 0.50), 3),
+                "p95_ms": round(percentile(values, 0.95), 3),
+                "p99_ms": round(percentile(values, 0.99), 3),
+                "max_ms": round(values[-1], 3),
+                "statuses": {str(code): count for code, count in sorted(self.statuses[route].items())},
+            }
+        total = sum(route["count"] for route in routes.values())
+        return {
+            "requests": total,
+            "errors": sum(route["errors"] for route in routes.values()),
+            "rps": round(total / elapsed, 2),
+            "routes": routes,
+        }
+
+
+class Workload:
+    """Users created up front plus one coroutine per operation in WORKLOAD."""
+
+    def __init__(self, client: httpx.AsyncClient, recorder: Recorder, time_slots: list):
+        self.client = client
+        self.recorder = recorder
+        self.time_slots = time_slots
+        self.admin = None
+        self.customers = []  # (email, auth header)
+
+    async def setup(self, rng: random.Random, customers: int, vendors: int):
+        response = await self.client.post(
+            "/api/auth/login", json={"email": "admin@buildconnect.com", "password": "admin123"}
+        )
+        response.raise_for_status()
+        self.admin = {"Authorization": f"Bearer {response.json()['token']}"}
+
+        for index in range(customers + vendors):
+            email = f"bench-{uuid.uuid4().hex[:12]}@example.com"
+            response = await self.client.post("/api/auth/register", json={
+                "email": email, "full_name": f"Bench User {index}", "phone": "9000000000", "password": PASSWORD,
+            })
+            response.raise_for_status()
+            headers = {"Authorization": f"Bearer {response.json()['token']}"}
+            if index < customers:
+                self.customers.append((email, headers))
+                continue
+            response = await self.client.post("/api/vendors/profile", headers=headers, json={
+                "services": rng.sample(SERVICES, 2),
+                "experience_years": index % 15,
+                "bio": "Benchmark vendor",
+                "pincodes": ["560001"],
+            })
+            response.raise_for_status()
+            await self.client.patch(f"/api/admin/vendors/{response.json()['id']}/approve", headers=self.admin)
+
+    async def login(self, rng: random.Random):
+        email, _ = rng.choice(self.customers)
+        await self.recorder.call(
+            self.client, "POST /api/auth/login", "POST", "/api/auth/login",
+            json={"email": email, "password": PASSWORD},
+        )
+
+    async def browse_categories(self, rng: random.Random):
+        await self.recorder.call(self.client, "GET /api/services/categories", "GET", "/api/services/categories")
+
+    async def search_services(self, rng: random.Random):
+        await self.recorder.call(
+            self.client, "GET /api/services/search", "GET", "/api/services/search",
+            params={"query": rng.choice(SEARCH_TERMS)},
+        )
+
+    async def list_vendors(self, rng: random.Random):
+        await self.recorder.call(
+            self.client, "GET /api/vendors", "GET", "/api/vendors", params={"service": rng.choice(SERVICES)}
+        )
+
+    async def create_booking(self, rng: random.Random):
+        _, headers = rng.choice(self.customers)
+        booking_date = datetime.now(timezone.utc).date() + timedelta(days=rng.randint(1, 30))
+        await self.recorder.call(self.client, "POST /api/bookings", "POST", "/api/bookings", headers=headers, json={
+            "service_name": rng.choice(SERVICES),
+            "service_category": "repair-maintenance",
+            "booking_date": booking_date.isoformat(),
+            "time_slot": rng.choice(self.time_slots),
+            "location": "12, MG Road",
+            "pincode": "560001",
+            "description": "Benchmark booking",
+            "estimated_price": float(rng.randint(200, 3000)),
+        })
+
+    async def list_bookings(self, rng: random.Random):
+        _, headers = rng.choice(self.customers)
+        await self.recorder.call(self.client, "GET /api/bookings", "GET", "/api/bookings", headers=headers)
+
+    async def admin_stats(self, rng: random.Random):
+        await self.recorder.call(self.client, "GET /api/admin/stats", "GET", "/api/admin/stats", headers=self.admin)
+
+    async def worker(self, rng: random.Random, deadline: float):
+        operations = [getattr(self, name) for name in WORKLOAD]
+        weights = list(WORKLOAD.values())
+        while time.perf_counter() < deadline:
+            await rng.choices(operations, weights)[0](rng)
+
+
+def use_memory_database(server):
+    try:
+        from mongomock_motor import AsyncMongoMockClient
+    except ImportError:
+        sys.exit("--db memory needs mongomock-motor: pip install mongomock-motor")
+    server.client = AsyncMongoMockClient()
+    server.db = server.client[os.environ["DB_NAME"]]
+
+
+async def run(args) -> dict:
+    os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+    os.environ["DB_NAME"] = args.db_name
+    os.environ["BCRYPT_ROUNDS"] = str(args.bcrypt_rounds)
+    # Background assignment ticks would land inside the measured window
+    os.environ["AUTO_ASSIGN_ENABLED"] = "false"
+    import server
+
+    if args.db == "memory":
+        use_memory_database(server)
+
+    started_at = datetime.now(timezone.utc).isoformat()
+    await server.app.router.startup()
+    recorder = Recorder()
+    try:
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            workload = Workload(client, recorder, server.TIME_SLOTS)
+            await workload.setup(random.Random(args.seed), args.customers, args.vendors)
+
+            if args.warmup:
+                deadline = time.perf_counter() + args.warmup
+                await asyncio.gather(*(
+                    workload.worker(random.Random(args.seed - worker - 1), deadline)
+                    for worker in range(args.concurrency)
+                ))
+
+            recorder.recording = True
+            started = time.perf_counter()
+            deadline = started + args.duration
+            await asyncio.gather(*(
+                workload.worker(random.Random(args.seed + worker), deadline)
+                for worker in range(args.concurrency)
+            ))
+            elapsed = time.perf_counter() - started
+    finally:
+        if args.db == "mongo" and not args.keep:
+            await server.client.drop_database(args.db_name)
+        await server.app.router.shutdown()
+
+    return {
+        "started_at": started_at,
+        "config": {
+            "db": args.db,
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "warmup_s": args.warmup,
+            "customers": args.customers,
+            "vendors": args.vendors,
+            "bcrypt_rounds": args.bcrypt_rounds,
+            "seed": args.seed,
+            "workload": WORKLOAD,
+        },
+        "elapsed_s": round(elapsed, 3),
+        **recorder.summary(elapsed),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", choices=["mongo", "memory"], default="mongo")
+    parser.add_argument("--db-name", default=f"buildconnect_bench_{uuid.uuid4().hex[:8]}")
+    parser.add_argument("--keep", action="store_true", help="don't drop the benchmark database afterwards")
+    parser.add_argument("--concurrency", type=int, default=20, help="simulated clients issuing requests back to back")
+    parser.add_argument("--duration", type=float, default=10, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=2, help="unmeasured seconds before the run")
+    parser.add_argument("--customers", type=int, default=20)
+    parser.add_argument("--vendors", type=int, default=10)
+    parser.add_argument("--bcrypt-rounds", type=int, default=int(os.environ.get("BCRYPT_ROUNDS", "12")))
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write the results as JSON to this path")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(run(args))
+    print(f"{'route':32} {'count':>7} {'err':>5} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for route, row in results["routes"].items():
+        print(
+            f"{route:32} {row['count']:>7} {row['errors']:>5} {row['rps']:>9.1f} "
+            f"{row['p50_ms']:>9.2f} {row['p95_ms']:>9.2f} {row['p99_ms']:>9.2f}"
+        )
+    print(f"{'total':32} {results['requests']:>7} {results['errors']:>5} {results['rps']:>9.1f}")
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump(results, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""Compare FastAPI's validate-then-encode response path with the trusted orjson path.
+
+Run from the backend directory::
+
+    python -m benchmarks.serialization --rows 1000 --repeat 20
+
+No database is needed; payloads are synthetic documents shaped like the ones
+the list endpoints read from Mongo.
+"""
+import argparse
+import asyncio
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import orjson
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute, serialize_response
+
+import server
+
+SERVICES = [
+    ("Plumber", "repair-maintenance"),
+    ("Electrician", "repair-maintenance"),
+    ("Deep Cleaning", "cleaning-housekeeping"),
+    ("Interior Painting", "painting-renovation"),
+    ("CCTV Installation", "security-safety"),
+    ("Cook", "personal-domestic"),
+    ("IT Support", "office-services"),
+    ("Packers & Movers", "moving-logistics"),
+]
+STATUSES = ["pending", "assigned", "confirmed", "in_progress", "completed", "cancelled"]
+
+
+def _timestamp(rng: random.Random) -> str:
+    moment = datetime(2026, 1, 1, tzinfo=timezone.utc) + timedelta(seconds=rng.randrange(300 * 86400))
+    return moment.isoformat()
+
+
+def booking_doc(rng: random.Random) -> dict:
+    service, category = rng.choice(SERVICES)
+    status = rng.choice(STATUSES)
+    doc = {
+        "id": str(uuid.UUID(int=rng.getrandbits(128))),
+        "customer_id": str(uuid.UUID(int=rng.getrandbits(128))),
+        "service_name": service,
+        "service_category": category,
+        "booking_date": f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+        "time_slot": rng.choice(["9:00 AM - 11:00 AM", "2:00 PM - 4:00 PM", "6:00 PM - 8:00 PM"]),
+        "location": f"{rng.randint(1, 999)}, {rng.choice(['MG Road', 'Park Street', 'Linking Road'])}",
+        "pincode": str(rng.randint(110001, 855999)),
+        "description": "Kitchen sink is leaking and the tap needs replacement. " * rng.randint(1, 3),
+        "pricing_type": rng.choice(["fixed", "hourly", "inspection"]),
+        "estimated_price": float(rng.randint(200, 5000)),
+        "status": status,
+        "payment_status": "paid" if status == "completed" else "unpaid",
+        "version": rng.randint(0, 4),
+        "created_at": _timestamp(rng),
+    }
+    if status != "pending":
+        doc["vendor_id"] = str(uuid.UUID(int=rng.getrandbits(128)))
+    if status == "completed":
+        doc["final_price"] = doc["estimated_price"] * 1.1
+        doc["payment_method"] = "upi"
+    return doc
+
+
+def review_doc(rng: random.Random) -> dict:
+    return {
+        "id": str(uuid.UUID(int=rng.getrandbits(128))),
+        "booking_id": str(uuid.UUID(int=rng.getrandbits(128))),
+        "customer_id": str(uuid.UUID(int=rng.getrandbits(128))),
+        "vendor_id": str(uuid.UUID(int=rng.getrandbits(128))),
+        "rating": rng.randint(1, 5),
+        "comment": "Arrived on time and did a neat job. " * rng.randint(1, 4),
+        "created_at": _timestamp(rng),
+    }
+
+
+def vendor_doc(rng: random.Random) -> dict:
+    reviews = rng.randint(0, 200)
+    rating_sum = float(sum(rng.randint(3, 5) for _ in range(reviews)))
+    return {
+        "id": str(uuid.UUID(int=rng.getrandbits(128))),
+        "user_id": str(uuid.UUID(int=rng.getrandbits(128))),
+        "services": [service for service, _ in rng.sample(SERVICES, rng.randint(1, 3))],
+        "experience_years": rng.randint(0, 25),
+        "bio": "Certified professional serving the city for years. " * rng.randint(1, 3),
+        "availability": {"days": ["mon", "tue", "wed", "thu", "fri"], "slots": ["9:00 AM - 11:00 AM"]},
+        "hourly_rate": float(rng.randint(200, 900)),
+        "approval_status": "approved",
+        "rating": rating_sum / reviews if reviews else 0.0,
+        "rating_sum": rating_sum,
+        "total_reviews": reviews,
+        "created_at": _timestamp(rng),
+    }
+
+
+# GET route path -> document factory and the trusted shape the endpoint uses
+ENDPOINTS = {
+    "/api/bookings": (booking_doc, server.BOOKING_SHAPE),
+    "/api/admin/bookings": (booking_doc, server.BOOKING_SHAPE),
+    "/api/vendors/bookings": (booking_doc, server.BOOKING_SHAPE),
+    "/api/reviews/vendor/{vendor_id}": (review_doc, server.REVIEW_SHAPE),
+    "/api/vendors": (vendor_doc, server.VENDOR_SHAPE),
+}
+
+
+def _route(path: str) -> APIRoute:
+    for route in server.app.routes:
+        if isinstance(route, APIRoute) and route.path == path and "GET" in route.methods:
+            return route
+    raise LookupError(path)
+
+
+async def _time(func, repeat: int) -> float:
+    """Best-of-``repeat`` wall time in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+async def run(rows: int, repeat: int, seed: int) -> list:
+    results = []
+    for path, (factory, shape) in ENDPOINTS.items():
+        rng = random.Random(seed)
+        docs = [factory(rng) for _ in range(rows)]
+        field = _route(path).response_field
+
+        async def validated():
+            content = await serialize_response(field=field, response_content=docs)
+            return JSONResponse(content).body
+
+        async def trusted():
+            return server.page_response(docs, None, shape).body
+
+        # Both paths must produce the same JSON document
+        assert orjson.loads(await validated()) == orjson.loads(await trusted()), path
+
+        validated_ms = await _time(validated, repeat)
+        trusted_ms = await _time(trusted, repeat)
+        results.append({
+            "endpoint": f"GET {path}",
+            "rows": rows,
+            "validated_ms": round(validated_ms, 3),
+            "trusted_ms": round(trusted_ms, 3),
+            "speedup": round(validated_ms / trusted_ms, 1),
+        })
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000, help="documents per response")
+    parser.add_argument("--repeat", type=int, default=20, help="timed runs per path; the best is reported")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(run(args.rows, args.repeat, args.seed))
+    print(f"{'endpoint':40} {'rows':>6} {'validated ms':>13} {'trusted ms':>11} {'speedup':>8}")
+    for row in results:
+        print(f"{row['endpoint']:40} {row['rows']:>6} {row['validated_ms']:>13.3f} {row['trusted_ms']:>11.3f} {row['speedup']:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
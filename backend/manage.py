@@ -0,0 +1,76 @@
+"""Operational commands for the BuildConnect backend.
+
+Run from the backend directory so ``.env`` is picked up, e.g.::
+
+    python manage.py check-indexes
+"""
+import argparse
+import asyncio
+import sys
+
+import server
+
+
+async def check_indexes(args) -> int:
+    unbuilt = await server.ensure_indexes()
+    for name in unbuilt:
+        print(f"NOT BUILT: {name} (see the log for the conflicting key)")
+    failures = await server.check_query_plans()
+    for failure in failures:
+        print(f"COLLSCAN: {failure}")
+    if failures:
+        print(f"{len(failures)} of {len(server.QUERY_SHAPES)} query shapes fall back to a collection scan")
+        return 1
+    print(f"All {len(server.QUERY_SHAPES)} query shapes use an index")
+    return 1 if unbuilt else 0
+
+
+async def reconcile_ratings(args) -> int:
+    vendors = await server.reconcile_vendor_ratings()
+    print(f"Rebuilt rating aggregates for {vendors} vendors")
+    return 0
+
+
+async def reconcile_stats(args) -> int:
+    drift = await server.reconcile_stats()
+    for counter, values in sorted(drift.items()):
+        print(f"{counter}: stored {values['stored']}, actual {values['actual']}")
+    print(f"Dashboard stats rebuilt; {len(drift)} counters had drifted")
+    return 0
+
+
+async def backfill_earnings(args) -> int:
+    buckets = await server.rebuild_earnings_rollup()
+    print(f"Rebuilt earnings rollup: {buckets} vendor-day buckets")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="BuildConnect backend maintenance commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    check = commands.add_parser("check-indexes", help="Build indexes, then fail if any can't be built or a route query shape does a COLLSCAN")
+    check.set_defaults(handler=check_indexes)
+
+    ratings = commands.add_parser("reconcile-ratings", help="Rebuild vendor rating aggregates from the reviews collection")
+    ratings.set_defaults(handler=reconcile_ratings)
+
+    stats = commands.add_parser("reconcile-stats", help="Recompute the admin dashboard counters and report drift")
+    stats.set_defaults(handler=reconcile_stats)
+
+    earnings = commands.add_parser("backfill-earnings", help="Rebuild the daily earnings rollup from completed, paid bookings")
+    earnings.set_defaults(handler=backfill_earnings)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        return asyncio.run(args.handler(args))
+    finally:
+        server.client.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,24 +1,262 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, status
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Body, Query, Request, Response, status
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING, IndexModel, ReturnDocument, UpdateOne
+from pymongo import monitoring
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
 import os
+import json
+import asyncio
+import base64
+import binascii
 import logging
+import time
+import hashlib
+import re
+import csv
+import math
+from bisect import bisect_left, insort
+from collections import OrderedDict, deque
 from pathlib import Path
-from pydantic import BaseModel, Field, ConfigDict, EmailStr
-from typing import List, Optional
+from pydantic import BaseModel, Field, ConfigDict, EmailStr, ValidationError, field_validator
+from typing import Any, List, Optional
 import uuid
-from datetime import datetime, timezone, timedelta
+from datetime import date, datetime, timezone, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
 import bcrypt
 import jwt
+import orjson
+import numpy as np
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
+# ============= METRICS =============
+
+# Upper bounds in seconds; one more implicit +Inf bucket
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class Histogram:
+    """Pre-bucketed histogram; an observation is one bisect and two additions."""
+    __slots__ = ("counts", "total")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.total = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(LATENCY_BUCKETS, value)] += 1
+        self.total += value
+
+def _label_value(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _label_text(labels: tuple) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_label_value(value)}"' for name, value in labels) + "}"
+
+class MetricsRegistry:
+    """Counters, gauges and histograms keyed by (metric name, label pairs), rendered as Prometheus text.
+
+    Only mutated from the event loop, so plain dict and int updates need
+    no locks; work from other threads is handed over via a deque (see
+    MongoCommandMetrics).
+    """
+
+    def __init__(self):
+        self.help = {}         # name -> (type, help text)
+        self.counters = {}     # (name, labels) -> number
+        self.gauges = {}       # (name, labels) -> number
+        self.histograms = {}   # (name, labels) -> Histogram
+        self.collectors = []   # callables run before rendering
+
+    def describe(self, name: str, kind: str, text: str):
+        self.help[name] = (kind, text)
+
+    def inc(self, name: str, labels: tuple = (), amount: float = 1):
+        key = (name, labels)
+        self.counters[key] = self.counters.get(key, 0) + amount
+
+    def add_gauge(self, name: str, labels: tuple = (), amount: float = 1):
+        key = (name, labels)
+        self.gauges[key] = self.gauges.get(key, 0) + amount
+
+    def observe(self, name: str, labels: tuple, value: float):
+        histogram = self.histograms.get((name, labels))
+        if histogram is None:
+            histogram = self.histograms[(name, labels)] = Histogram()
+        histogram.observe(value)
+
+    def render(self) -> str:
+        for collect in self.collectors:
+            collect()
+        series = {}
+        for (name, labels), value in list(self.counters.items()) + list(self.gauges.items()):
+            series.setdefault(name, []).append(f"{name}{_label_text(labels)} {value}")
+        for (name, labels), histogram in list(self.histograms.items()):
+            lines = series.setdefault(name, [])
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS + ("+Inf",), histogram.counts):
+                cumulative += count
+                lines.append(f"{name}_bucket{_label_text(labels + (('le', bound),))} {cumulative}")
+            lines.append(f"{name}_sum{_label_text(labels)} {histogram.total}")
+            lines.append(f"{name}_count{_label_text(labels)} {cumulative}")
+        output = []
+        for name in sorted(series):
+            kind, text = self.help.get(name, ("untyped", name))
+            output.append(f"# HELP {name} {text}")
+            output.append(f"# TYPE {name} {kind}")
+            output.extend(series[name])
+        return "\n".join(output) + "\n"
+
+metrics = MetricsRegistry()
+metrics.describe("http_requests_in_flight", "gauge", "HTTP requests currently being served")
+metrics.describe("http_request_duration_seconds", "histogram", "HTTP request latency by route template")
+metrics.describe("http_responses_total", "counter", "HTTP responses by route template and status code")
+metrics.describe("mongo_command_duration_seconds", "histogram", "MongoDB command latency by collection and command")
+metrics.describe("mongo_command_documents_total", "counter", "Documents returned or written by MongoDB commands")
+metrics.describe("mongo_command_failures_total", "counter", "Failed MongoDB commands by collection and command")
+metrics.describe("db_budget_exceeded_total", "counter", "Requests that issued more Mongo commands than their route's budget")
+metrics.add_gauge("http_requests_in_flight", amount=0)
+
+class RequestDbUsage:
+    """Mongo commands issued while serving one request, as (command, collection, microseconds).
+
+    Filled from Motor's executor threads (Motor copies the caller's context
+    into them); list.append is atomic, so concurrent commands need no lock.
+    """
+    __slots__ = ("commands",)
+
+    def __init__(self):
+        self.commands = []
+
+    @property
+    def calls(self) -> int:
+        return len(self.commands)
+
+    @property
+    def seconds(self) -> float:
+        return sum(micros for _, _, micros in self.commands) / 1e6
+
+db_usage: ContextVar[Optional[RequestDbUsage]] = ContextVar("db_usage", default=None)
+
+# Command fields that say nothing about the query's shape
+SHAPE_IGNORED_KEYS = {"lsid", "$clusterTime", "$db", "$readPreference", "txnNumber", "signature"}
+# Fields whose values are part of the shape (sort directions, projected fields)
+SHAPE_VERBATIM_KEYS = {"sort", "projection", "hint", "fields"}
+
+def command_shape(value):
+    """``value`` with every literal replaced by "?" and arrays cut to their first element."""
+    if isinstance(value, dict):
+        return {
+            key: item if key in SHAPE_VERBATIM_KEYS else command_shape(item)
+            for key, item in value.items()
+            if key not in SHAPE_IGNORED_KEYS
+        }
+    if isinstance(value, (list, tuple)):
+        return [command_shape(value[0])] if value else []
+    return "?"
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """pymongo command listener feeding the metrics registry.
+
+    Motor runs pymongo, and so these callbacks, on executor threads. They
+    only touch a deque (whose append/popleft are thread-safe) and a dict
+    keyed per in-flight command; drain() folds the events into the registry
+    on the event loop, before each /metrics render and after each request.
+    """
+
+    def __init__(self):
+        self.inflight = {}  # (connection, request id) -> (collection, command document)
+        self.events = deque(maxlen=100000)
+
+    def started(self, event):
+        target = event.command.get(event.command_name)
+        if event.command_name == "getMore":
+            target = event.command.get("collection")
+        collection = target if isinstance(target, str) else ""
+        self.inflight[(event.connection_id, event.request_id)] = (collection, event.command)
+
+    def finished(self, event, documents: int, ok: bool):
+        collection, command = self.inflight.pop((event.connection_id, event.request_id), ("", None))
+        self.events.append((collection, event.command_name, event.duration_micros, documents, ok))
+        usage = db_usage.get()
+        if usage is not None:
+            usage.commands.append((event.command_name, collection, event.duration_micros))
+        if event.duration_micros >= SLOW_QUERY_MS * 1000 and command is not None:
+            shape = command_shape({key: value for key, value in command.items() if key != event.command_name})
+            logger.warning(
+                "Slow Mongo command: %s %s took %.1f ms; shape %s",
+                event.command_name, collection, event.duration_micros / 1000, json.dumps(shape, default=str),
+            )
+
+    def succeeded(self, event):
+        self.finished(event, self.documents(event.reply), True)
+
+    def failed(self, event):
+        self.finished(event, 0, False)
+
+    @staticmethod
+    def documents(reply) -> int:
+        cursor = reply.get("cursor")
+        if isinstance(cursor, dict):
+            return len(cursor.get("firstBatch", cursor.get("nextBatch", ())))
+        count = reply.get("n")
+        return count if isinstance(count, int) else 0
+
+    def drain(self):
+        events = self.events
+        while events:
+            try:
+                collection, command, micros, documents, ok = events.popleft()
+            except IndexError:
+                break
+            labels = (("collection", collection), ("command", command))
+            metrics.observe("mongo_command_duration_seconds", labels, micros / 1e6)
+            if documents:
+                metrics.inc("mongo_command_documents_total", labels, documents)
+            if not ok:
+                metrics.inc("mongo_command_failures_total", labels)
+
+mongo_command_metrics = MongoCommandMetrics()
+metrics.collectors.append(mongo_command_metrics.drain)
+
+def db_budget(calls: int):
+    """Declare the most Mongo commands a route may issue per request, auth lookups included.
+
+    Requests over budget are logged and counted in db_budget_exceeded_total;
+    in debug mode the budget is also sent as X-DB-Budget so tests can check it.
+    """
+    def mark(endpoint):
+        endpoint.db_budget = calls
+        return endpoint
+    return mark
+
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+MONGO_MAX_POOL_SIZE = int(os.environ.get('MONGO_MAX_POOL_SIZE', '100'))
+MONGO_MIN_POOL_SIZE = int(os.environ.get('MONGO_MIN_POOL_SIZE', '10'))  # also the warm-up target
+MONGO_MAX_IDLE_TIME_MS = int(os.environ.get('MONGO_MAX_IDLE_TIME_MS', '300000'))
+MONGO_CONNECT_TIMEOUT_MS = int(os.environ.get('MONGO_CONNECT_TIMEOUT_MS', '10000'))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', '10000'))
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.environ.get('MONGO_WAIT_QUEUE_TIMEOUT_MS', '0')) or None  # 0: wait forever
+MONGO_SOCKET_TIMEOUT_MS = int(os.environ.get('MONGO_SOCKET_TIMEOUT_MS', '0')) or None  # 0: no timeout
+client = AsyncIOMotorClient(
+    mongo_url,
+    maxPoolSize=MONGO_MAX_POOL_SIZE,
+    minPoolSize=MONGO_MIN_POOL_SIZE,
+    maxIdleTimeMS=MONGO_MAX_IDLE_TIME_MS,
+    connectTimeoutMS=MONGO_CONNECT_TIMEOUT_MS,
+    serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+    waitQueueTimeoutMS=MONGO_WAIT_QUEUE_TIMEOUT_MS,
+    socketTimeoutMS=MONGO_SOCKET_TIMEOUT_MS,
+    event_listeners=[mongo_command_metrics],
+)
 db = client[os.environ['DB_NAME']]
 
 # JWT Configuration
@@ -26,6 +264,53 @@ JWT_SECRET = os.environ.get('JWT_SECRET', 'your-secret-key-change-in-production'
 JWT_ALGORITHM = 'HS256'
 JWT_EXPIRATION_HOURS = 24 * 7  # 7 days
 
+# Debug mode adds X-DB-Calls/X-DB-Time/X-DB-Budget headers to every response
+DEBUG = os.environ.get('DEBUG', 'false').lower() in ('1', 'true', 'yes')
+SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS', '100'))
+
+# Availability
+AVAILABILITY_REFRESH_SECONDS = float(os.environ.get('AVAILABILITY_REFRESH_SECONDS', '60'))
+
+# Vendor leaderboards: Bayesian-smoothed rating with this many "virtual" reviews at the prior mean
+LEADERBOARD_PRIOR_WEIGHT = float(os.environ.get('LEADERBOARD_PRIOR_WEIGHT', '5'))
+LEADERBOARD_DEFAULT_MEAN = 3.0  # prior mean until any vendor has been reviewed
+LEADERBOARD_MAX_K = 100
+
+# Vendor proximity search
+PINCODE_TABLE = os.environ.get('PINCODE_TABLE', str(ROOT_DIR / 'data' / 'pincode_prefixes.csv'))
+
+# Automatic booking assignment
+AUTO_ASSIGN_ENABLED = os.environ.get('AUTO_ASSIGN_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+AUTO_ASSIGN_INTERVAL_SECONDS = float(os.environ.get('AUTO_ASSIGN_INTERVAL_SECONDS', '30'))
+AUTO_ASSIGN_BATCH_SIZE = int(os.environ.get('AUTO_ASSIGN_BATCH_SIZE', '1000'))
+# Vendors who list pincodes only get bookings within this distance of one of them
+AUTO_ASSIGN_RADIUS_KM = float(os.environ.get('AUTO_ASSIGN_RADIUS_KM', '25'))
+
+# Dashboard counters
+STATS_RECONCILE_SECONDS = float(os.environ.get('STATS_RECONCILE_SECONDS', '3600'))
+
+# Bulk operations
+BULK_BOOKING_MAX = int(os.environ.get('BULK_BOOKING_MAX', '100'))
+
+# Password hashing
+BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', '12'))
+BCRYPT_WORKERS = int(os.environ.get('BCRYPT_WORKERS', '4'))
+BCRYPT_MAX_QUEUE = int(os.environ.get('BCRYPT_MAX_QUEUE', '64'))  # jobs allowed to wait for a worker
+
+# Authenticated principal caching
+PRINCIPAL_CACHE_TTL = float(os.environ.get('PRINCIPAL_CACHE_TTL', '60'))
+PRINCIPAL_CACHE_SIZE = int(os.environ.get('PRINCIPAL_CACHE_SIZE', '10000'))
+TOKEN_CACHE_TTL = float(os.environ.get('TOKEN_CACHE_TTL', '300'))
+TOKEN_CACHE_SIZE = int(os.environ.get('TOKEN_CACHE_SIZE', '10000'))
+
+# Public read caching (vendor lists, vendor reviews); the TTL bounds staleness across workers
+QUERY_CACHE_TTL = float(os.environ.get('QUERY_CACHE_TTL', '30'))
+QUERY_CACHE_SIZE = int(os.environ.get('QUERY_CACHE_SIZE', '2000'))
+
+# Service catalog caching
+CATALOG_MAX_AGE = int(os.environ.get('CATALOG_MAX_AGE', '300'))  # Cache-Control max-age, seconds
+CATALOG_REFRESH_SECONDS = float(os.environ.get('CATALOG_REFRESH_SECONDS', '300'))
+
 # Security
 security = HTTPBearer()
 
@@ -70,6 +355,40 @@ class ServiceCategory(BaseModel):
     icon: str
     services: List[str]
 
+WEEKDAYS = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+
+# The slots offered on the booking form
+TIME_SLOTS = [
+    "9:00 AM - 11:00 AM",
+    "11:00 AM - 1:00 PM",
+    "2:00 PM - 4:00 PM",
+    "4:00 PM - 6:00 PM",
+    "6:00 PM - 8:00 PM",
+]
+
+class Availability(BaseModel):
+    """Weekly availability; an empty object means every day and every slot."""
+    model_config = ConfigDict(extra="ignore")
+    days: List[str] = Field(default_factory=lambda: list(WEEKDAYS))
+    slots: List[str] = Field(default_factory=lambda: list(TIME_SLOTS))
+
+    @field_validator("days")
+    @classmethod
+    def check_days(cls, days: List[str]) -> List[str]:
+        days = [day.strip().lower()[:3] for day in days]
+        unknown = [day for day in days if day not in WEEKDAYS]
+        if unknown:
+            raise ValueError(f"unknown days {unknown}; use {WEEKDAYS}")
+        return days
+
+    @field_validator("slots")
+    @classmethod
+    def check_slots(cls, slots: List[str]) -> List[str]:
+        unknown = [slot for slot in slots if slot not in TIME_SLOTS]
+        if unknown:
+            raise ValueError(f"unknown slots {unknown}; use {TIME_SLOTS}")
+        return slots
+
 class ServiceProvider(BaseModel):
     model_config = ConfigDict(extra="ignore")
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -77,11 +396,14 @@ class ServiceProvider(BaseModel):
     services: List[str]
     experience_years: int
     bio: str
-    availability: dict
+    availability: Availability = Field(default_factory=Availability)
+    pincodes: List[str] = []  # pincodes served; empty means no preference
+    home_pincode: Optional[str] = None
     hourly_rate: Optional[float] = None
     fixed_rate: Optional[float] = None
     approval_status: str = "pending"  # pending, approved, rejected
     rating: float = 0.0
+    rating_sum: float = 0.0
     total_reviews: int = 0
     created_at: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
 
@@ -89,10 +411,22 @@ class ServiceProviderCreate(BaseModel):
     services: List[str]
     experience_years: int
     bio: str
-    availability: dict
+    availability: Availability = Field(default_factory=Availability)
+    pincodes: List[str] = []
+    home_pincode: Optional[str] = None
     hourly_rate: Optional[float] = None
     fixed_rate: Optional[float] = None
 
+class VendorModerationFilter(BaseModel):
+    approval_status: str = "pending"
+    service: Optional[str] = None
+    min_experience: Optional[int] = None
+
+class VendorModeration(BaseModel):
+    decision: str  # approve, reject
+    vendor_ids: Optional[List[str]] = None
+    filter: Optional[VendorModerationFilter] = None
+
 class Booking(BaseModel):
     model_config = ConfigDict(extra="ignore")
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -111,6 +445,7 @@ class Booking(BaseModel):
     final_price: Optional[float] = None
     payment_status: str = "unpaid"  # unpaid, paid
     payment_method: Optional[str] = None
+    version: int = 0  # bumped on every update, for optimistic concurrency
     created_at: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
 
 class BookingCreate(BaseModel):
@@ -130,6 +465,18 @@ class BookingUpdate(BaseModel):
     final_price: Optional[float] = None
     payment_status: Optional[str] = None
     payment_method: Optional[str] = None
+    version: Optional[int] = None  # expected current version; 409 if it has moved on
+
+class BulkBookingResult(BaseModel):
+    index: int
+    ok: bool
+    booking: Optional[Booking] = None
+    error: Optional[str] = None
+
+class BulkBookingResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[BulkBookingResult]
 
 class Review(BaseModel):
     model_config = ConfigDict(extra="ignore")
@@ -143,18 +490,176 @@ class Review(BaseModel):
 
 class ReviewCreate(BaseModel):
     booking_id: str
-    vendor_id: str
+    vendor_id: Optional[str] = None  # ignored; the review is for the booking's vendor
     rating: int
     comment: str
 
 # ============= UTILITIES =============
 
 def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(BCRYPT_ROUNDS)).decode('utf-8')
 
 def verify_password(password: str, hashed: str) -> bool:
     return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
 
+def password_needs_rehash(hashed: str) -> bool:
+    # bcrypt hashes look like $2b$<cost>$<salt+digest>
+    try:
+        return int(hashed.split('$')[2]) < BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return False
+
+# bcrypt holds a core for a few hundred ms per call, so it runs on its own
+# bounded pool instead of the event loop. Jobs beyond the queue limit are
+# rejected immediately rather than piling up behind a login burst.
+password_executor = ThreadPoolExecutor(max_workers=BCRYPT_WORKERS, thread_name_prefix="bcrypt")
+_password_jobs = 0  # running + queued; only touched from the event loop thread
+
+async def run_password_job(func, *args):
+    global _password_jobs
+    if _password_jobs >= BCRYPT_WORKERS + BCRYPT_MAX_QUEUE:
+        raise HTTPException(
+            status_code=503,
+            detail="Server busy, please try again",
+            headers={"Retry-After": "1"},
+        )
+    _password_jobs += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(password_executor, func, *args)
+    finally:
+        _password_jobs -= 1
+
+async def hash_password_async(password: str) -> str:
+    return await run_password_job(hash_password, password)
+
+async def verify_password_async(password: str, hashed: str) -> bool:
+    return await run_password_job(verify_password, password, hashed)
+
+class TTLCache:
+    """Bounded LRU cache whose entries also expire after a TTL.
+
+    Not thread-safe; only use it from the event loop.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key, value, ttl: Optional[float] = None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key):
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+# Verified user documents by user id, and decoded JWT payloads by token digest.
+principal_cache = TTLCache(PRINCIPAL_CACHE_SIZE, PRINCIPAL_CACHE_TTL)
+token_cache = TTLCache(TOKEN_CACHE_SIZE, TOKEN_CACHE_TTL)
+
+def invalidate_principal(user_id: str):
+    """Drop a cached principal; call after any write to that user's document."""
+    principal_cache.invalidate(user_id)
+
+_MISSING = object()
+
+class QueryCache:
+    """Async read-through cache with request coalescing and per-group invalidation.
+
+    Keys are (group, generation, params). Invalidating a group bumps its
+    generation, so every cached variant of it (other pages, other filters)
+    becomes unreachable at once and ages out of the LRU. Concurrent misses
+    on one key share a single load task.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.entries = TTLCache(maxsize, ttl)
+        self.generations = {}  # group -> generation
+        self.inflight = {}     # key -> asyncio.Task
+        self.loads = 0
+        self.coalesced = 0
+        self.invalidations = 0
+
+    async def get_or_load(self, group, params, load):
+        key = (group, self.generations.setdefault(group, 0), params)
+        value = self.entries.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        task = self.inflight.get(key)
+        if task is None:
+            self.loads += 1
+            task = asyncio.ensure_future(load())
+            self.inflight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self.coalesced += 1
+        # A disconnecting client must not cancel the load other requests wait on
+        return await asyncio.shield(task)
+
+    def _finish(self, key, task):
+        self.inflight.pop(key, None)
+        if not task.cancelled() and task.exception() is None:
+            self.entries.set(key, task.result())
+
+    def invalidate(self, group):
+        if group in self.generations:
+            self.generations[group] += 1
+            self.invalidations += 1
+
+    def invalidate_where(self, predicate):
+        for group in [group for group in self.generations if predicate(group)]:
+            self.invalidate(group)
+
+    def stats(self) -> dict:
+        return {
+            **self.entries.stats(),
+            "groups": len(self.generations),
+            "loads": self.loads,
+            "coalesced": self.coalesced,
+            "inflight": len(self.inflight),
+            "invalidations": self.invalidations,
+        }
+
+# Public vendor list pages by ("vendors", service) and review pages by ("reviews", vendor user id).
+query_cache = QueryCache(QUERY_CACHE_SIZE, QUERY_CACHE_TTL)
+
+def invalidate_vendor_reads(services: List[str]):
+    """Drop cached vendor lists that can include a vendor offering ``services``."""
+    for service in [None, *services]:
+        query_cache.invalidate(("vendors", service))
+
 def create_token(user_id: str, email: str, role: str) -> str:
     payload = {
         'user_id': user_id,
@@ -172,13 +677,25 @@ def decode_token(token: str) -> dict:
     except jwt.InvalidTokenError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
+def decode_token_cached(token: str) -> dict:
+    digest = hashlib.sha256(token.encode('utf-8')).digest()
+    payload = token_cache.get(digest)
+    if payload is None:
+        payload = decode_token(token)
+        # Never serve a payload past its own expiry
+        token_cache.set(digest, payload, ttl=min(TOKEN_CACHE_TTL, payload['exp'] - time.time()))
+    return payload
+
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
     token = credentials.credentials
-    payload = decode_token(token)
-    user = await db.users.find_one({"id": payload['user_id']}, {"_id": 0})
-    if not user:
-        raise HTTPException(status_code=401, detail="User not found")
-    return user
+    payload = decode_token_cached(token)
+    user = principal_cache.get(payload['user_id'])
+    if user is None:
+        user = await db.users.find_one({"id": payload['user_id']}, {"_id": 0})
+        if not user:
+            raise HTTPException(status_code=401, detail="User not found")
+        principal_cache.set(payload['user_id'], user)
+    return dict(user)
 
 async def get_admin_user(current_user: dict = Depends(get_current_user)):
     if current_user['role'] != 'admin':
@@ -190,9 +707,1278 @@ async def get_vendor_user(current_user: dict = Depends(get_current_user)):
         raise HTTPException(status_code=403, detail="Vendor access required")
     return current_user
 
+# ============= RESPONSE SERIALIZATION =============
+
+class ResponseShape:
+    """Makes documents from our own collections match a response model without validating them.
+
+    The projection drops fields the model doesn't declare (what extra="ignore"
+    did) and the defaults fill optional fields older documents lack. The
+    endpoint keeps its response_model for the OpenAPI schema but returns an
+    ORJSONResponse, which FastAPI sends as-is.
+    """
+
+    def __init__(self, model):
+        self.fields = frozenset(model.model_fields)
+        self.projection = {"_id": 0, **{name: 1 for name in model.model_fields}}
+        self.defaults = {
+            name: field.default
+            for name, field in model.model_fields.items()
+            if not field.is_required() and field.default_factory is None
+        }
+
+    def fill(self, doc: dict) -> dict:
+        return {**self.defaults, **doc}
+
+    def select(self, doc: dict) -> dict:
+        """fill() for a document that wasn't read through the projection."""
+        return {**self.defaults, **{name: value for name, value in doc.items() if name in self.fields}}
+
+BOOKING_SHAPE = ResponseShape(Booking)
+REVIEW_SHAPE = ResponseShape(Review)
+VENDOR_SHAPE = ResponseShape(ServiceProvider)
+
+# ============= PAGINATION =============
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+STREAM_BATCH_SIZE = 500
+
+# Newest first; "id" breaks ties between documents created in the same instant.
+PAGE_SORT = [("created_at", DESCENDING), ("id", DESCENDING)]
+
+class PageParams:
+    """Keyset pagination query parameters shared by the list endpoints."""
+
+    def __init__(
+        self,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        after: Optional[str] = None,
+        stream: bool = False,
+    ):
+        self.limit = limit
+        self.after = after
+        self.stream = stream
+
+def encode_cursor(doc: dict) -> str:
+    raw = json.dumps([doc["created_at"], doc["id"]], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, doc_id = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return created_at, doc_id
+
+def keyset_filter(filter_query: dict, after: Optional[str]) -> dict:
+    if not after:
+        return filter_query
+    created_at, doc_id = decode_cursor(after)
+    after_clause = {"$or": [
+        {"created_at": {"$lt": created_at}},
+        {"created_at": created_at, "id": {"$lt": doc_id}},
+    ]}
+    return {"$and": [filter_query, after_clause]} if filter_query else after_clause
+
+async def fetch_page(collection, filter_query: dict, page: PageParams, projection: Optional[dict] = None):
+    """Return one page of documents and the cursor for the next page (None on the last page)."""
+    cursor = collection.find(keyset_filter(filter_query, page.after), projection or {"_id": 0})
+    # The default first batch is 101 documents; size it to the page so it's one round trip
+    cursor = cursor.sort(PAGE_SORT).limit(page.limit + 1).batch_size(page.limit + 1)
+    docs = await cursor.to_list(page.limit + 1)
+    next_cursor = encode_cursor(docs[page.limit - 1]) if len(docs) > page.limit else None
+    return docs[:page.limit], next_cursor
+
+def stream_cursor(collection, filter_query: dict, page: PageParams, projection: Optional[dict] = None):
+    """Motor cursor over every document from the page cursor onwards, for NDJSON streaming."""
+    cursor = collection.find(keyset_filter(filter_query, page.after), projection or {"_id": 0})
+    return cursor.sort(PAGE_SORT).batch_size(STREAM_BATCH_SIZE)
+
+async def ndjson_lines(docs, shape: ResponseShape):
+    async for doc in docs:
+        yield orjson.dumps(shape.fill(doc)) + b"\n"
+
+def ndjson_response(docs, shape: ResponseShape) -> StreamingResponse:
+    return StreamingResponse(ndjson_lines(docs, shape), media_type="application/x-ndjson")
+
+def page_response(docs: List[dict], next_cursor: Optional[str], shape: ResponseShape) -> ORJSONResponse:
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return ORJSONResponse([shape.fill(doc) for doc in docs], headers=headers)
+
+async def paginate(collection, filter_query: dict, page: PageParams, shape: ResponseShape):
+    """Serve a list endpoint either as an NDJSON stream or as one page with an X-Next-Cursor header."""
+    if page.stream:
+        return ndjson_response(stream_cursor(collection, filter_query, page, shape.projection), shape)
+    docs, next_cursor = await fetch_page(collection, filter_query, page, shape.projection)
+    return page_response(docs, next_cursor, shape)
+
+async def cached_paginate(group, params: tuple, collection, filter_query: dict, page: PageParams, shape: ResponseShape):
+    """paginate() through query_cache; pages are cached already serialized. Streams bypass the cache."""
+    if page.stream:
+        return await paginate(collection, filter_query, page, shape)
+
+    async def load():
+        docs, next_cursor = await fetch_page(collection, filter_query, page, shape.projection)
+        return orjson.dumps([shape.fill(doc) for doc in docs]), next_cursor
+
+    body, next_cursor = await query_cache.get_or_load(group, (*params, page.limit, page.after), load)
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return Response(content=body, media_type="application/json", headers=headers)
+
+# ============= REVENUE =============
+
+COMMISSION_RATE = 0.15  # 15% platform commission
+
+# Same fallback the Python sums used: final_price when set, else the estimate.
+BOOKING_AMOUNT = {"$ifNull": ["$final_price", {"$ifNull": ["$estimated_price", 0]}]}
+
+def parse_date_bound(value: Optional[str], name: str, end: bool = False) -> Optional[str]:
+    """Normalise a from/to query value to the UTC ISO format stored in created_at.
+
+    A bare date used as an upper bound covers that whole day.
+    """
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid '{name}' date")
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    if end and len(value) == 10:
+        parsed += timedelta(days=1)
+    return parsed.astimezone(timezone.utc).isoformat()
+
+def completed_paid_match(vendor_id: Optional[str] = None, date_from: Optional[str] = None, date_to: Optional[str] = None) -> dict:
+    match = {"status": "completed", "payment_status": "paid"}
+    if vendor_id:
+        match["vendor_id"] = vendor_id
+    created_at = {}
+    if date_from:
+        created_at["$gte"] = parse_date_bound(date_from, "from")
+    if date_to:
+        created_at["$lt"] = parse_date_bound(date_to, "to", end=True)
+    if created_at:
+        match["created_at"] = created_at
+    return match
+
+async def revenue_summary(match: dict, by_category: bool = False) -> dict:
+    """Sum booking amounts server-side; only the totals cross the wire."""
+    totals = [{"$group": {"_id": None, "total": {"$sum": BOOKING_AMOUNT}, "count": {"$sum": 1}}}]
+    pipeline = [{"$match": match}]
+    if by_category:
+        pipeline.append({"$facet": {
+            "totals": totals,
+            "by_category": [
+                {"$group": {"_id": "$service_category", "total": {"$sum": BOOKING_AMOUNT}, "count": {"$sum": 1}}},
+                {"$sort": {"total": -1}},
+            ],
+        }})
+    else:
+        pipeline.extend(totals)
+
+    result = await db.bookings.aggregate(pipeline).to_list(1)
+    if by_category:
+        facets = result[0]
+        groups = facets["totals"]
+        categories = [
+            {"service_category": row["_id"], "total": row["total"], "count": row["count"]}
+            for row in facets["by_category"]
+        ]
+    else:
+        groups, categories = result, None
+
+    summary = {
+        "total": groups[0]["total"] if groups else 0,
+        "count": groups[0]["count"] if groups else 0,
+    }
+    if categories is not None:
+        summary["by_category"] = categories
+    return summary
+
+# ============= DASHBOARD STATS =============
+
+# Counters behind the admin dashboard live in one document, kept current
+# with $inc by the write paths and recomputed by reconcile_stats().
+STATS_ID = "dashboard"
+STATS_COUNTERS = ("total_users", "total_bookings", "total_vendors", "pending_vendors", "paid_bookings", "total_revenue")
+
+async def bump_stats(deltas: dict):
+    deltas = {key: value for key, value in deltas.items() if value}
+    if deltas:
+        await db.stats.update_one({"_id": STATS_ID}, {"$inc": deltas}, upsert=True)
+
+def is_paid_booking(booking: dict) -> bool:
+    return booking.get("status") == "completed" and booking.get("payment_status") == "paid"
+
+def booking_revenue(booking: dict) -> float:
+    """What a booking contributes to revenue: its amount once completed and paid."""
+    if not is_paid_booking(booking):
+        return 0.0
+    amount = booking.get("final_price")
+    if amount is None:
+        amount = booking.get("estimated_price")
+    return amount or 0.0
+
+def booking_stats_delta(before: dict, after: dict) -> dict:
+    deltas = {}
+    if before.get("status") != after.get("status"):
+        deltas[f"bookings_by_status.{before.get('status')}"] = -1
+        deltas[f"bookings_by_status.{after.get('status')}"] = 1
+    was_paid, is_paid = booking_revenue(before), booking_revenue(after)
+    if was_paid != is_paid:
+        deltas["total_revenue"] = is_paid - was_paid
+    deltas["paid_bookings"] = int(is_paid_booking(after)) - int(is_paid_booking(before))
+    return deltas
+
+async def compute_stats() -> dict:
+    """Every dashboard counter recomputed from the source collections."""
+    total_users, total_bookings, total_vendors, pending_vendors, revenue, by_status = await asyncio.gather(
+        db.users.count_documents({}),
+        db.bookings.count_documents({}),
+        db.service_providers.count_documents({}),
+        db.service_providers.count_documents({"approval_status": "pending"}),
+        revenue_summary(completed_paid_match()),
+        db.bookings.aggregate([{"$group": {"_id": "$status", "count": {"$sum": 1}}}]).to_list(None),
+    )
+    return {
+        "total_users": total_users,
+        "total_bookings": total_bookings,
+        "total_vendors": total_vendors,
+        "pending_vendors": pending_vendors,
+        "paid_bookings": revenue["count"],
+        "total_revenue": revenue["total"],
+        "bookings_by_status": {row["_id"]: row["count"] for row in by_status if row["_id"]},
+    }
+
+def stats_drift(stored: dict, actual: dict) -> dict:
+    """Counters whose stored value disagrees with the recomputed one, as {name: {stored, actual}}."""
+    drift = {}
+    for key in STATS_COUNTERS:
+        if round(stored.get(key, 0), 2) != round(actual[key], 2):
+            drift[key] = {"stored": stored.get(key, 0), "actual": actual[key]}
+    stored_statuses = stored.get("bookings_by_status", {})
+    for status_name in set(stored_statuses) | set(actual["bookings_by_status"]):
+        stored_count = stored_statuses.get(status_name, 0)
+        actual_count = actual["bookings_by_status"].get(status_name, 0)
+        if stored_count != actual_count:
+            drift[f"bookings_by_status.{status_name}"] = {"stored": stored_count, "actual": actual_count}
+    return drift
+
+async def reconcile_stats() -> dict:
+    """Overwrite the stats document with recomputed counters; returns and logs any drift.
+
+    Increments landing while the recount runs can be lost; the next
+    reconcile picks them up.
+    """
+    stored = await db.stats.find_one({"_id": STATS_ID}) or {}
+    actual = await compute_stats()
+    drift = stats_drift(stored, actual) if "reconciled_at" in stored else {}
+    await db.stats.replace_one(
+        {"_id": STATS_ID},
+        {**actual, "reconciled_at": datetime.now(timezone.utc).isoformat()},
+        upsert=True,
+    )
+    if drift:
+        logger.warning("Dashboard stats drifted: %s", drift)
+    return drift
+
+# ============= EARNINGS ROLLUP =============
+
+# earnings_daily holds one document per (vendor_id, day) with the total and
+# count of completed+paid bookings whose service date is that day. Bucketing
+# by booking_date (not by when payment was recorded) keeps the live updates
+# and the backfill in exact agreement.
+EARNINGS_GRANULARITIES = ("day", "week", "month")
+EARNINGS_SERIES_MAX_DAYS = 3660
+
+def earnings_day(booking: dict) -> str:
+    return (booking.get("booking_date") or booking.get("created_at") or "")[:10]
+
+async def apply_earnings_delta(before: dict, after: dict):
+    """Move a booking's contribution between daily buckets after one write."""
+    changes = {}
+    for booking, sign in ((before, -1), (after, 1)):
+        if is_paid_booking(booking) and booking.get("vendor_id"):
+            key = (booking["vendor_id"], earnings_day(booking))
+            total, count = changes.get(key, (0.0, 0))
+            changes[key] = (total + sign * booking_revenue(booking), count + sign)
+    requests = [
+        UpdateOne({"vendor_id": vendor_id, "day": day}, {"$inc": {"total": total, "count": count}}, upsert=True)
+        for (vendor_id, day), (total, count) in changes.items()
+        if total or count
+    ]
+    if requests:
+        await db.earnings_daily.bulk_write(requests, ordered=False)
+
+async def rebuild_earnings_rollup() -> int:
+    """Recompute every daily bucket from bookings; returns the number of buckets."""
+    stamp = datetime.now(timezone.utc).isoformat()
+    pipeline = [
+        {"$match": {**completed_paid_match(), "vendor_id": {"$ne": None}}},
+        {"$group": {
+            "_id": {"vendor_id": "$vendor_id", "day": {"$substrCP": [{"$ifNull": ["$booking_date", "$created_at"]}, 0, 10]}},
+            "total": {"$sum": BOOKING_AMOUNT},
+            "count": {"$sum": 1},
+        }},
+        {"$project": {
+            "_id": 0, "vendor_id": "$_id.vendor_id", "day": "$_id.day",
+            "total": 1, "count": 1, "rebuilt_at": {"$literal": stamp},
+        }},
+        {"$merge": {"into": "earnings_daily", "on": ["vendor_id", "day"], "whenMatched": "replace", "whenNotMatched": "insert"}},
+    ]
+    await db.bookings.aggregate(pipeline).to_list(None)
+    # Buckets the rebuild didn't touch no longer have any paid bookings
+    await db.earnings_daily.delete_many({"rebuilt_at": {"$ne": stamp}})
+    return await db.earnings_daily.count_documents({})
+
+def parse_day(value: Optional[str], name: str, default: date) -> date:
+    if not value:
+        return default
+    try:
+        return date.fromisoformat(value[:10])
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid '{name}' date")
+
+def period_start(day: date, granularity: str) -> date:
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())  # ISO weeks start on Monday
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+def next_period(start: date, granularity: str) -> date:
+    if granularity == "week":
+        return start + timedelta(days=7)
+    if granularity == "month":
+        return date(start.year + start.month // 12, start.month % 12 + 1, 1)
+    return start + timedelta(days=1)
+
+async def earnings_series(vendor_id: str, first: date, last: date, granularity: str) -> List[dict]:
+    """Zero-filled buckets from ``first`` to ``last`` inclusive, summed from earnings_daily."""
+    buckets = {}
+    start = period_start(first, granularity)
+    while start <= last:
+        buckets[start.isoformat()] = {"period": start.isoformat(), "total": 0.0, "count": 0}
+        start = next_period(start, granularity)
+    cursor = db.earnings_daily.find(
+        {"vendor_id": vendor_id, "day": {"$gte": first.isoformat(), "$lte": last.isoformat()}},
+        {"_id": 0, "day": 1, "total": 1, "count": 1},
+    )
+    async for row in cursor:
+        try:
+            day = date.fromisoformat(row["day"])
+        except ValueError:
+            continue
+        bucket = buckets[period_start(day, granularity).isoformat()]
+        bucket["total"] += row["total"]
+        bucket["count"] += row["count"]
+    return list(buckets.values())
+
+# ============= RATINGS =============
+
+def rating_increment(rating: int) -> list:
+    """Pipeline update folding one review into a vendor's running rating aggregates.
+
+    The increments and the derived average are applied in a single atomic
+    write. Profiles created before rating_sum existed fall back to
+    rating * total_reviews.
+    """
+    previous_sum = {"$ifNull": ["$rating_sum", {"$multiply": [
+        {"$ifNull": ["$rating", 0]}, {"$ifNull": ["$total_reviews", 0]},
+    ]}]}
+    return [
+        {"$set": {
+            "rating_sum": {"$add": [previous_sum, rating]},
+            "total_reviews": {"$add": [{"$ifNull": ["$total_reviews", 0]}, 1]},
+        }},
+        {"$set": {"rating": {"$divide": ["$rating_sum", "$total_reviews"]}}},
+    ]
+
+async def reconcile_vendor_ratings() -> int:
+    """Rebuild rating_sum/total_reviews/rating for every vendor from db.reviews.
+
+    One $group pass over reviews, merged into service_providers on its
+    unique user_id index; vendors the pass didn't stamp have no reviews and
+    are zeroed by a single update_many. Returns the number of vendors.
+    """
+    stamp = str(uuid.uuid4())
+    pipeline = [
+        {"$group": {"_id": "$vendor_id", "rating_sum": {"$sum": "$rating"}, "total_reviews": {"$sum": 1}}},
+        {"$project": {
+            "_id": 0,
+            "user_id": "$_id",
+            "rating_sum": 1,
+            "total_reviews": 1,
+            "rating": {"$divide": ["$rating_sum", "$total_reviews"]},
+            "ratings_rebuild": {"$literal": stamp},
+        }},
+        {"$merge": {"into": "service_providers", "on": "user_id", "whenMatched": "merge", "whenNotMatched": "discard"}},
+    ]
+    await db.reviews.aggregate(pipeline).to_list(None)
+    await db.service_providers.update_many(
+        {"ratings_rebuild": {"$ne": stamp}},
+        {"$set": {"rating_sum": 0.0, "total_reviews": 0, "rating": 0.0, "ratings_rebuild": stamp}},
+    )
+    return await db.service_providers.count_documents({})
+
+# ============= SERVICE SEARCH =============
+
+SEARCH_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Field weights: a hit on a service name outranks one on a category name,
+# which outranks one in a category description.
+SEARCH_WEIGHTS = {"service": 3.0, "category": 2.0, "description": 1.0}
+
+def search_tokens(text: str) -> List[str]:
+    return SEARCH_TOKEN_RE.findall(text.lower())
+
+def max_typos(term: str) -> int:
+    if len(term) <= 3:
+        return 0
+    return 1 if len(term) <= 7 else 2
+
+def deletion_variants(term: str, distance: int) -> set:
+    """Every string reachable from ``term`` by deleting up to ``distance`` characters."""
+    variants = {term}
+    frontier = {term}
+    for _ in range(distance):
+        frontier = {word[:i] + word[i + 1:] for word in frontier for i in range(len(word))}
+        variants |= frontier
+    return variants
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Optimal string alignment distance, or limit + 1 once it is known to exceed limit."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2, previous = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+class ServiceSearchIndex:
+    """In-memory inverted index over the service catalog.
+
+    Documents are individual services (indexed by name) and categories
+    (indexed by name and description). Terms match exactly, as a prefix of an
+    indexed token, or within a small edit distance via a symmetric-delete
+    table, so lookups never scan the vocabulary.
+    """
+
+    def __init__(self):
+        self.docs = {}               # doc_id -> result dict
+        self.doc_tokens = {}         # doc_id -> {token: weight}
+        self.postings = {}           # token -> {doc_id: weight}
+        self.vocabulary = []         # sorted tokens, for prefix ranges
+        self.deletes = {}            # deletion variant -> {token}
+        self.fingerprints = {}       # category id -> content fingerprint
+
+    # --- maintenance ---
+
+    def sync(self, categories: List[dict]):
+        """Bring the index in line with ``categories``, touching only what changed."""
+        current = {}
+        for category in categories:
+            fingerprint = json.dumps(
+                [category["name"], category["description"], category["services"], category["slug"]]
+            )
+            current[category["id"]] = (fingerprint, category)
+        for category_id in list(self.fingerprints):
+            if category_id not in current or current[category_id][0] != self.fingerprints[category_id]:
+                self._remove_category(category_id)
+        for category_id, (fingerprint, category) in current.items():
+            if category_id not in self.fingerprints:
+                self._add_category(category)
+                self.fingerprints[category_id] = fingerprint
+
+    def _add_category(self, category: dict):
+        base = {"category": category["slug"], "category_name": category["name"]}
+        fields = {}
+        for token in search_tokens(category["name"]):
+            fields[token] = max(fields.get(token, 0.0), SEARCH_WEIGHTS["category"])
+        for token in search_tokens(category["description"]):
+            fields[token] = max(fields.get(token, 0.0), SEARCH_WEIGHTS["description"])
+        self._add_doc(("category", category["id"]), {"type": "category", "service": None, **base}, fields)
+        for service in category["services"]:
+            fields = {token: SEARCH_WEIGHTS["service"] for token in search_tokens(service)}
+            self._add_doc(("service", category["id"], service), {"type": "service", "service": service, **base}, fields)
+
+    def _remove_category(self, category_id: str):
+        for doc_id in [doc_id for doc_id in self.docs if doc_id[1] == category_id]:
+            self._remove_doc(doc_id)
+        self.fingerprints.pop(category_id, None)
+
+    def _add_doc(self, doc_id, result: dict, tokens: dict):
+        self.docs[doc_id] = result
+        self.doc_tokens[doc_id] = tokens
+        for token, weight in tokens.items():
+            if token not in self.postings:
+                self.postings[token] = {}
+                insort(self.vocabulary, token)
+                for variant in deletion_variants(token, max_typos(token)):
+                    self.deletes.setdefault(variant, set()).add(token)
+            self.postings[token][doc_id] = weight
+
+    def _remove_doc(self, doc_id):
+        self.docs.pop(doc_id, None)
+        for token in self.doc_tokens.pop(doc_id, {}):
+            postings = self.postings[token]
+            postings.pop(doc_id, None)
+            if postings:
+                continue
+            del self.postings[token]
+            del self.vocabulary[bisect_left(self.vocabulary, token)]
+            for variant in deletion_variants(token, max_typos(token)):
+                tokens = self.deletes.get(variant)
+                if tokens is not None:
+                    tokens.discard(token)
+                    if not tokens:
+                        del self.deletes[variant]
+
+    # --- lookup ---
+
+    def _term_matches(self, term: str) -> dict:
+        """Map each indexed token matching ``term`` to a match-quality factor in (0, 1]."""
+        matches = {}
+        if term in self.postings:
+            matches[term] = 1.0
+        if len(term) >= 2:
+            start = bisect_left(self.vocabulary, term)
+            for token in self.vocabulary[start:]:
+                if not token.startswith(term):
+                    break
+                if token != term:
+                    matches[token] = max(matches.get(token, 0.0), 0.6 + 0.3 * len(term) / len(token))
+        limit = max_typos(term)
+        if limit:
+            candidates = set()
+            for variant in deletion_variants(term, limit):
+                candidates |= self.deletes.get(variant, set())
+            for token in candidates:
+                if token in matches:
+                    continue
+                distance = edit_distance(term, token, limit)
+                if distance <= limit:
+                    matches[token] = 0.6 - 0.15 * (distance - 1)
+        return matches
+
+    def search(self, query: str, category: Optional[str] = None, limit: int = 20) -> List[dict]:
+        terms = list(dict.fromkeys(search_tokens(query)))
+        scores = {}   # doc_id -> [terms matched, score]
+        for term in terms:
+            best = {}
+            for token, factor in self._term_matches(term).items():
+                for doc_id, weight in self.postings[token].items():
+                    best[doc_id] = max(best.get(doc_id, 0.0), weight * factor)
+            for doc_id, score in best.items():
+                entry = scores.setdefault(doc_id, [0, 0.0])
+                entry[0] += 1
+                entry[1] += score
+
+        ranked = []
+        for doc_id, (matched, score) in scores.items():
+            result = self.docs[doc_id]
+            if category and result["category"] != category:
+                continue
+            ranked.append((-matched, -score, result["service"] or result["category_name"], doc_id))
+        ranked.sort()
+        return [
+            {**self.docs[doc_id], "score": round(-neg_score, 4)}
+            for _, neg_score, _, doc_id in ranked[:limit]
+        ]
+
+search_index = ServiceSearchIndex()
+
+# ============= SERVICE CATALOG =============
+
+def content_etag(body: bytes) -> str:
+    """Strong ETag derived from the body alone, so every worker hands out the same one."""
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+EMPTY_CATEGORY = (b"[]", content_etag(b"[]"))
+
+class CatalogSnapshot:
+    """Immutable view of db.service_categories with pre-serialized response bodies."""
+
+    def __init__(self, version: int, categories: List[dict]):
+        self.version = version
+        self.categories = categories
+        self.body = json.dumps(categories, separators=(",", ":")).encode("utf-8")
+        self.etag = content_etag(self.body)
+        self.digest = self.etag.strip('"')
+        # slug -> (body, ETag) for ?category= requests
+        self.by_slug = {}
+        for category in categories:
+            body = json.dumps([category], separators=(",", ":")).encode("utf-8")
+            self.by_slug[category["slug"]] = (body, content_etag(body))
+
+catalog = CatalogSnapshot(0, [])
+
+async def refresh_catalog() -> CatalogSnapshot:
+    """Reload the catalog from Mongo, bumping the version if its content changed.
+
+    Call after any write to db.service_categories.
+    """
+    global catalog
+    categories = await db.service_categories.find({}, {"_id": 0}).sort("_id", ASCENDING).to_list(None)
+    snapshot = CatalogSnapshot(catalog.version + 1, categories)
+    if snapshot.digest != catalog.digest or catalog.version == 0:
+        catalog = snapshot
+        search_index.sync(categories)
+        logger.info("Loaded service catalog v%d (%d categories)", catalog.version, len(categories))
+    return catalog
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Weak comparison, as If-None-Match requires: proxies may hand back W/"..." for our strong tags."""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip().removeprefix("W/") for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag.removeprefix("W/") in candidates
+
+def catalog_response(request: Request, body: bytes, etag: str) -> Response:
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={CATALOG_MAX_AGE}",
+        "X-Catalog-Version": str(catalog.version),
+    }
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+# ============= BOOKING STATE =============
+
+# Allowed status moves. Vendors confirm their assigned bookings straight from
+# pending, so pending -> confirmed is allowed alongside the assigned step.
+BOOKING_TRANSITIONS = {
+    "pending": {"assigned", "confirmed", "cancelled"},
+    "assigned": {"confirmed", "cancelled"},
+    "confirmed": {"in_progress", "cancelled"},
+    "in_progress": {"completed", "cancelled"},
+    "completed": set(),
+    "cancelled": set(),
+}
+
+def allowed_previous_statuses(new_status: str) -> List[str]:
+    """Statuses a booking may be in before moving to ``new_status`` (re-setting the same status is a no-op)."""
+    return [new_status] + [current for current, targets in BOOKING_TRANSITIONS.items() if new_status in targets]
+
+def version_condition(version: int):
+    # Bookings written before versioning have no field; treat them as version 0
+    return {"$in": [0, None]} if version == 0 else version
+
+# ============= AVAILABILITY =============
+
+def booking_weekday(booking_date: str) -> str:
+    try:
+        return WEEKDAYS[date.fromisoformat(booking_date[:10]).weekday()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid booking date '{booking_date}'")
+
+class AvailabilityIndex:
+    """In-memory index answering "which approved vendors for service S are free at date D, slot T".
+
+    Three families of sets keyed by vendor user id (the id bookings carry):
+    approved vendors per service, vendors whose weekly availability covers a
+    (weekday, slot), and vendors holding a reservation for a (date, slot).
+    A query is two set intersections and a difference, so its cost depends
+    on the size of the smallest set, not on how many vendors exist.
+
+    The index is per process and refreshed periodically; the unique index on
+    vendor_slots is what actually prevents double booking.
+    """
+
+    def __init__(self):
+        self.by_service = {}   # service -> {vendor user id}
+        self.by_weekly = {}    # (weekday, slot) -> {vendor user id}
+        self.busy = {}         # (booking_date, slot) -> {vendor user id}
+        self.vendors = {}      # vendor user id -> (services, [(weekday, slot)])
+
+    def upsert_vendor(self, profile: dict):
+        self.remove_vendor(profile["user_id"])
+        if profile.get("approval_status") != "approved":
+            return
+        try:
+            availability = Availability.model_validate(profile.get("availability") or {})
+        except ValidationError:
+            availability = Availability()  # legacy free-form availability
+        weekly = [(day, slot) for day in availability.days for slot in availability.slots]
+        vendor_id = profile["user_id"]
+        self.vendors[vendor_id] = (list(profile.get("services", [])), weekly)
+        for service in profile.get("services", []):
+            self.by_service.setdefault(service, set()).add(vendor_id)
+        for key in weekly:
+            self.by_weekly.setdefault(key, set()).add(vendor_id)
+
+    def remove_vendor(self, vendor_id: str):
+        services, weekly = self.vendors.pop(vendor_id, ([], []))
+        for service in services:
+            self.by_service.get(service, set()).discard(vendor_id)
+        for key in weekly:
+            self.by_weekly.get(key, set()).discard(vendor_id)
+
+    def reserve(self, vendor_id: str, booking_date: str, time_slot: str):
+        self.busy.setdefault((booking_date, time_slot), set()).add(vendor_id)
+
+    def release(self, vendor_id: str, booking_date: str, time_slot: str):
+        vendors = self.busy.get((booking_date, time_slot))
+        if vendors is not None:
+            vendors.discard(vendor_id)
+            if not vendors:
+                del self.busy[(booking_date, time_slot)]
+
+    def free_vendors(self, service: str, booking_date: str, time_slot: str) -> set:
+        candidates = sorted(
+            [self.by_service.get(service, set()), self.by_weekly.get((booking_weekday(booking_date), time_slot), set())],
+            key=len,
+        )
+        free = candidates[0] & candidates[1]
+        return free - self.busy.get((booking_date, time_slot), set())
+
+    async def reload(self):
+        """Rebuild from Mongo: approved vendors and reservations from today onwards."""
+        fresh = AvailabilityIndex()
+        vendors = db.service_providers.find(
+            {"approval_status": "approved"},
+            {"_id": 0, "user_id": 1, "services": 1, "availability": 1, "approval_status": 1},
+        )
+        async for profile in vendors:
+            fresh.upsert_vendor(profile)
+        today = datetime.now(timezone.utc).date().isoformat()
+        reservations = db.vendor_slots.find(
+            {"booking_date": {"$gte": today}}, {"_id": 0, "vendor_id": 1, "booking_date": 1, "time_slot": 1}
+        )
+        async for reservation in reservations:
+            fresh.reserve(reservation["vendor_id"], reservation["booking_date"], reservation["time_slot"])
+        self.by_service, self.by_weekly, self.busy, self.vendors = (
+            fresh.by_service, fresh.by_weekly, fresh.busy, fresh.vendors
+        )
+
+availability_index = AvailabilityIndex()
+
+async def reserve_vendor_slot(booking_id: str, vendor_id: str) -> Optional[dict]:
+    """Claim the booking's (date, slot) for ``vendor_id``.
+
+    The unique (vendor_id, booking_date, time_slot) index makes the claim
+    atomic. Returns the new reservation, or None if this booking already
+    holds it; raises 409 if another booking does.
+    """
+    booking = await db.bookings.find_one({"id": booking_id}, {"_id": 0, "booking_date": 1, "time_slot": 1})
+    if not booking:
+        raise HTTPException(status_code=404, detail="Booking not found")
+    reservation = {
+        "vendor_id": vendor_id,
+        "booking_date": booking["booking_date"],
+        "time_slot": booking["time_slot"],
+        "booking_id": booking_id,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+    }
+    try:
+        await db.vendor_slots.insert_one(reservation)
+    except DuplicateKeyError:
+        holder = await db.vendor_slots.find_one(
+            {key: reservation[key] for key in ("vendor_id", "booking_date", "time_slot")}, {"_id": 0, "booking_id": 1}
+        )
+        if holder and holder["booking_id"] == booking_id:
+            return None
+        raise HTTPException(status_code=409, detail="Vendor is already booked for this slot")
+    availability_index.reserve(vendor_id, reservation["booking_date"], reservation["time_slot"])
+    return reservation
+
+async def release_vendor_slot(booking_id: str, vendor_id: Optional[str]):
+    """Drop the reservation ``vendor_id`` holds for the booking, if any.
+
+    Only ever release a vendor the caller's own atomic write displaced:
+    any other reservation may belong to a concurrent reassignment.
+    """
+    if not vendor_id:
+        return
+    released = await db.vendor_slots.find_one_and_delete(
+        {"booking_id": booking_id, "vendor_id": vendor_id}, projection={"_id": 0}
+    )
+    if released:
+        availability_index.release(released["vendor_id"], released["booking_date"], released["time_slot"])
+
+# ============= VENDOR PROXIMITY =============
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Pincode (6 digits) or sorting-district prefix (first 3 digits) -> (lat, lon)
+pincode_coordinates = {}
+
+def load_pincode_table(path: str) -> dict:
+    """Read a CSV with a ``pincode`` or ``prefix`` column plus ``latitude``/``longitude``."""
+    table = {}
+    try:
+        with open(path, newline="") as handle:
+            for row in csv.DictReader(handle):
+                key = (row.get("pincode") or row.get("prefix") or "").strip()
+                if key:
+                    table[key] = (float(row["latitude"]), float(row["longitude"]))
+    except FileNotFoundError:
+        logger.warning("Pincode table %s not found; proximity search disabled", path)
+    return table
+
+def pincode_location(pincode: Optional[str]) -> Optional[tuple]:
+    """Exact pincode if the table has it, else the centroid of its 3-digit prefix."""
+    if not pincode:
+        return None
+    pincode = pincode.strip()
+    return pincode_coordinates.get(pincode) or pincode_coordinates.get(pincode[:3])
+
+def unit_vector(location: tuple) -> tuple:
+    lat, lon = math.radians(location[0]), math.radians(location[1])
+    return (math.cos(lat) * math.cos(lon), math.cos(lat) * math.sin(lon), math.sin(lat))
+
+def chord_for_km(distance_km: float) -> float:
+    return 2 * math.sin(min(distance_km / EARTH_RADIUS_KM, math.pi) / 2)
+
+def km_for_chord(chord: float) -> float:
+    return 2 * EARTH_RADIUS_KM * math.asin(min(chord / 2, 1.0))
+
+class KDTree:
+    """Static 3-d tree over points on the unit sphere.
+
+    Working in 3-d unit vectors instead of lat/lon avoids wrap-around and
+    pole distortion; straight-line (chord) distance is monotonic in
+    great-circle distance, so radius queries stay exact.
+    """
+
+    def __init__(self, points: List[tuple]):
+        self.points = points
+        self.root = self._build(list(range(len(points))), 0)
+
+    def _build(self, indexes: List[int], depth: int):
+        if not indexes:
+            return None
+        axis = depth % 3
+        indexes.sort(key=lambda i: self.points[i][axis])
+        middle = len(indexes) // 2
+        return (
+            indexes[middle], axis,
+            self._build(indexes[:middle], depth + 1),
+            self._build(indexes[middle + 1:], depth + 1),
+        )
+
+    def within(self, center: tuple, radius: float) -> List[tuple]:
+        """(point index, chord distance) for every point within ``radius`` of ``center``."""
+        found = []
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if node is None:
+                continue
+            index, axis, left, right = node
+            point = self.points[index]
+            distance = math.dist(center, point)
+            if distance <= radius:
+                found.append((index, distance))
+            offset = center[axis] - point[axis]
+            if offset <= radius:
+                stack.append(left)
+            if offset >= -radius:
+                stack.append(right)
+        return found
+
+class ProximityIndex:
+    """Approved vendors' locations (home pincode and served pincodes) in a KD-tree."""
+
+    def __init__(self):
+        self.vendors = {}   # vendor user id -> {"services": set, "rating": float, "locations": [(lat, lon)]}
+        self.owners = []    # tree point index -> vendor user id
+        self.tree = KDTree([])
+
+    def _entry(self, profile: dict) -> Optional[dict]:
+        pincodes = [profile.get("home_pincode")] + list(profile.get("pincodes") or [])
+        locations = list(dict.fromkeys(filter(None, (pincode_location(pincode) for pincode in pincodes))))
+        if profile.get("approval_status") != "approved" or not locations:
+            return None
+        return {
+            "services": set(profile.get("services", [])),
+            "rating": profile.get("rating", 0.0),
+            "locations": locations,
+        }
+
+    def _rebuild(self):
+        points, owners = [], []
+        for vendor_id, entry in self.vendors.items():
+            for location in entry["locations"]:
+                points.append(unit_vector(location))
+                owners.append(vendor_id)
+        self.tree, self.owners = KDTree(points), owners
+
+    def upsert_vendor(self, profile: dict):
+        self.upsert_vendors([profile])
+
+    def upsert_vendors(self, profiles: List[dict]):
+        """Apply several profile changes with a single tree rebuild."""
+        changed = False
+        for profile in profiles:
+            entry = self._entry(profile)
+            if entry is None:
+                changed |= self.vendors.pop(profile["user_id"], None) is not None
+            else:
+                self.vendors[profile["user_id"]] = entry
+                changed = True
+        if changed:
+            self._rebuild()
+
+    def nearest(self, origin: tuple, radius_km: float, service: Optional[str] = None, limit: int = 50) -> List[tuple]:
+        """(vendor user id, distance km) within ``radius_km``, nearest then best rated first."""
+        best = {}
+        for index, chord in self.tree.within(unit_vector(origin), chord_for_km(radius_km)):
+            vendor_id = self.owners[index]
+            if service and service not in self.vendors[vendor_id]["services"]:
+                continue
+            if chord < best.get(vendor_id, float("inf")):
+                best[vendor_id] = chord
+        ranked = sorted(
+            ((vendor_id, round(km_for_chord(chord), 2)) for vendor_id, chord in best.items()),
+            key=lambda match: (match[1], -self.vendors[match[0]]["rating"]),
+        )
+        return ranked[:limit]
+
+    async def reload(self):
+        vendors = {}
+        cursor = db.service_providers.find(
+            {"approval_status": "approved"},
+            {"_id": 0, "user_id": 1, "services": 1, "rating": 1, "pincodes": 1, "home_pincode": 1, "approval_status": 1},
+        )
+        async for profile in cursor:
+            entry = self._entry(profile)
+            if entry is not None:
+                vendors[profile["user_id"]] = entry
+        self.vendors = vendors
+        self._rebuild()
+
+proximity_index = ProximityIndex()
+
+# ============= VENDOR LEADERBOARDS =============
+
+class LeaderboardIndex:
+    """Approved vendors per service, kept sorted by Bayesian-smoothed rating.
+
+    score = (C * m + rating * n) / (C + n) with n = total_reviews, C the prior
+    weight and m the mean rating over rated vendors. m is recomputed on
+    reload and held fixed in between so single-vendor updates never reorder
+    anyone else. Each board is a sorted list of (-score, -reviews, vendor id),
+    so an update is a bisect plus an insort and top-K is a slice.
+    """
+
+    def __init__(self):
+        self.prior_mean = LEADERBOARD_DEFAULT_MEAN
+        self.boards = {}    # service -> sorted [(-score, -total_reviews, vendor user id)]
+        self.vendors = {}   # vendor user id -> (rank key, response body)
+
+    def score(self, profile: dict) -> float:
+        reviews = profile.get("total_reviews") or 0
+        rating = profile.get("rating") or 0.0
+        return (LEADERBOARD_PRIOR_WEIGHT * self.prior_mean + rating * reviews) / (LEADERBOARD_PRIOR_WEIGHT + reviews)
+
+    def remove_vendor(self, vendor_id: str):
+        previous = self.vendors.pop(vendor_id, None)
+        if previous is None:
+            return
+        key, body = previous
+        for service in body["services"]:
+            board = self.boards[service]
+            del board[bisect_left(board, key)]
+
+    def upsert_vendor(self, profile: dict):
+        self.remove_vendor(profile["user_id"])
+        if profile.get("approval_status") != "approved":
+            return
+        score = self.score(profile)
+        key = (-score, -(profile.get("total_reviews") or 0), profile["user_id"])
+        body = {**VENDOR_SHAPE.select(profile), "score": round(score, 3)}
+        self.vendors[profile["user_id"]] = (key, body)
+        for service in body["services"]:
+            insort(self.boards.setdefault(service, []), key)
+
+    def top(self, service: str, k: int) -> List[dict]:
+        return [self.vendors[vendor_id][1] for _, _, vendor_id in self.boards.get(service, [])[:k]]
+
+    async def reload(self):
+        profiles = await db.service_providers.find(
+            {"approval_status": "approved"}, VENDOR_SHAPE.projection
+        ).to_list(None)
+        rated = [profile["rating"] for profile in profiles if profile.get("total_reviews")]
+        self.prior_mean = sum(rated) / len(rated) if rated else LEADERBOARD_DEFAULT_MEAN
+        self.boards, self.vendors = {}, {}
+        for profile in profiles:
+            self.upsert_vendor(profile)
+
+leaderboard_index = LeaderboardIndex()
+
+async def refresh_vendor_indexes():
+    await asyncio.gather(availability_index.reload(), proximity_index.reload(), leaderboard_index.reload())
+
+# ============= AUTO ASSIGNMENT =============
+
+# Scoring weights for a feasible (booking, vendor) pair. Feasible means the
+# vendor offers the service, serves the booking's area, works that
+# weekday/slot and isn't already booked.
+ASSIGN_WEIGHT_PINCODE = 1.0
+ASSIGN_WEIGHT_RATING = 1.0
+ASSIGN_WEIGHT_LOAD = 0.5
+ASSIGN_UNRATED = 3.0  # rating assumed for vendors with no reviews yet
+ACTIVE_BOOKING_STATUSES = ["assigned", "confirmed", "in_progress"]
+
+class AssignmentScheduler:
+    """Periodically assigns pending bookings to approved vendors in bulk.
+
+    Each tick scores a batch of bookings against every approved vendor as
+    NumPy matrices, picks vendors greedily (oldest booking first, updating
+    vendor load and slot occupancy as it goes), reserves the slots with one
+    unordered insert_many and assigns with one bulk_write. Unassignable
+    bookings stay pending; a keyset cursor walks the backlog across ticks so
+    they don't starve newer ones.
+    """
+
+    def __init__(self):
+        self.cursor = None  # (created_at, id) of the last booking scanned
+        self.last_tick = None
+        self.totals = {"ticks": 0, "assigned": 0, "unassignable": 0, "conflicts": 0}
+
+    async def _pending_batch(self) -> List[dict]:
+        # Bookings whose service date has passed can't be served any more
+        today = datetime.now(timezone.utc).date().isoformat()
+        filter_query = {"status": "pending", "vendor_id": None, "booking_date": {"$gte": today}}
+        if self.cursor:
+            created_at, booking_id = self.cursor
+            filter_query["$or"] = [
+                {"created_at": {"$gt": created_at}},
+                {"created_at": created_at, "id": {"$gt": booking_id}},
+            ]
+        bookings = await db.bookings.find(
+            filter_query,
+            {"_id": 0, "id": 1, "service_name": 1, "booking_date": 1, "time_slot": 1, "pincode": 1, "created_at": 1},
+        ).sort([("created_at", ASCENDING), ("id", ASCENDING)]).limit(AUTO_ASSIGN_BATCH_SIZE).to_list(AUTO_ASSIGN_BATCH_SIZE)
+        # Wrap around once the end of the backlog is reached
+        self.cursor = (bookings[-1]["created_at"], bookings[-1]["id"]) if len(bookings) == AUTO_ASSIGN_BATCH_SIZE else None
+        return bookings
+
+    async def _vendor_loads(self) -> dict:
+        rows = await db.bookings.aggregate([
+            {"$match": {"status": {"$in": ACTIVE_BOOKING_STATUSES}}},
+            {"$group": {"_id": "$vendor_id", "load": {"$sum": 1}}},
+        ]).to_list(None)
+        return {row["_id"]: row["load"] for row in rows}
+
+    @staticmethod
+    def _membership(keys_per_column: List[list], vocabulary: dict) -> "np.ndarray":
+        """Boolean (len(vocabulary), columns) matrix marking which keys each column has."""
+        rows, columns = [], []
+        for column, keys in enumerate(keys_per_column):
+            for key in keys:
+                if key in vocabulary:
+                    rows.append(vocabulary[key])
+                    columns.append(column)
+        matrix = np.zeros((len(vocabulary), len(keys_per_column)), dtype=bool)
+        matrix[rows, columns] = True
+        return matrix
+
+    @staticmethod
+    def _vendors_near(pincode: str, service: str) -> set:
+        """Vendor user ids whose served area covers ``pincode``, by distance via proximity_index."""
+        origin = pincode_location(pincode)
+        if origin is None:
+            return set()
+        limit = len(proximity_index.vendors)
+        return {vendor_id for vendor_id, _ in proximity_index.nearest(origin, AUTO_ASSIGN_RADIUS_KM, service, limit)}
+
+    def plan(self, bookings: List[dict], vendors: List[dict], loads: dict) -> List[tuple]:
+        """Return (booking, vendor user id) pairs; bookings left out are unassignable.
+
+        Vendors who list pincodes are only eligible for bookings at one of
+        them or within AUTO_ASSIGN_RADIUS_KM of one; vendors who list none
+        serve anywhere.
+        """
+        if not bookings or not vendors:
+            return []
+        vendor_ids = [vendor["user_id"] for vendor in vendors]
+        column_of = {vendor_id: column for column, vendor_id in enumerate(vendor_ids)}
+
+        services = {}
+        for vendor in vendors:
+            for service in vendor.get("services", []):
+                services.setdefault(service, len(services))
+        pincodes = {}
+        for vendor in vendors:
+            for pincode in vendor.get("pincodes", []):
+                pincodes.setdefault(pincode, len(pincodes))
+        days = {day: i for i, day in enumerate(WEEKDAYS)}
+        slots = {slot: i for i, slot in enumerate(TIME_SLOTS)}
+        # Stored availability was validated on write; missing lists mean "any"
+        availabilities = [vendor.get("availability") or {} for vendor in vendors]
+
+        # Vocabulary x vendor membership matrices
+        offers = self._membership([vendor.get("services", []) for vendor in vendors], services)
+        serves = self._membership([vendor.get("pincodes", []) for vendor in vendors], pincodes)
+        works_day = self._membership([a.get("days") or WEEKDAYS for a in availabilities], days)
+        works_slot = self._membership([a.get("slots") or TIME_SLOTS for a in availabilities], slots)
+        anywhere = np.array([not vendor.get("pincodes") for vendor in vendors])
+
+        # Booking rows -> vocabulary rows (-1 when nobody offers it)
+        feasible_rows, booking_keys = [], []
+        for index, booking in enumerate(bookings):
+            try:
+                weekday = WEEKDAYS[date.fromisoformat(booking["booking_date"][:10]).weekday()]
+            except ValueError:
+                continue
+            if booking["service_name"] in services and booking["time_slot"] in slots:
+                feasible_rows.append(index)
+                booking_keys.append((
+                    services[booking["service_name"]], days[weekday], slots[booking["time_slot"]],
+                    pincodes.get(booking["pincode"], -1),
+                ))
+        if not feasible_rows:
+            return []
+        service_rows, day_rows, slot_rows, pincode_rows = (np.array(column) for column in zip(*booking_keys))
+
+        ratings = np.array([
+            vendor.get("rating", 0.0) if vendor.get("total_reviews") else ASSIGN_UNRATED for vendor in vendors
+        ]) / 5.0
+        static_score = ASSIGN_WEIGHT_RATING * ratings + ASSIGN_WEIGHT_PINCODE * np.where(anywhere, 0.5, 0.0)
+        load = np.array([loads.get(vendor_id, 0) for vendor_id in vendor_ids], dtype=float)
+        penalty = ASSIGN_WEIGHT_LOAD * load / (1.0 + load)
+        nearby = {}  # (pincode, service) -> vendor user ids covering it
+        taken = {}  # (booking_date, slot) -> mask of vendor columns busy in that slot
+
+        # Only vendors offering the service can ever be feasible, so score each
+        # service's bookings against that service's candidate columns.
+        rows_by_service = {}
+        for row, service_row in enumerate(service_rows):
+            rows_by_service.setdefault(int(service_row), []).append(row)
+
+        plan = []
+        for service_row, rows in rows_by_service.items():
+            rows = np.array(rows)
+            candidates = np.flatnonzero(offers[service_row])
+            feasible = works_day[day_rows[rows]][:, candidates] & works_slot[slot_rows[rows]][:, candidates]
+            in_area = (pincode_rows[rows, None] >= 0) & serves[np.maximum(pincode_rows[rows], 0)][:, candidates] \
+                if pincodes else np.zeros(feasible.shape, dtype=bool)
+            position = {int(column): index for index, column in enumerate(candidates)}
+            for group_row, row in enumerate(rows):
+                booking = bookings[feasible_rows[row]]
+                key = (booking["pincode"], booking["service_name"])
+                if key not in nearby:
+                    nearby[key] = self._vendors_near(*key)
+                for vendor_id in nearby[key]:
+                    index = position.get(column_of.get(vendor_id, -1))
+                    if index is not None:
+                        in_area[group_row, index] = True
+            feasible &= in_area | anywhere[candidates]
+            scores = np.where(feasible, static_score[candidates] + ASSIGN_WEIGHT_PINCODE * in_area, -np.inf)
+
+            for group_row, row in enumerate(rows):
+                booking = bookings[feasible_rows[row]]
+                slot_key = (booking["booking_date"], booking["time_slot"])
+                if slot_key not in taken:
+                    mask = np.zeros(len(vendor_ids), dtype=bool)
+                    busy = availability_index.busy.get(slot_key, set())
+                    mask[[column_of[vendor_id] for vendor_id in busy if vendor_id in column_of]] = True
+                    taken[slot_key] = mask
+                row_scores = np.where(taken[slot_key][candidates], -np.inf, scores[group_row] - penalty[candidates])
+                best = int(np.argmax(row_scores))
+                if row_scores[best] == -np.inf:
+                    continue
+                column = int(candidates[best])
+                plan.append((booking, vendor_ids[column]))
+                taken[slot_key][column] = True
+                load[column] += 1
+                penalty[column] = ASSIGN_WEIGHT_LOAD * load[column] / (1.0 + load[column])
+        return plan
+
+    async def tick(self) -> dict:
+        started = time.perf_counter()
+        bookings = await self._pending_batch()
+        vendors, loads = [], {}
+        if bookings:
+            vendors, loads = await asyncio.gather(
+                db.service_providers.find(
+                    {"approval_status": "approved"},
+                    {"_id": 0, "user_id": 1, "services": 1, "pincodes": 1, "availability": 1, "rating": 1, "total_reviews": 1},
+                ).to_list(None),
+                self._vendor_loads(),
+            )
+        plan = self.plan(bookings, vendors, loads)
+
+        conflicts = 0
+        assigned = 0
+        if plan:
+            now = datetime.now(timezone.utc).isoformat()
+            reservations = [
+                {"vendor_id": vendor_id, "booking_date": booking["booking_date"], "time_slot": booking["time_slot"],
+                 "booking_id": booking["id"], "created_at": now}
+                for booking, vendor_id in plan
+            ]
+            failed = set()
+            try:
+                await db.vendor_slots.insert_many(reservations, ordered=False)
+            except BulkWriteError as e:
+                failed = {error["index"] for error in e.details.get("writeErrors", [])}
+            conflicts = len(failed)
+            reserved = [pair for i, pair in enumerate(plan) if i not in failed]
+            if reserved:
+                result = await db.bookings.bulk_write([
+                    UpdateOne(
+                        {"id": booking["id"], "status": "pending", "vendor_id": None},
+                        {"$set": {"vendor_id": vendor_id, "status": "assigned"}, "$inc": {"version": 1}},
+                    )
+                    for booking, vendor_id in reserved
+                ], ordered=False)
+                assigned = result.modified_count
+                await bump_stats({"bookings_by_status.pending": -assigned, "bookings_by_status.assigned": assigned})
+                if assigned < len(reserved):
+                    # Some bookings changed under us; give their slots back
+                    current = await db.bookings.find(
+                        {"id": {"$in": [booking["id"] for booking, _ in reserved]}}, {"_id": 0, "id": 1, "vendor_id": 1}
+                    ).to_list(None)
+                    owner = {booking["id"]: booking.get("vendor_id") for booking in current}
+                    for booking, vendor_id in reserved:
+                        if owner.get(booking["id"]) != vendor_id:
+                            await db.vendor_slots.delete_one({"booking_id": booking["id"], "vendor_id": vendor_id})
+                            conflicts += 1
+                            continue
+                        availability_index.reserve(vendor_id, booking["booking_date"], booking["time_slot"])
+                else:
+                    for booking, vendor_id in reserved:
+                        availability_index.reserve(vendor_id, booking["booking_date"], booking["time_slot"])
+
+        metrics = {
+            "at": datetime.now(timezone.utc).isoformat(),
+            "bookings_scanned": len(bookings),
+            "vendors_scanned": len(vendors),
+            "assigned": assigned,
+            "unassignable": len(bookings) - len(plan),
+            "conflicts": conflicts,
+            "latency_ms": round((time.perf_counter() - started) * 1000, 3),
+        }
+        self.last_tick = metrics
+        self.totals["ticks"] += 1
+        for key in ("assigned", "unassignable", "conflicts"):
+            self.totals[key] += metrics[key]
+        if bookings:
+            logger.info("Auto-assignment tick: %s", metrics)
+        return metrics
+
+assignment_scheduler = AssignmentScheduler()
+
 # ============= AUTH ROUTES =============
 
 @api_router.post("/auth/register", response_model=TokenResponse)
+@db_budget(3)
 async def register(user_data: UserRegister):
     # Check if user exists
     existing = await db.users.find_one({"email": user_data.email}, {"_id": 0})
@@ -207,11 +1993,16 @@ async def register(user_data: UserRegister):
         "full_name": user_data.full_name,
         "phone": user_data.phone,
         "role": user_data.role,
-        "password_hash": hash_password(user_data.password),
+        "password_hash": await hash_password_async(user_data.password),
         "created_at": datetime.now(timezone.utc).isoformat()
     }
     
-    await db.users.insert_one(user_dict)
+    try:
+        await db.users.insert_one(user_dict)
+    except DuplicateKeyError:
+        # A concurrent registration won the race past the check above
+        raise HTTPException(status_code=400, detail="Email already registered")
+    await bump_stats({"total_users": 1})
     
     # Create token
     token = create_token(user_id, user_data.email, user_data.role)
@@ -229,6 +2020,7 @@ async def register(user_data: UserRegister):
     return TokenResponse(token=token, user=user_response)
 
 @api_router.post("/auth/login", response_model=TokenResponse)
+@db_budget(2)
 async def login(credentials: UserLogin):
     # Find user
     user = await db.users.find_one({"email": credentials.email}, {"_id": 0})
@@ -236,9 +2028,22 @@ async def login(credentials: UserLogin):
         raise HTTPException(status_code=401, detail="Invalid email or password")
     
     # Verify password
-    if not verify_password(credentials.password, user['password_hash']):
+    if not await verify_password_async(credentials.password, user['password_hash']):
         raise HTTPException(status_code=401, detail="Invalid email or password")
     
+    # Upgrade hashes made with an older cost factor while we have the plaintext
+    if password_needs_rehash(user['password_hash']):
+        try:
+            new_hash = await hash_password_async(credentials.password)
+        except HTTPException:
+            new_hash = None  # hashing pool saturated; upgrade on a later login
+        if new_hash:
+            await db.users.update_one(
+                {"id": user['id'], "password_hash": user['password_hash']},
+                {"$set": {"password_hash": new_hash}}
+            )
+            invalidate_principal(user['id'])
+    
     # Create token
     token = create_token(user['id'], user['email'], user['role'])
     
@@ -254,50 +2059,124 @@ async def login(credentials: UserLogin):
     return TokenResponse(token=token, user=user_response)
 
 @api_router.get("/auth/me", response_model=UserResponse)
+@db_budget(1)
 async def get_me(current_user: dict = Depends(get_current_user)):
     return UserResponse(**current_user)
 
 # ============= SERVICES ROUTES =============
 
-@api_router.get("/services/categories")
-async def get_categories():
-    categories = await db.service_categories.find({}, {"_id": 0}).to_list(100)
-    return categories
+@api_router.get("/services/categories", response_model=List[ServiceCategory])
+@db_budget(0)
+async def get_categories(request: Request):
+    snapshot = catalog
+    return catalog_response(request, snapshot.body, snapshot.etag)
 
 @api_router.get("/services/search")
-async def search_services(category: Optional[str] = None, query: Optional[str] = None):
-    filter_query = {}
+@db_budget(0)
+async def search_services(
+    request: Request,
+    category: Optional[str] = None,
+    query: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+):
+    """Ranked service/category matches for ``query``; whole categories when no query is given."""
+    if query and query.strip():
+        return search_index.search(query, category=category, limit=limit)
+    snapshot = catalog
     if category:
-        filter_query["slug"] = category
-    
-    categories = await db.service_categories.find(filter_query, {"_id": 0}).to_list(100)
-    return categories
+        body, etag = snapshot.by_slug.get(category, EMPTY_CATEGORY)
+        return catalog_response(request, body, etag)
+    return catalog_response(request, snapshot.body, snapshot.etag)
 
 # ============= BOOKINGS ROUTES =============
 
-@api_router.post("/bookings", response_model=Booking)
-async def create_booking(booking_data: BookingCreate, current_user: dict = Depends(get_current_user)):
+def new_booking(booking_data: BookingCreate, customer_id: str) -> dict:
     booking_dict = booking_data.model_dump()
     booking_dict['id'] = str(uuid.uuid4())
-    booking_dict['customer_id'] = current_user['id']
+    booking_dict['customer_id'] = customer_id
     booking_dict['status'] = 'pending'
     booking_dict['payment_status'] = 'unpaid'
+    booking_dict['version'] = 0
     booking_dict['created_at'] = datetime.now(timezone.utc).isoformat()
+    return booking_dict
+
+def validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in detail['loc']) or 'body'}: {detail['msg']}"
+        for detail in error.errors()
+    )
+
+@api_router.post("/bookings", response_model=Booking)
+@db_budget(3)
+async def create_booking(booking_data: BookingCreate, current_user: dict = Depends(get_current_user)):
+    booking_dict = new_booking(booking_data, current_user['id'])
     
     await db.bookings.insert_one(booking_dict)
+    await bump_stats({"total_bookings": 1, "bookings_by_status.pending": 1})
     return Booking(**booking_dict)
 
+# Items are validated one by one below so a bad item fails alone; the body is
+# declared as Any and the real item schema is documented here instead
+BULK_BOOKING_SCHEMA = {
+    "type": "array",
+    "items": {"$ref": "#/components/schemas/BookingCreate"},
+    "minItems": 1,
+    "maxItems": BULK_BOOKING_MAX,
+}
+
+@api_router.post(
+    "/bookings/bulk",
+    response_model=BulkBookingResponse,
+    openapi_extra={"requestBody": {"content": {"application/json": {"schema": BULK_BOOKING_SCHEMA}}}},
+)
+@db_budget(3)
+async def create_bookings_bulk(items: List[Any] = Body(...), current_user: dict = Depends(get_current_user)):
+    """Create many bookings with one unordered insert_many; each item succeeds or fails on its own."""
+    if not items:
+        raise HTTPException(status_code=400, detail="No bookings supplied")
+    if len(items) > BULK_BOOKING_MAX:
+        raise HTTPException(status_code=400, detail=f"At most {BULK_BOOKING_MAX} bookings per request")
+    
+    results = [None] * len(items)
+    pending = []  # (item index, booking document)
+    for index, item in enumerate(items):
+        try:
+            booking_data = BookingCreate.model_validate(item)
+        except ValidationError as e:
+            results[index] = BulkBookingResult(index=index, ok=False, error=validation_message(e))
+            continue
+        pending.append((index, new_booking(booking_data, current_user['id'])))
+    
+    failed_writes = {}
+    if pending:
+        try:
+            await db.bookings.insert_many([doc for _, doc in pending], ordered=False)
+        except BulkWriteError as e:
+            failed_writes = {error['index']: error['errmsg'] for error in e.details.get('writeErrors', [])}
+    
+    for position, (index, doc) in enumerate(pending):
+        if position in failed_writes:
+            results[index] = BulkBookingResult(index=index, ok=False, error=failed_writes[position])
+        else:
+            results[index] = BulkBookingResult(index=index, ok=True, booking=Booking(**doc))
+    
+    created = sum(1 for result in results if result.ok)
+    await bump_stats({"total_bookings": created, "bookings_by_status.pending": created})
+    return BulkBookingResponse(created=created, failed=len(results) - created, results=results)
+
 @api_router.get("/bookings", response_model=List[Booking])
-async def get_bookings(current_user: dict = Depends(get_current_user)):
+@db_budget(2)
+async def get_bookings(page: PageParams = Depends(), current_user: dict = Depends(get_current_user)):
     if current_user['role'] == 'admin':
-        bookings = await db.bookings.find({}, {"_id": 0}).to_list(1000)
+        filter_query = {}
     elif current_user['role'] == 'vendor':
-        bookings = await db.bookings.find({"vendor_id": current_user['id']}, {"_id": 0}).to_list(1000)
+        filter_query = {"vendor_id": current_user['id']}
     else:
-        bookings = await db.bookings.find({"customer_id": current_user['id']}, {"_id": 0}).to_list(1000)
-    return bookings
+        filter_query = {"customer_id": current_user['id']}
+    return await paginate(db.bookings, filter_query, page, BOOKING_SHAPE)
 
 @api_router.get("/bookings/{booking_id}", response_model=Booking)
+@db_budget(2)
 async def get_booking(booking_id: str, current_user: dict = Depends(get_current_user)):
     booking = await db.bookings.find_one({"id": booking_id}, {"_id": 0})
     if not booking:
@@ -310,23 +2189,75 @@ async def get_booking(booking_id: str, current_user: dict = Depends(get_current_
     return Booking(**booking)
 
 @api_router.patch("/bookings/{booking_id}", response_model=Booking)
+@db_budget(8)
 async def update_booking(booking_id: str, update_data: BookingUpdate, current_user: dict = Depends(get_current_user)):
-    booking = await db.bookings.find_one({"id": booking_id}, {"_id": 0})
-    if not booking:
-        raise HTTPException(status_code=404, detail="Booking not found")
-    
     # Build update dict
-    update_dict = {k: v for k, v in update_data.model_dump().items() if v is not None}
+    update_dict = {k: v for k, v in update_data.model_dump(exclude={"version"}).items() if v is not None}
     
-    if update_dict:
-        await db.bookings.update_one({"id": booking_id}, {"$set": update_dict})
-        booking.update(update_dict)
+    # Status and version preconditions go in the filter so the check and the
+    # write are a single atomic operation
+    filter_query = {"id": booking_id}
+    new_status = update_dict.get("status")
+    if new_status is not None:
+        if new_status not in BOOKING_TRANSITIONS:
+            raise HTTPException(status_code=400, detail=f"Unknown booking status '{new_status}'")
+        filter_query["status"] = {"$in": allowed_previous_statuses(new_status)}
+    if update_data.version is not None:
+        filter_query["version"] = version_condition(update_data.version)
     
-    return Booking(**booking)
+    # Claim the vendor's slot before assigning, so a double booking is
+    # rejected by the unique index rather than by a read-then-write check
+    reservation = None
+    if update_dict.get("vendor_id"):
+        reservation = await reserve_vendor_slot(booking_id, update_dict["vendor_id"])
+    
+    previous = None
+    if not update_dict:
+        booking = await db.bookings.find_one(filter_query, {"_id": 0})
+    else:
+        # The document before the write tells us which counters moved
+        previous = await db.bookings.find_one_and_update(
+            filter_query,
+            {"$set": update_dict, "$inc": {"version": 1}},
+            projection={"_id": 0},
+            return_document=ReturnDocument.BEFORE,
+        )
+        booking = None
+        if previous:
+            booking = {**previous, **update_dict, "version": previous.get("version", 0) + 1}
+            await asyncio.gather(
+                bump_stats(booking_stats_delta(previous, booking)),
+                apply_earnings_delta(previous, booking),
+            )
+    if booking:
+        if previous:
+            # The BEFORE image names exactly the vendor this write displaced
+            released = {previous.get("vendor_id")} - {booking.get("vendor_id")}
+            if booking["status"] == "cancelled":
+                released.add(booking.get("vendor_id"))
+            for vendor_id in released:
+                await release_vendor_slot(booking_id, vendor_id)
+        return Booking(**booking)
+    
+    if reservation is not None:
+        await db.vendor_slots.delete_one({"booking_id": booking_id, "vendor_id": reservation["vendor_id"]})
+        availability_index.release(reservation["vendor_id"], reservation["booking_date"], reservation["time_slot"])
+    
+    # Nothing matched: work out which precondition failed
+    current = await db.bookings.find_one({"id": booking_id}, {"_id": 0, "status": 1, "version": 1})
+    if not current:
+        raise HTTPException(status_code=404, detail="Booking not found")
+    if update_data.version is not None and current.get("version", 0) != update_data.version:
+        raise HTTPException(status_code=409, detail="Booking was modified by another request")
+    raise HTTPException(
+        status_code=409,
+        detail=f"Cannot change booking status from '{current['status']}' to '{new_status}'"
+    )
 
 # ============= VENDOR ROUTES =============
 
 @api_router.post("/vendors/profile", response_model=ServiceProvider)
+@db_budget(5)
 async def create_vendor_profile(profile_data: ServiceProviderCreate, current_user: dict = Depends(get_current_user)):
     # Check if profile exists
     existing = await db.service_providers.find_one({"user_id": current_user['id']}, {"_id": 0})
@@ -338,64 +2269,163 @@ async def create_vendor_profile(profile_data: ServiceProviderCreate, current_use
     profile_dict['user_id'] = current_user['id']
     profile_dict['approval_status'] = 'pending'
     profile_dict['rating'] = 0.0
+    profile_dict['rating_sum'] = 0.0
     profile_dict['total_reviews'] = 0
     profile_dict['created_at'] = datetime.now(timezone.utc).isoformat()
     
-    await db.service_providers.insert_one(profile_dict)
+    try:
+        await db.service_providers.insert_one(profile_dict)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Vendor profile already exists")
+    await bump_stats({"total_vendors": 1, "pending_vendors": 1})
+    invalidate_vendor_reads(profile_dict["services"])
     
     # Update user role to vendor
     await db.users.update_one({"id": current_user['id']}, {"$set": {"role": "vendor"}})
+    invalidate_principal(current_user['id'])
     
     return ServiceProvider(**profile_dict)
 
 @api_router.get("/vendors/profile")
+@db_budget(2)
 async def get_vendor_profile(current_user: dict = Depends(get_current_user)):
     profile = await db.service_providers.find_one({"user_id": current_user['id']}, {"_id": 0})
     if not profile:
         raise HTTPException(status_code=404, detail="Vendor profile not found")
     return profile
 
-@api_router.get("/vendors")
-async def get_vendors(service: Optional[str] = None, approved_only: bool = True):
+@api_router.get("/vendors", response_model=List[ServiceProvider])
+@db_budget(1)
+async def get_vendors(
+    service: Optional[str] = None,
+    approved_only: bool = True,
+    near: Optional[str] = None,
+    radius_km: float = Query(25.0, gt=0, le=1000),
+    page: PageParams = Depends(),
+):
+    """List vendors; with ``near=<pincode>``, approved vendors within ``radius_km`` ranked by distance then rating."""
+    if near:
+        return await get_nearby_vendors(near, radius_km, service, page.limit)
+
     filter_query = {}
     if approved_only:
         filter_query['approval_status'] = 'approved'
     if service:
         filter_query['services'] = service
     
-    vendors = await db.service_providers.find(filter_query, {"_id": 0}).to_list(1000)
-    return vendors
+    return await cached_paginate(
+        ("vendors", service or None), (approved_only,), db.service_providers, filter_query, page, VENDOR_SHAPE
+    )
+
+async def get_nearby_vendors(near: str, radius_km: float, service: Optional[str], limit: int) -> ORJSONResponse:
+    origin = pincode_location(near)
+    if origin is None:
+        raise HTTPException(status_code=400, detail=f"Unknown pincode '{near}'")
+    matches = proximity_index.nearest(origin, radius_km, service, limit)
+    if not matches:
+        return ORJSONResponse([])
+    vendors = await db.service_providers.find(
+        {"user_id": {"$in": [vendor_id for vendor_id, _ in matches]}, "approval_status": "approved"},
+        VENDOR_SHAPE.projection,
+    ).batch_size(len(matches)).to_list(len(matches))
+    by_user = {vendor["user_id"]: vendor for vendor in vendors}
+    return ORJSONResponse([
+        {**VENDOR_SHAPE.fill(by_user[vendor_id]), "distance_km": distance_km}
+        for vendor_id, distance_km in matches
+        if vendor_id in by_user
+    ])
+
+@api_router.get("/vendors/top")
+@db_budget(0)
+async def get_top_vendors(service: str, limit: int = Query(10, ge=1, le=LEADERBOARD_MAX_K)):
+    """Best approved vendors for a service by smoothed rating, served from the in-memory leaderboard."""
+    return ORJSONResponse(leaderboard_index.top(service, limit))
 
-@api_router.get("/vendors/bookings")
-async def get_vendor_bookings(current_user: dict = Depends(get_vendor_user)):
-    bookings = await db.bookings.find({"vendor_id": current_user['id']}, {"_id": 0}).to_list(1000)
-    return bookings
+@api_router.get("/vendors/available", response_model=List[ServiceProvider])
+@db_budget(1)
+async def get_available_vendors(
+    service: str,
+    booking_date: str = Query(..., alias="date"),
+    time_slot: str = Query(..., alias="slot"),
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+):
+    """Approved vendors offering ``service`` who are free at ``date``/``slot``, best rated first."""
+    if time_slot not in TIME_SLOTS:
+        raise HTTPException(status_code=400, detail=f"Unknown time slot '{time_slot}'")
+    free = availability_index.free_vendors(service, booking_date, time_slot)
+    if not free:
+        return ORJSONResponse([])
+    vendors = await db.service_providers.find(
+        {"user_id": {"$in": list(free)}, "approval_status": "approved"}, VENDOR_SHAPE.projection
+    ).sort([("rating", DESCENDING), ("user_id", ASCENDING)]).limit(limit).batch_size(limit).to_list(limit)
+    return ORJSONResponse([VENDOR_SHAPE.fill(vendor) for vendor in vendors])
+
+@api_router.get("/vendors/bookings", response_model=List[Booking])
+@db_budget(2)
+async def get_vendor_bookings(page: PageParams = Depends(), current_user: dict = Depends(get_vendor_user)):
+    return await paginate(db.bookings, {"vendor_id": current_user['id']}, page, BOOKING_SHAPE)
 
 @api_router.get("/vendors/earnings")
-async def get_vendor_earnings(current_user: dict = Depends(get_vendor_user)):
+@db_budget(2)
+async def get_vendor_earnings(
+    date_from: Optional[str] = Query(None, alias="from"),
+    date_to: Optional[str] = Query(None, alias="to"),
+    by_category: bool = False,
+    current_user: dict = Depends(get_vendor_user),
+):
     # Calculate earnings from completed bookings
-    bookings = await db.bookings.find({
-        "vendor_id": current_user['id'],
-        "status": "completed",
-        "payment_status": "paid"
-    }, {"_id": 0}).to_list(1000)
-    
-    total_earnings = sum(b.get('final_price', b.get('estimated_price', 0)) for b in bookings)
-    commission_rate = 0.15  # 15% platform commission
-    platform_commission = total_earnings * commission_rate
+    summary = await revenue_summary(
+        completed_paid_match(current_user['id'], date_from, date_to), by_category
+    )
+    
+    total_earnings = summary["total"]
+    platform_commission = total_earnings * COMMISSION_RATE
     net_earnings = total_earnings - platform_commission
     
-    return {
-        "total_bookings": len(bookings),
+    earnings = {
+        "total_bookings": summary["count"],
         "total_earnings": total_earnings,
         "platform_commission": platform_commission,
         "net_earnings": net_earnings,
-        "commission_rate": commission_rate
+        "commission_rate": COMMISSION_RATE
+    }
+    if by_category:
+        earnings["by_category"] = summary["by_category"]
+    return earnings
+
+@api_router.get("/vendors/earnings/series")
+@db_budget(2)
+async def get_vendor_earnings_series(
+    date_from: Optional[str] = Query(None, alias="from"),
+    date_to: Optional[str] = Query(None, alias="to"),
+    granularity: str = "day",
+    current_user: dict = Depends(get_vendor_user),
+):
+    """Earnings per day, week or month by service date, read from the daily rollup."""
+    if granularity not in EARNINGS_GRANULARITIES:
+        raise HTTPException(status_code=400, detail="Granularity must be 'day', 'week' or 'month'")
+    last = parse_day(date_to, "to", datetime.now(timezone.utc).date())
+    first = parse_day(date_from, "from", last - timedelta(days=364))
+    if first > last:
+        raise HTTPException(status_code=400, detail="'from' must not be after 'to'")
+    if (last - first).days >= EARNINGS_SERIES_MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"Range is limited to {EARNINGS_SERIES_MAX_DAYS} days")
+    
+    series = await earnings_series(current_user['id'], first, last, granularity)
+    total_earnings = sum(bucket["total"] for bucket in series)
+    return {
+        "granularity": granularity,
+        "from": first.isoformat(),
+        "to": last.isoformat(),
+        "total_earnings": total_earnings,
+        "net_earnings": total_earnings * (1 - COMMISSION_RATE),
+        "series": series,
     }
 
 # ============= REVIEWS ROUTES =============
 
 @api_router.post("/reviews", response_model=Review)
+@db_budget(5)
 async def create_review(review_data: ReviewCreate, current_user: dict = Depends(get_current_user)):
     # Verify booking exists and belongs to user
     booking = await db.bookings.find_one({"id": review_data.booking_id, "customer_id": current_user['id']}, {"_id": 0})
@@ -404,6 +2434,9 @@ async def create_review(review_data: ReviewCreate, current_user: dict = Depends(
     
     if booking['status'] != 'completed':
         raise HTTPException(status_code=400, detail="Can only review completed bookings")
+    vendor_id = booking.get('vendor_id')
+    if not vendor_id:
+        raise HTTPException(status_code=400, detail="Booking has no assigned vendor")
     
     # Check if review already exists
     existing = await db.reviews.find_one({"booking_id": review_data.booking_id}, {"_id": 0})
@@ -412,98 +2445,290 @@ async def create_review(review_data: ReviewCreate, current_user: dict = Depends(
     
     review_dict = review_data.model_dump()
     review_dict['id'] = str(uuid.uuid4())
+    review_dict['vendor_id'] = vendor_id
     review_dict['customer_id'] = current_user['id']
     review_dict['created_at'] = datetime.now(timezone.utc).isoformat()
     
-    await db.reviews.insert_one(review_dict)
+    try:
+        await db.reviews.insert_one(review_dict)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Review already submitted")
     
     # Update vendor rating
-    vendor_reviews = await db.reviews.find({"vendor_id": review_data.vendor_id}, {"_id": 0}).to_list(1000)
-    avg_rating = sum(r['rating'] for r in vendor_reviews) / len(vendor_reviews)
-    await db.service_providers.update_one(
-        {"user_id": review_data.vendor_id},
-        {"$set": {"rating": avg_rating, "total_reviews": len(vendor_reviews)}}
+    vendor = await db.service_providers.find_one_and_update(
+        {"user_id": vendor_id},
+        rating_increment(review_data.rating),
+        projection=VENDOR_SHAPE.projection,
+        return_document=ReturnDocument.AFTER,
     )
+    query_cache.invalidate(("reviews", vendor_id))
+    if vendor:
+        leaderboard_index.upsert_vendor(vendor)
+        invalidate_vendor_reads(vendor.get("services", []))
     
     return Review(**review_dict)
 
-@api_router.get("/reviews/vendor/{vendor_id}")
-async def get_vendor_reviews(vendor_id: str):
-    reviews = await db.reviews.find({"vendor_id": vendor_id}, {"_id": 0}).to_list(1000)
-    return reviews
+@api_router.get("/reviews/vendor/{vendor_id}", response_model=List[Review])
+@db_budget(1)
+async def get_vendor_reviews(vendor_id: str, page: PageParams = Depends()):
+    return await cached_paginate(("reviews", vendor_id), (), db.reviews, {"vendor_id": vendor_id}, page, REVIEW_SHAPE)
 
 # ============= ADMIN ROUTES =============
 
+async def attach_user_details(vendors: List[dict]) -> List[dict]:
+    """Populate user_details on each vendor with one batched users query."""
+    user_ids = list({vendor['user_id'] for vendor in vendors})
+    if not user_ids:
+        return vendors
+    users = await db.users.find(
+        {"id": {"$in": user_ids}}, {"_id": 0, "password_hash": 0}
+    ).batch_size(len(user_ids)).to_list(len(user_ids))
+    users_by_id = {user['id']: user for user in users}
+    for vendor in vendors:
+        user = users_by_id.get(vendor['user_id'])
+        if user:
+            vendor['user_details'] = user
+    return vendors
+
 @api_router.get("/admin/stats")
-async def get_admin_stats(current_user: dict = Depends(get_admin_user)):
-    total_users = await db.users.count_documents({})
-    total_bookings = await db.bookings.count_documents({})
-    total_vendors = await db.service_providers.count_documents({})
-    pending_vendors = await db.service_providers.count_documents({"approval_status": "pending"})
-    
-    # Calculate revenue
-    completed_bookings = await db.bookings.find({
-        "status": "completed",
-        "payment_status": "paid"
-    }, {"_id": 0}).to_list(10000)
-    
-    total_revenue = sum(b.get('final_price', b.get('estimated_price', 0)) for b in completed_bookings)
-    commission_rate = 0.15
-    platform_revenue = total_revenue * commission_rate
+@db_budget(3)
+async def get_admin_stats(
+    date_from: Optional[str] = Query(None, alias="from"),
+    date_to: Optional[str] = Query(None, alias="to"),
+    by_category: bool = False,
+    current_user: dict = Depends(get_admin_user),
+):
+    counters = await db.stats.find_one({"_id": STATS_ID}, {"_id": 0})
+    if counters is None or "reconciled_at" not in counters:
+        await reconcile_stats()
+        counters = await db.stats.find_one({"_id": STATS_ID}, {"_id": 0})
     
-    return {
-        "total_users": total_users,
-        "total_bookings": total_bookings,
-        "total_vendors": total_vendors,
-        "pending_vendors": pending_vendors,
+    total_revenue = counters.get("total_revenue", 0)
+    # Date ranges and category breakdowns can't be materialized up front
+    if date_from or date_to or by_category:
+        revenue = await revenue_summary(completed_paid_match(date_from=date_from, date_to=date_to), by_category)
+        total_revenue = revenue["total"]
+    
+    stats = {
+        "total_users": counters.get("total_users", 0),
+        "total_bookings": counters.get("total_bookings", 0),
+        "total_vendors": counters.get("total_vendors", 0),
+        "pending_vendors": counters.get("pending_vendors", 0),
         "total_revenue": total_revenue,
-        "platform_revenue": platform_revenue
+        "platform_revenue": total_revenue * COMMISSION_RATE,
+        "bookings_by_status": counters.get("bookings_by_status", {}),
     }
+    if by_category:
+        stats["revenue_by_category"] = revenue["by_category"]
+    return stats
 
-@api_router.patch("/admin/vendors/{vendor_id}/approve")
-async def approve_vendor(vendor_id: str, current_user: dict = Depends(get_admin_user)):
-    result = await db.service_providers.update_one(
-        {"id": vendor_id},
-        {"$set": {"approval_status": "approved"}}
+@api_router.get("/admin/scheduler")
+@db_budget(1)
+async def get_scheduler_stats(current_user: dict = Depends(get_admin_user)):
+    return {
+        "enabled": AUTO_ASSIGN_ENABLED,
+        "interval_seconds": AUTO_ASSIGN_INTERVAL_SECONDS,
+        "batch_size": AUTO_ASSIGN_BATCH_SIZE,
+        "last_tick": assignment_scheduler.last_tick,
+        "totals": assignment_scheduler.totals,
+    }
+
+@api_router.get("/admin/cache-stats")
+@db_budget(1)
+async def get_cache_stats(current_user: dict = Depends(get_admin_user)):
+    return {
+        "principals": principal_cache.stats(),
+        "tokens": token_cache.stats(),
+        "queries": query_cache.stats(),
+    }
+
+async def set_vendor_approval(vendor_id: str, new_status: str) -> dict:
+    """Move one vendor to ``new_status``; returns the profile as it was before the change."""
+    # Matching only vendors not already in new_status keeps the old
+    # "nothing modified -> 404" behaviour
+    previous = await db.service_providers.find_one_and_update(
+        {"id": vendor_id, "approval_status": {"$ne": new_status}},
+        {"$set": {"approval_status": new_status}},
+        projection=VENDOR_SHAPE.projection,
+        return_document=ReturnDocument.BEFORE,
     )
-    if result.modified_count == 0:
+    if not previous:
         raise HTTPException(status_code=404, detail="Vendor not found")
+    if previous.get("approval_status") == "pending":
+        await bump_stats({"pending_vendors": -1})
+    availability_index.upsert_vendor({**previous, "approval_status": new_status})
+    proximity_index.upsert_vendor({**previous, "approval_status": new_status})
+    leaderboard_index.upsert_vendor({**previous, "approval_status": new_status})
+    invalidate_vendor_reads(previous.get("services", []))
+    return previous
+
+@api_router.patch("/admin/vendors/{vendor_id}/approve")
+@db_budget(3)
+async def approve_vendor(vendor_id: str, current_user: dict = Depends(get_admin_user)):
+    await set_vendor_approval(vendor_id, "approved")
     return {"message": "Vendor approved"}
 
 @api_router.patch("/admin/vendors/{vendor_id}/reject")
+@db_budget(3)
 async def reject_vendor(vendor_id: str, current_user: dict = Depends(get_admin_user)):
-    result = await db.service_providers.update_one(
-        {"id": vendor_id},
-        {"$set": {"approval_status": "rejected"}}
-    )
-    if result.modified_count == 0:
-        raise HTTPException(status_code=404, detail="Vendor not found")
+    await set_vendor_approval(vendor_id, "rejected")
     return {"message": "Vendor rejected"}
 
+MODERATION_DECISIONS = {"approve": "approved", "reject": "rejected"}
+
+@api_router.post("/admin/vendors/moderate")
+@db_budget(10)
+async def moderate_vendors(moderation: VendorModeration, current_user: dict = Depends(get_admin_user)):
+    """Approve or reject many vendors at once, by id list or by a server-side filter."""
+    new_status = MODERATION_DECISIONS.get(moderation.decision)
+    if not new_status:
+        raise HTTPException(status_code=400, detail="Decision must be 'approve' or 'reject'")
+    if (moderation.vendor_ids is None) == (moderation.filter is None):
+        raise HTTPException(status_code=400, detail="Provide exactly one of vendor_ids or filter")
+    
+    if moderation.vendor_ids is not None:
+        vendor_ids = list(dict.fromkeys(moderation.vendor_ids))
+        filter_query = {"id": {"$in": vendor_ids}}
+    else:
+        criteria = moderation.filter
+        filter_query = {"approval_status": criteria.approval_status}
+        if criteria.service:
+            filter_query["services"] = criteria.service
+        if criteria.min_experience is not None:
+            filter_query["experience_years"] = {"$gte": criteria.min_experience}
+    
+    # Read the matching profiles first: in filter mode the update moves them
+    # out of the filter. Vendors that start matching in between are picked up
+    # by the periodic index refresh.
+    affected = await db.service_providers.find(filter_query, VENDOR_SHAPE.projection).to_list(None)
+    not_found = []
+    if moderation.vendor_ids is not None:
+        found = {vendor["id"] for vendor in affected}
+        not_found = [vendor_id for vendor_id in vendor_ids if vendor_id not in found]
+    
+    # Split into two disjoint passes so the pending pass's modified count is
+    # exactly the change in pending_vendors and the matched counts add up
+    update = {"$set": {"approval_status": new_status}}
+    result = await db.service_providers.update_many({"$and": [filter_query, {"approval_status": {"$ne": "pending"}}]}, update)
+    from_pending = await db.service_providers.update_many({"$and": [filter_query, {"approval_status": "pending"}]}, update)
+    await bump_stats({"pending_vendors": -from_pending.modified_count})
+    modified = from_pending.modified_count + result.modified_count
+    if modified:
+        for profile in affected:
+            profile["approval_status"] = new_status
+            availability_index.upsert_vendor(profile)
+            leaderboard_index.upsert_vendor(profile)
+        proximity_index.upsert_vendors(affected)
+        invalidate_vendor_reads(sorted({service for profile in affected for service in profile.get("services", [])}))
+    return {
+        "decision": moderation.decision,
+        "matched": from_pending.matched_count + result.matched_count,
+        "modified": modified,
+        "not_found": not_found,
+    }
+
 @api_router.get("/admin/vendors")
-async def get_all_vendors(current_user: dict = Depends(get_admin_user)):
-    vendors = await db.service_providers.find({}, {"_id": 0}).to_list(1000)
-    # Populate user details
-    for vendor in vendors:
-        user = await db.users.find_one({"id": vendor['user_id']}, {"_id": 0, "password_hash": 0})
-        if user:
-            vendor['user_details'] = user
-    return vendors
+@db_budget(3)
+async def get_all_vendors(page: PageParams = Depends(), current_user: dict = Depends(get_admin_user)):
+    async def with_user_details(vendors):
+        batch = []
+        async for vendor in vendors:
+            batch.append(vendor)
+            if len(batch) == STREAM_BATCH_SIZE:
+                for joined in await attach_user_details(batch):
+                    yield joined
+                batch = []
+        for joined in await attach_user_details(batch):
+            yield joined
 
-@api_router.get("/admin/bookings")
-async def get_all_bookings(current_user: dict = Depends(get_admin_user)):
-    bookings = await db.bookings.find({}, {"_id": 0}).to_list(1000)
-    return bookings
+    if page.stream:
+        vendors = stream_cursor(db.service_providers, {}, page, VENDOR_SHAPE.projection)
+        return ndjson_response(with_user_details(vendors), VENDOR_SHAPE)
+
+    vendors, next_cursor = await fetch_page(db.service_providers, {}, page, VENDOR_SHAPE.projection)
+    await attach_user_details(vendors)
+    return page_response(vendors, next_cursor, VENDOR_SHAPE)
+
+@api_router.get("/admin/bookings", response_model=List[Booking])
+@db_budget(2)
+async def get_all_bookings(page: PageParams = Depends(), current_user: dict = Depends(get_admin_user)):
+    return await paginate(db.bookings, {}, page, BOOKING_SHAPE)
 
 # Include the router
 app.include_router(api_router)
 
+class MetricsMiddleware:
+    """ASGI middleware recording in-flight requests, latency and status codes per route template.
+
+    It also tracks the Mongo commands each request issues and checks them
+    against the route's db_budget. NDJSON streams are exempt, and their
+    X-DB-Calls only covers commands issued before the headers went out.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        status_code = 500
+        streamed = False
+        usage = RequestDbUsage()
+
+        async def send_wrapper(message):
+            nonlocal status_code, streamed
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                streamed = (b"content-type", b"application/x-ndjson") in message.get("headers", [])
+                if DEBUG:
+                    headers = [
+                        (b"x-db-calls", str(usage.calls).encode()),
+                        (b"x-db-time", f"{usage.seconds * 1000:.3f}ms".encode()),
+                    ]
+                    budget = getattr(getattr(scope.get("route"), "endpoint", None), "db_budget", None)
+                    if budget is not None:
+                        headers.append((b"x-db-budget", str(budget).encode()))
+                    message = {**message, "headers": [*message.get("headers", []), *headers]}
+            await send(message)
+
+        metrics.add_gauge("http_requests_in_flight")
+        token = db_usage.set(usage)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            db_usage.reset(token)
+            metrics.add_gauge("http_requests_in_flight", amount=-1)
+            # Route templates, not raw paths, keep label cardinality bounded
+            route = scope.get("route")
+            labels = (("method", scope["method"]), ("route", route.path if route else "unmatched"))
+            metrics.observe("http_request_duration_seconds", labels, elapsed)
+            metrics.inc("http_responses_total", labels + (("status", status_code),))
+            mongo_command_metrics.drain()
+            budget = getattr(getattr(route, "endpoint", None), "db_budget", None)
+            # A stream's getMores grow with the data, so only whole responses are held to a budget
+            if budget is not None and not streamed and usage.calls > budget:
+                metrics.inc("db_budget_exceeded_total", labels)
+                logger.warning(
+                    "%s %s issued %d Mongo commands (budget %d): %s",
+                    scope["method"], route.path, usage.calls, budget,
+                    ", ".join(f"{command} {collection}" for command, collection, _ in usage.commands),
+                )
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    return Response(content=metrics.render(), media_type="text/plain; version=0.0.4")
+
+app.add_middleware(MetricsMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 logging.basicConfig(
@@ -512,23 +2737,256 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# ============= BACKGROUND TASKS =============
+
+background_tasks = set()
+
+def start_periodic(name: str, interval: float, job):
+    """Run ``job`` every ``interval`` seconds until shutdown; failures are logged, not fatal."""
+    async def loop():
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await job()
+            except Exception:
+                logger.exception("Periodic job %s failed", name)
+
+    task = asyncio.get_running_loop().create_task(loop(), name=name)
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+    return task
+
+# ============= INDEXES =============
+
+# Every collection's indexes, declared once. create_indexes() is a no-op for
+# indexes that already exist with the same spec, so this is safe on each boot.
+INDEX_SPECS = {
+    "users": [
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+    ],
+    "bookings": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("created_at", DESCENDING), ("id", DESCENDING)], name="created_at_id"),
+        IndexModel(
+            [("customer_id", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)],
+            name="customer_id_created_at_id",
+        ),
+        IndexModel(
+            [("vendor_id", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)],
+            name="vendor_id_created_at_id",
+        ),
+        IndexModel(
+            [("vendor_id", ASCENDING), ("status", ASCENDING), ("payment_status", ASCENDING)],
+            name="vendor_id_status_payment_status",
+        ),
+        IndexModel([("status", ASCENDING), ("payment_status", ASCENDING)], name="status_payment_status"),
+        # Equality, then the scheduler's sort, then its booking_date range
+        IndexModel(
+            [
+                ("status", ASCENDING), ("vendor_id", ASCENDING), ("created_at", ASCENDING), ("id", ASCENDING),
+                ("booking_date", ASCENDING),
+            ],
+            name="status_vendor_id_created_at_id_booking_date",
+        ),
+    ],
+    "reviews": [
+        IndexModel([("booking_id", ASCENDING)], name="booking_id_unique", unique=True),
+        IndexModel(
+            [("vendor_id", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)],
+            name="vendor_id_created_at_id",
+        ),
+    ],
+    "service_providers": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("user_id", ASCENDING)], name="user_id_unique", unique=True),
+        IndexModel([("created_at", DESCENDING), ("id", DESCENDING)], name="created_at_id"),
+        IndexModel(
+            [("approval_status", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)],
+            name="approval_status_created_at_id",
+        ),
+        IndexModel(
+            [("approval_status", ASCENDING), ("services", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)],
+            name="approval_status_services_created_at_id",
+        ),
+        IndexModel(
+            [("services", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)],
+            name="services_created_at_id",
+        ),
+    ],
+    "vendor_slots": [
+        IndexModel(
+            [("vendor_id", ASCENDING), ("booking_date", ASCENDING), ("time_slot", ASCENDING)],
+            name="vendor_id_booking_date_time_slot_unique",
+            unique=True,
+        ),
+        IndexModel([("booking_id", ASCENDING)], name="booking_id"),
+        IndexModel([("booking_date", ASCENDING)], name="booking_date"),
+    ],
+    "service_categories": [
+        IndexModel([("slug", ASCENDING)], name="slug_unique", unique=True),
+    ],
+    "earnings_daily": [
+        # Also the $merge key for rebuild_earnings_rollup()
+        IndexModel([("vendor_id", ASCENDING), ("day", ASCENDING)], name="vendor_id_day_unique", unique=True),
+    ],
+}
+
+# Query shapes issued by the API routes, as (collection, filter, sort).
+# Sample values only matter for the planner; any value of the right type works.
+QUERY_SHAPES = [
+    ("users", {"email": "probe@example.com"}, None),
+    ("users", {"id": "probe"}, None),
+    ("users", {"id": {"$in": ["probe", "probe-2"]}}, None),
+    ("bookings", {"id": "probe"}, None),
+    ("bookings", {}, PAGE_SORT),
+    ("bookings", {"customer_id": "probe"}, PAGE_SORT),
+    ("bookings", {"vendor_id": "probe"}, PAGE_SORT),
+    ("bookings", {"vendor_id": "probe", "status": "completed", "payment_status": "paid"}, None),
+    ("bookings", {"status": "completed", "payment_status": "paid"}, None),
+    ("bookings", {"status": "pending", "vendor_id": None, "booking_date": {"$gte": "2026-01-01"}}, [("created_at", ASCENDING), ("id", ASCENDING)]),
+    ("bookings", {"status": {"$in": ["assigned", "confirmed", "in_progress"]}}, None),
+    ("reviews", {"vendor_id": "probe"}, PAGE_SORT),
+    ("reviews", {"booking_id": "probe"}, None),
+    ("service_providers", {"id": "probe"}, None),
+    ("service_providers", {"user_id": "probe"}, None),
+    ("service_providers", {}, PAGE_SORT),
+    ("service_providers", {"approval_status": "approved"}, PAGE_SORT),
+    ("service_providers", {"approval_status": "approved", "services": "Plumber"}, PAGE_SORT),
+    ("service_providers", {"services": "Plumber"}, PAGE_SORT),
+    ("service_providers", {"id": {"$in": ["probe", "probe-2"]}}, None),
+    ("service_providers", {"approval_status": "pending", "services": "Plumber", "experience_years": {"$gte": 3}}, None),
+    ("service_providers", {"user_id": {"$in": ["probe", "probe-2"]}, "approval_status": "approved"}, None),
+    ("vendor_slots", {"vendor_id": "probe", "booking_date": "2026-01-01", "time_slot": TIME_SLOTS[0]}, None),
+    ("vendor_slots", {"booking_id": "probe"}, None),
+    ("vendor_slots", {"booking_date": {"$gte": "2026-01-01"}}, None),
+    ("earnings_daily", {"vendor_id": "probe", "day": {"$gte": "2026-01-01", "$lte": "2026-12-31"}}, None),
+    ("service_categories", {"slug": "probe"}, None),
+]
+
+async def ensure_indexes() -> List[str]:
+    """Build INDEX_SPECS and return the names of indexes that could not be built.
+
+    A unique index can't be built over data that already holds duplicates
+    (e.g. emails registered twice before the index existed). That is logged
+    and skipped rather than failing startup; the other indexes still build.
+    """
+    failed = []
+    for collection, indexes in INDEX_SPECS.items():
+        try:
+            await db[collection].create_indexes(indexes)
+            continue
+        except OperationFailure:
+            pass
+        # One bad index fails the whole batch; retry one at a time to find it
+        for index in indexes:
+            name = index.document["name"]
+            try:
+                await db[collection].create_indexes([index])
+            except OperationFailure as e:
+                logger.error(
+                    "Could not build index %s.%s: %s. Remove the conflicting documents, "
+                    "then run `python manage.py check-indexes`.", collection, name, e,
+                )
+                failed.append(f"{collection}.{name}")
+    logger.info("Ensured indexes on %d collections", len(INDEX_SPECS))
+    return failed
+
+def _plan_stages(plan):
+    """Yield every stage name in an explain() plan tree."""
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            yield plan["stage"]
+        for value in plan.values():
+            yield from _plan_stages(value)
+    elif isinstance(plan, list):
+        for item in plan:
+            yield from _plan_stages(item)
+
+async def check_query_plans() -> List[str]:
+    """Explain every route query shape and return the ones that fall back to COLLSCAN."""
+    failures = []
+    for collection, filter_query, sort in QUERY_SHAPES:
+        cursor = db[collection].find(filter_query, {"_id": 0})
+        if sort:
+            cursor = cursor.sort(sort)
+        explain = await cursor.limit(1).explain()
+        if "COLLSCAN" in _plan_stages(explain.get("queryPlanner", {})):
+            failures.append(f"{collection}: {filter_query} sort={sort}")
+    return failures
+
+# ============= HEALTH =============
+
+# Startup milestones /readyz waits for
+readiness = {"pool_warmed": False, "indexes_built": False, "seed_complete": False}
+# "collection.name" of indexes the last ensure_indexes() run could not build
+unbuilt_indexes: List[str] = []
+
+async def warm_pool():
+    """Open MONGO_MIN_POOL_SIZE connections up front with concurrent pings.
+
+    Each in-flight ping holds its own connection, so the first requests
+    after a deploy don't pay for connection setup and TLS handshakes.
+    """
+    started = time.perf_counter()
+    await asyncio.gather(*(client.admin.command("ping") for _ in range(max(MONGO_MIN_POOL_SIZE, 1))))
+    readiness["pool_warmed"] = True
+    logger.info("Warmed Mongo pool with %d connections in %.0f ms", MONGO_MIN_POOL_SIZE, (time.perf_counter() - started) * 1000)
+
+async def build_indexes():
+    """Run ensure_indexes(); readiness holds until every index in INDEX_SPECS exists."""
+    unbuilt_indexes[:] = await ensure_indexes()
+    readiness["indexes_built"] = not unbuilt_indexes
+
+@app.get("/healthz", include_in_schema=False)
+async def healthz():
+    """Liveness: the process is up and its event loop is responding."""
+    return {"status": "ok"}
+
+@app.get("/readyz", include_in_schema=False)
+async def readyz():
+    """Readiness: pool warmed, indexes built and seed data in place; 503 until then."""
+    if not readiness["pool_warmed"]:
+        try:
+            await warm_pool()
+        except Exception as e:
+            logger.warning("Mongo pool warm-up failed: %s", e)
+    if unbuilt_indexes:
+        # A missing unique index lets duplicates in, so retry instead of reporting ready
+        try:
+            await build_indexes()
+        except Exception as e:
+            logger.warning("Index build retry failed: %s", e)
+    ready = all(readiness.values())
+    return ORJSONResponse(
+        {"status": "ready" if ready else "not ready", "checks": {**readiness, "unbuilt_indexes": unbuilt_indexes}},
+        status_code=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+    )
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    for task in background_tasks:
+        task.cancel()
     client.close()
+    password_executor.shutdown(wait=False)
+
+@app.on_event("startup")
+async def startup_warm_pool():
+    # Not fatal: /readyz stays 503 and retries the warm-up on each probe
+    try:
+        await warm_pool()
+    except Exception as e:
+        logger.warning("Mongo pool warm-up failed: %s", e)
+
+@app.on_event("startup")
+async def startup_ensure_indexes():
+    await build_indexes()
 
 @app.on_event("startup")
 async def startup_seed_data():
-        print("="*80)
-        print("STARTUP SEED DATA FUNCTION CALLED!")
-        print("="*80)
-        logger.info("="*80)
-        logger.info("STARTUP SEED DATA FUNCTION CALLED!")
-        logger.info("="*80)
     # Seed service categories if empty
     count = await db.service_categories.count_documents({})
     if count == 0:
-            print("========== STARTUP EVENT CALLED ==========")
-            logger.info("========== STARTUP EVENT CALLED ==========")
         categories = [
             {
                 "id": str(uuid.uuid4()),
@@ -589,6 +3047,7 @@ async def startup_seed_data():
         ]
         await db.service_categories.insert_many(categories)
         logger.info("Seeded service categories")
+    await refresh_catalog()
     
     # Create admin user if doesn't exist
     admin_exists = await db.users.find_one({"role": "admin"}, {"_id": 0})
@@ -599,8 +3058,26 @@ async def startup_seed_data():
             "full_name": "Admin User",
             "phone": "9999999999",
             "role": "admin",
-            "password_hash": hash_password("admin123"),
+            "password_hash": await hash_password_async("admin123"),
             "created_at": datetime.now(timezone.utc).isoformat()
         }
         await db.users.insert_one(admin_user)
+        await bump_stats({"total_users": 1})
         logger.info("Created admin user: admin@buildconnect.com / admin123")
+    
+    readiness["seed_complete"] = True
+
+@app.on_event("startup")
+async def startup_background_tasks():
+    # Picks up catalog edits made by other workers or directly in Mongo
+    start_periodic("refresh-catalog", CATALOG_REFRESH_SECONDS, refresh_catalog)
+    pincode_coordinates.update(load_pincode_table(PINCODE_TABLE))
+    await refresh_vendor_indexes()
+    # Picks up approvals and reservations made by other workers
+    start_periodic("refresh-vendor-indexes", AVAILABILITY_REFRESH_SECONDS, refresh_vendor_indexes)
+    # Counters only become trustworthy after a first full count
+    if not await db.stats.find_one({"_id": STATS_ID, "reconciled_at": {"$exists": True}}, {"_id": 1}):
+        await reconcile_stats()
+    start_periodic("reconcile-stats", STATS_RECONCILE_SECONDS, reconcile_stats)
+    if AUTO_ASSIGN_ENABLED:
+        start_periodic("auto-assign", AUTO_ASSIGN_INTERVAL_SECONDS, assignment_scheduler.tick)
@@ -13,6 +13,7 @@ class BuildConnectAPITester:
         self.tests_run = 0
         self.tests_passed = 0
         self.failed_tests = []
+        self.budget_violations = []
 
     def run_test(self, name, method, endpoint, expected_status, data=None, headers=None):
         """Run a single API test"""
@@ -33,6 +34,7 @@ class BuildConnectAPITester:
                 response = requests.patch(url, json=data, headers=test_headers)
 
             success = response.status_code == expected_status
+            self.check_db_budget(name, response)
             if success:
                 self.tests_passed += 1
                 print(f"✅ Passed - Status: {response.status_code}")
@@ -59,6 +61,20 @@ class BuildConnectAPITester:
             })
             return False, {}
 
+    def check_db_budget(self, name, response):
+        """Flag routes issuing more Mongo commands than they declare (server needs DEBUG=true)"""
+        budget = response.headers.get('X-DB-Budget')
+        calls = response.headers.get('X-DB-Calls')
+        if budget is None or calls is None:
+            return
+        if int(calls) > int(budget):
+            print(f"⚠️  Over DB budget - {calls} Mongo commands, budget {budget} ({response.headers.get('X-DB-Time')})")
+            self.budget_violations.append({
+                "test": name,
+                "db_calls": int(calls),
+                "budget": int(budget)
+            })
+
     def test_service_categories(self):
         """Test service categories endpoint"""
         success, response = self.run_test(
@@ -301,7 +317,12 @@ def main():
         for failure in tester.failed_tests:
             print(f"  - {failure}")
     
-    return 0 if tester.tests_passed == tester.tests_run else 1
+    if tester.budget_violations:
+        print("\n⚠️  Routes over their DB round-trip budget:")
+        for violation in tester.budget_violations:
+            print(f"  - {violation}")
+    
+    return 0 if tester.tests_passed == tester.tests_run and not tester.budget_violations else 1
 
 if __name__ == "__main__":
     sys.exit(main())
\ No newline at end of file
@@ -22,6 +22,28 @@ import AdminDashboard from "@/pages/AdminDashboard";
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 export const API = `${BACKEND_URL}/api`;
 
+// One page of a list endpoint plus the cursor for the next one (null on the last page)
+export const fetchPage = async (url, config = {}, after = null) => {
+  const response = await axios.get(url, {
+    ...config,
+    params: { ...config.params, ...(after && { after }) },
+  });
+  return { rows: response.data, nextCursor: response.headers['x-next-cursor'] || null };
+};
+
+// Follow X-Next-Cursor for at most maxPages pages of 1000 rows
+export const fetchAllPages = async (url, config = {}, maxPages = 5) => {
+  const rows = [];
+  let after = null;
+  for (let page = 0; page < maxPages; page++) {
+    const result = await fetchPage(url, { ...config, params: { ...config.params, limit: 1000 } }, after);
+    rows.push(...result.rows);
+    after = result.nextCursor;
+    if (!after) break;
+  }
+  return rows;
+};
+
 // Auth Context
 export const AuthContext = React.createContext(null);
 
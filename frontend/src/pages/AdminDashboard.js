@@ -1,5 +1,5 @@
 import { useState, useEffect, useContext } from 'react';
-import { AuthContext, API } from '@/App';
+import { AuthContext, API, fetchPage } from '@/App';
 import axios from 'axios';
 import { toast } from 'sonner';
 import Navbar from '@/components/Navbar';
@@ -12,25 +12,34 @@ const AdminDashboard = () => {
   const [stats, setStats] = useState(null);
   const [vendors, setVendors] = useState([]);
   const [bookings, setBookings] = useState([]);
+  const [vendorsCursor, setVendorsCursor] = useState(null);
+  const [bookingsCursor, setBookingsCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [loading, setLoading] = useState(true);
 
   useEffect(() => {
     fetchData();
   }, []);
 
+  const authHeaders = () => ({ headers: { Authorization: `Bearer ${localStorage.getItem('token')}` } });
+
+  const fetchStats = async () => {
+    const statsRes = await axios.get(`${API}/admin/stats`, authHeaders());
+    setStats(statsRes.data);
+  };
+
   const fetchData = async () => {
     try {
-      const token = localStorage.getItem('token');
-      
-      const [statsRes, vendorsRes, bookingsRes] = await Promise.all([
-        axios.get(`${API}/admin/stats`, { headers: { Authorization: `Bearer ${token}` } }),
-        axios.get(`${API}/admin/vendors`, { headers: { Authorization: `Bearer ${token}` } }),
-        axios.get(`${API}/admin/bookings`, { headers: { Authorization: `Bearer ${token}` } }),
+      const [, vendorPage, bookingPage] = await Promise.all([
+        fetchStats(),
+        fetchPage(`${API}/admin/vendors`, authHeaders()),
+        fetchPage(`${API}/admin/bookings`, authHeaders()),
       ]);
 
-      setStats(statsRes.data);
-      setVendors(vendorsRes.data);
-      setBookings(bookingsRes.data);
+      setVendors(vendorPage.rows);
+      setVendorsCursor(vendorPage.nextCursor);
+      setBookings(bookingPage.rows);
+      setBookingsCursor(bookingPage.nextCursor);
     } catch (error) {
       toast.error('Failed to load dashboard data');
     } finally {
@@ -38,6 +47,40 @@ const AdminDashboard = () => {
     }
   };
 
+  const loadMoreVendors = async () => {
+    setLoadingMore(true);
+    try {
+      const page = await fetchPage(`${API}/admin/vendors`, authHeaders(), vendorsCursor);
+      setVendors((loaded) => [...loaded, ...page.rows]);
+      setVendorsCursor(page.nextCursor);
+    } catch (error) {
+      toast.error('Failed to load more vendors');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
+  const loadMoreBookings = async () => {
+    setLoadingMore(true);
+    try {
+      const page = await fetchPage(`${API}/admin/bookings`, authHeaders(), bookingsCursor);
+      setBookings((loaded) => [...loaded, ...page.rows]);
+      setBookingsCursor(page.nextCursor);
+    } catch (error) {
+      toast.error('Failed to load more bookings');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
+  // Update the loaded row in place so approving doesn't throw away pages loaded with "Load more"
+  const setVendorStatus = (vendorId, approvalStatus) => {
+    setVendors((loaded) => loaded.map((vendor) => (
+      vendor.id === vendorId ? { ...vendor, approval_status: approvalStatus } : vendor
+    )));
+    fetchStats();
+  };
+
   const handleApproveVendor = async (vendorId) => {
     try {
       const token = localStorage.getItem('token');
@@ -45,7 +88,7 @@ const AdminDashboard = () => {
         headers: { Authorization: `Bearer ${token}` }
       });
       toast.success('Vendor approved successfully');
-      fetchData();
+      setVendorStatus(vendorId, 'approved');
     } catch (error) {
       toast.error('Failed to approve vendor');
     }
@@ -58,7 +101,7 @@ const AdminDashboard = () => {
         headers: { Authorization: `Bearer ${token}` }
       });
       toast.success('Vendor rejected');
-      fetchData();
+      setVendorStatus(vendorId, 'rejected');
     } catch (error) {
       toast.error('Failed to reject vendor');
     }
@@ -179,6 +222,13 @@ const AdminDashboard = () => {
                     ))
                   )}
                 </div>
+                {vendorsCursor && (
+                  <div className="p-6 border-t border-slate-200 text-center">
+                    <Button onClick={loadMoreVendors} variant="outline" disabled={loadingMore} data-testid="load-more-vendors-btn">
+                      {loadingMore ? 'Loading...' : 'Load more'}
+                    </Button>
+                  </div>
+                )}
               </div>
             </TabsContent>
 
@@ -217,6 +267,13 @@ const AdminDashboard = () => {
                       </div>
                     </div>
                   ))}
+                  {bookingsCursor && (
+                    <div className="text-center">
+                      <Button onClick={loadMoreBookings} variant="outline" disabled={loadingMore} data-testid="load-more-bookings-btn">
+                        {loadingMore ? 'Loading...' : 'Load more'}
+                      </Button>
+                    </div>
+                  )}
                 </div>
               )}
             </TabsContent>
@@ -1,7 +1,6 @@
 import { useState, useEffect, useContext } from 'react';
-import { AuthContext, API } from '@/App';
+import { AuthContext, API, fetchAllPages } from '@/App';
 import { useNavigate } from 'react-router-dom';
-import axios from 'axios';
 import { toast } from 'sonner';
 import Navbar from '@/components/Navbar';
 import { Button } from '@/components/ui/button';
@@ -20,10 +19,10 @@ const CustomerDashboard = () => {
   const fetchBookings = async () => {
     try {
       const token = localStorage.getItem('token');
-      const response = await axios.get(`${API}/bookings`, {
+      const allBookings = await fetchAllPages(`${API}/bookings`, {
         headers: { Authorization: `Bearer ${token}` }
       });
-      setBookings(response.data.sort((a, b) => new Date(b.created_at) - new Date(a.created_at)));
+      setBookings(allBookings.sort((a, b) => new Date(b.created_at) - new Date(a.created_at)));
     } catch (error) {
       toast.error('Failed to fetch bookings');
     } finally {
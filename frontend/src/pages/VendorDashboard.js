@@ -1,5 +1,5 @@
 import { useState, useEffect, useContext } from 'react';
-import { AuthContext, API } from '@/App';
+import { AuthContext, API, fetchAllPages } from '@/App';
 import axios from 'axios';
 import { toast } from 'sonner';
 import Navbar from '@/components/Navbar';
@@ -50,10 +50,10 @@ const VendorDashboard = () => {
         setProfile(profileRes.data);
         
         // Fetch bookings and earnings if profile exists
-        const bookingsRes = await axios.get(`${API}/vendors/bookings`, {
+        const allBookings = await fetchAllPages(`${API}/vendors/bookings`, {
           headers: { Authorization: `Bearer ${token}` }
         });
-        setBookings(bookingsRes.data);
+        setBookings(allBookings);
         
         const earningsRes = await axios.get(`${API}/vendors/earnings`, {
           headers: { Authorization: `Bearer ${token}` }
@@ -290,7 +290,7 @@ const VendorDashboard = () => {
                         </div>
                       </div>
                       <div className="flex flex-col gap-2">
-                        {booking.status === 'pending' && (
+                        {(booking.status === 'pending' || booking.status === 'assigned') && (
                           <>
                             <Button
                               onClick={() => handleUpdateBooking(booking.id, 'confirmed')}
@@ -0,0 +1,66 @@
+"""Shared fixtures: the backend module running against an in-memory Motor stand-in."""
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "buildconnect_test")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+import server  # noqa: E402
+
+
+@pytest.fixture
+def db(monkeypatch):
+    """A fresh in-memory database swapped in for server.db."""
+    client = AsyncMongoMockClient()
+    database = client["buildconnect_test"]
+    monkeypatch.setattr(server, "client", client)
+    monkeypatch.setattr(server, "db", database)
+    return database
+
+
+@pytest.fixture
+def run():
+    """Run a coroutine to completion on a private event loop."""
+    loop = asyncio.new_event_loop()
+    yield loop.run_until_complete
+    loop.close()
+
+
+@pytest.fixture(autouse=True)
+def fresh_state(monkeypatch):
+    """Empty in-memory indexes and caches, with the bundled pincode table loaded."""
+    monkeypatch.setattr(server, "availability_index", server.AvailabilityIndex())
+    monkeypatch.setattr(server, "proximity_index", server.ProximityIndex())
+    monkeypatch.setattr(server, "leaderboard_index", server.LeaderboardIndex())
+    monkeypatch.setattr(server, "query_cache", server.QueryCache(100, 60))
+    monkeypatch.setattr(server, "principal_cache", server.TTLCache(100, 60))
+    monkeypatch.setattr(server, "token_cache", server.TTLCache(100, 300))
+    monkeypatch.setattr(server, "pincode_coordinates", server.load_pincode_table(server.PINCODE_TABLE))
+
+
+@pytest.fixture
+def insert_booking(run, db):
+    """Insert a pending booking (overrides via keyword) and return it."""
+    def insert(**fields):
+        booking = server.new_booking(server.BookingCreate(
+            service_name="Plumber",
+            service_category="repair-maintenance",
+            booking_date="2026-11-02",
+            time_slot=server.TIME_SLOTS[0],
+            location="12, MG Road",
+            pincode="560001",
+            description="Leaking tap",
+            estimated_price=500.0,
+        ), "customer-1")
+        booking.update(fields)
+        run(db.bookings.insert_one(dict(booking)))
+        return booking
+    return insert
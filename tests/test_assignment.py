@@ -0,0 +1,100 @@
+from datetime import date, timedelta
+
+import server
+
+MONDAY = "2026-11-02"
+SLOT = server.TIME_SLOTS[0]
+
+
+def vendor(user_id, pincodes=(), services=("Plumber",), rating=0.0, total_reviews=0):
+    profile = {
+        "user_id": user_id,
+        "services": list(services),
+        "pincodes": list(pincodes),
+        "availability": {},
+        "rating": rating,
+        "total_reviews": total_reviews,
+        "approval_status": "approved",
+    }
+    server.proximity_index.upsert_vendor(profile)
+    return profile
+
+
+def booking(booking_id, pincode, service="Plumber", booking_date=MONDAY, time_slot=SLOT):
+    return {
+        "id": booking_id,
+        "service_name": service,
+        "booking_date": booking_date,
+        "time_slot": time_slot,
+        "pincode": pincode,
+    }
+
+
+def assignments(bookings, vendors, loads=None):
+    plan = server.AssignmentScheduler().plan(bookings, vendors, loads or {})
+    return {assigned["id"]: vendor_id for assigned, vendor_id in plan}
+
+
+def test_vendor_is_not_assigned_outside_listed_pincodes():
+    delhi = vendor("delhi", pincodes=["110001"])
+    assert assignments([booking("mumbai-job", "400001"), booking("bangalore-job", "560001")], [delhi]) == {}
+
+
+def test_each_booking_goes_to_the_vendor_serving_its_area():
+    vendors = [vendor("delhi", pincodes=["110001"]), vendor("mumbai", pincodes=["400001"])]
+    plan = assignments([booking("mumbai-job", "400001"), booking("bangalore-job", "560001")], vendors)
+    assert plan == {"mumbai-job": "mumbai"}
+
+
+def test_nearby_pincode_counts_as_in_area():
+    delhi = vendor("delhi", pincodes=["110001"])
+    assert assignments([booking("job", "110020")], [delhi]) == {"job": "delhi"}
+
+
+def test_vendor_without_pincodes_serves_anywhere():
+    anywhere = vendor("anywhere")
+    assert assignments([booking("job", "400001")], [anywhere]) == {"job": "anywhere"}
+
+
+def test_in_area_vendor_preferred_over_anywhere_vendor():
+    vendors = [vendor("anywhere", rating=5.0, total_reviews=10), vendor("mumbai", pincodes=["400001"])]
+    assert assignments([booking("job", "400001")], vendors) == {"job": "mumbai"}
+
+
+def test_vendor_gets_one_booking_per_slot():
+    mumbai = vendor("mumbai", pincodes=["400001"])
+    plan = assignments([booking("first", "400001"), booking("second", "400002")], [mumbai])
+    assert len(plan) == 1
+
+
+def test_busy_vendor_is_skipped():
+    vendors = [vendor("busy", pincodes=["400001"]), vendor("free", pincodes=["400001"])]
+    server.availability_index.reserve("busy", MONDAY, SLOT)
+    assert assignments([booking("job", "400001")], vendors) == {"job": "free"}
+
+
+def test_unavailable_day_and_unoffered_service_are_infeasible():
+    weekday_only = vendor("weekdays")
+    weekday_only["availability"] = {"days": ["mon", "tue"], "slots": server.TIME_SLOTS}
+    sunday = booking("sunday-job", "400001", booking_date="2026-11-08")
+    cook = booking("cook-job", "400001", service="Cook")
+    assert assignments([sunday, cook], [weekday_only]) == {}
+
+
+def test_load_spreads_bookings_across_equal_vendors():
+    vendors = [vendor("a"), vendor("b")]
+    plan = assignments([booking("job", "400001")], vendors, loads={"a": 5})
+    assert plan == {"job": "b"}
+
+
+def test_tick_skips_bookings_whose_date_has_passed(run, db, insert_booking):
+    today = date.today()
+    past = insert_booking(booking_date=(today - timedelta(days=7)).isoformat(), vendor_id=None)
+    upcoming = insert_booking(booking_date=(today + timedelta(days=7)).isoformat(), vendor_id=None)
+    run(db.service_providers.insert_one({**vendor("anywhere"), "id": "p-anywhere"}))
+    result = run(server.AssignmentScheduler().tick())
+    assert (result["bookings_scanned"], result["assigned"]) == (1, 1)
+    statuses = {booking["id"]: booking["status"] for booking in run(db.bookings.find().to_list(None))}
+    assert statuses == {past["id"]: "pending", upcoming["id"]: "assigned"}
+    slots = run(db.vendor_slots.find({}, {"_id": 0, "booking_id": 1}).to_list(None))
+    assert slots == [{"booking_id": upcoming["id"]}]
@@ -0,0 +1,100 @@
+import time
+
+import jwt
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+
+import server
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(server.time, "monotonic", clock)
+    return clock
+
+
+def credentials(token):
+    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+
+def token_for(user_id, seconds_left):
+    payload = {"user_id": user_id, "email": f"{user_id}@example.com", "role": "customer",
+               "exp": int(time.time() + seconds_left)}
+    return jwt.encode(payload, server.JWT_SECRET, algorithm=server.JWT_ALGORITHM)
+
+
+def test_vendor_role_flip_is_visible_to_the_next_request(run, db):
+    registered = run(server.register(server.UserRegister(
+        email="flip@example.com", full_name="Flip", phone="9000000000", password="secret123",
+    )))
+    user = run(server.get_current_user(credentials(registered.token)))
+    assert user["role"] == "customer"
+    profile = server.ServiceProviderCreate(services=["Plumber"], experience_years=2, bio="")
+    run(server.create_vendor_profile(profile, current_user=user))
+    # Same token, which still says "customer": the cached principal must not
+    user = run(server.get_current_user(credentials(registered.token)))
+    assert run(server.get_vendor_user(user))["role"] == "vendor"
+
+
+def test_principal_is_cached_between_requests(run, db):
+    run(db.users.insert_one({"id": "u1", "email": "u1@example.com", "role": "customer"}))
+    token = token_for("u1", 3600)
+    run(server.get_current_user(credentials(token)))
+    run(db.users.update_one({"id": "u1"}, {"$set": {"role": "admin"}}))
+    assert run(server.get_current_user(credentials(token)))["role"] == "customer"
+    server.invalidate_principal("u1")
+    assert run(server.get_current_user(credentials(token)))["role"] == "admin"
+
+
+def test_cached_principal_is_a_copy(run, db):
+    run(db.users.insert_one({"id": "u1", "email": "u1@example.com", "role": "customer"}))
+    token = token_for("u1", 3600)
+    run(server.get_current_user(credentials(token)))["role"] = "admin"
+    assert run(server.get_current_user(credentials(token)))["role"] == "customer"
+
+
+def test_token_ttl_is_clamped_to_its_expiry(clock):
+    token = token_for("u1", 30)
+    server.decode_token_cached(token)
+    [(expires_at, _)] = server.token_cache._entries.values()
+    assert expires_at - clock.now <= 30
+    clock.now += 31
+    assert server.token_cache.get(next(iter(server.token_cache._entries))) is None
+
+
+def test_long_lived_token_uses_the_cache_ttl(clock):
+    server.decode_token_cached(token_for("u1", 3600))
+    [(expires_at, _)] = server.token_cache._entries.values()
+    assert expires_at - clock.now == pytest.approx(server.TOKEN_CACHE_TTL)
+
+
+def test_invalid_token_is_not_cached():
+    with pytest.raises(HTTPException) as raised:
+        server.decode_token_cached("not-a-token")
+    assert raised.value.status_code == 401
+    assert server.token_cache.stats()["size"] == 0
+
+
+def test_lru_eviction_and_counters(clock):
+    cache = server.TTLCache(2, 10)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1      # a is now most recently used
+    cache.set("c", 3)               # evicts b
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    clock.now += 10
+    assert cache.get("a") is None   # expired
+    assert cache.stats() == {
+        "size": 1, "maxsize": 2, "hits": 3, "misses": 2, "evictions": 1, "hit_ratio": 0.6,
+    }
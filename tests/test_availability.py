@@ -0,0 +1,119 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+import server
+
+MONDAY = "2026-11-02"
+SLOT = server.TIME_SLOTS[0]
+
+
+@pytest.fixture(autouse=True)
+def indexes(run, db):
+    run(server.ensure_indexes())
+
+
+def reservations(run, db):
+    return sorted(
+        (slot["vendor_id"], slot["booking_id"])
+        for slot in run(db.vendor_slots.find({}, {"_id": 0}).to_list(None))
+    )
+
+
+def test_second_booking_in_the_same_slot_conflicts(run, db, insert_booking):
+    first, second = insert_booking(), insert_booking()
+    assert run(server.reserve_vendor_slot(first["id"], "v1"))["booking_id"] == first["id"]
+    with pytest.raises(HTTPException) as raised:
+        run(server.reserve_vendor_slot(second["id"], "v1"))
+    assert raised.value.status_code == 409
+    assert reservations(run, db) == [("v1", first["id"])]
+    assert server.availability_index.busy == {(MONDAY, SLOT): {"v1"}}
+
+
+def test_reserving_again_for_the_same_booking_is_a_no_op(run, db, insert_booking):
+    booking = insert_booking()
+    run(server.reserve_vendor_slot(booking["id"], "v1"))
+    assert run(server.reserve_vendor_slot(booking["id"], "v1")) is None
+    assert reservations(run, db) == [("v1", booking["id"])]
+
+
+def test_other_slots_and_vendors_do_not_conflict(run, db, insert_booking):
+    first = insert_booking()
+    later = insert_booking(time_slot=server.TIME_SLOTS[1])
+    run(server.reserve_vendor_slot(first["id"], "v1"))
+    run(server.reserve_vendor_slot(later["id"], "v1"))
+    run(server.reserve_vendor_slot(first["id"], "v2"))
+    assert len(reservations(run, db)) == 3
+
+
+def test_failed_assignment_rolls_back_the_reservation(run, db, insert_booking):
+    booking = insert_booking(status="completed")
+    with pytest.raises(HTTPException) as raised:
+        run(server.update_booking(
+            booking["id"], server.BookingUpdate(status="assigned", vendor_id="v1"), current_user={"id": "admin"}
+        ))
+    assert raised.value.status_code == 409
+    assert reservations(run, db) == []
+    assert server.availability_index.busy == {}
+
+
+def test_reassignment_releases_the_previous_vendor(run, db, insert_booking):
+    booking = insert_booking()
+    assign = server.BookingUpdate(status="assigned", vendor_id="v1")
+    run(server.update_booking(booking["id"], assign, current_user={"id": "admin"}))
+    run(server.update_booking(booking["id"], server.BookingUpdate(vendor_id="v2"), current_user={"id": "admin"}))
+    assert reservations(run, db) == [("v2", booking["id"])]
+    assert server.availability_index.busy == {(MONDAY, SLOT): {"v2"}}
+
+
+def test_cancelling_frees_the_slot(run, db, insert_booking):
+    booking = insert_booking()
+    run(server.update_booking(
+        booking["id"], server.BookingUpdate(status="assigned", vendor_id="v1"), current_user={"id": "admin"}
+    ))
+    run(server.update_booking(booking["id"], server.BookingUpdate(status="cancelled"), current_user={"id": "admin"}))
+    assert reservations(run, db) == []
+    assert server.availability_index.busy == {}
+
+
+def test_free_vendors_excludes_busy_and_off_duty_vendors():
+    index = server.availability_index
+    for vendor_id, days in [("v1", ["mon"]), ("v2", ["mon"]), ("v3", ["tue"])]:
+        index.upsert_vendor({
+            "user_id": vendor_id, "services": ["Plumber"], "approval_status": "approved",
+            "availability": {"days": days, "slots": [SLOT]},
+        })
+    index.upsert_vendor({"user_id": "v4", "services": ["Plumber"], "approval_status": "pending"})
+    index.reserve("v2", MONDAY, SLOT)
+    assert index.free_vendors("Plumber", MONDAY, SLOT) == {"v1"}
+    index.release("v2", MONDAY, SLOT)
+    assert index.free_vendors("Plumber", MONDAY, SLOT) == {"v1", "v2"}
+
+
+def test_concurrent_reassignments_keep_the_winners_reservation(run, db, insert_booking, monkeypatch):
+    booking = insert_booking()
+    run(server.update_booking(
+        booking["id"], server.BookingUpdate(status="assigned", vendor_id="a"), current_user={"id": "admin"}
+    ))
+    reserve = server.reserve_vendor_slot
+
+    async def interleave():
+        both_reserved = asyncio.Barrier(2)
+
+        async def reserve_then_wait(booking_id, vendor_id):
+            # Both requests hold their new reservation before either writes the booking
+            reservation = await reserve(booking_id, vendor_id)
+            await both_reserved.wait()
+            return reservation
+
+        monkeypatch.setattr(server, "reserve_vendor_slot", reserve_then_wait)
+        await asyncio.gather(*(
+            server.update_booking(booking["id"], server.BookingUpdate(vendor_id=vendor_id), current_user={"id": "admin"})
+            for vendor_id in ("b", "c")
+        ))
+
+    run(interleave())
+    winner = run(db.bookings.find_one({"id": booking["id"]}))["vendor_id"]
+    assert reservations(run, db) == [(winner, booking["id"])]
+    assert server.availability_index.busy == {(MONDAY, SLOT): {winner}}
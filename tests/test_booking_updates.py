@@ -0,0 +1,78 @@
+import pytest
+from fastapi import HTTPException
+
+import server
+
+
+def update(run, booking_id, **fields):
+    return run(server.update_booking(booking_id, server.BookingUpdate(**fields), current_user={"id": "admin"}))
+
+
+@pytest.mark.parametrize("path", [
+    ["assigned", "confirmed", "in_progress", "completed"],
+    ["confirmed", "in_progress", "completed"],
+    ["cancelled"],
+    ["assigned", "cancelled"],
+])
+def test_allowed_paths(run, db, insert_booking, path):
+    booking = insert_booking()
+    for status in path:
+        assert update(run, booking["id"], status=status).status == status
+    assert run(db.bookings.find_one({"id": booking["id"]}))["version"] == len(path)
+
+
+@pytest.mark.parametrize("start, target", [
+    ("pending", "completed"),
+    ("pending", "in_progress"),
+    ("completed", "cancelled"),
+    ("cancelled", "confirmed"),
+    ("in_progress", "assigned"),
+])
+def test_disallowed_transition_is_409(run, insert_booking, start, target):
+    booking = insert_booking(status=start)
+    with pytest.raises(HTTPException) as raised:
+        update(run, booking["id"], status=target)
+    assert raised.value.status_code == 409
+    assert f"from '{start}' to '{target}'" in raised.value.detail
+
+
+def test_setting_the_same_status_is_allowed(run, insert_booking):
+    booking = insert_booking(status="confirmed")
+    assert update(run, booking["id"], status="confirmed").status == "confirmed"
+
+
+def test_unknown_status_is_400(run, insert_booking):
+    booking = insert_booking()
+    with pytest.raises(HTTPException) as raised:
+        update(run, booking["id"], status="teleported")
+    assert raised.value.status_code == 400
+
+
+def test_stale_version_is_409(run, db, insert_booking):
+    booking = insert_booking()
+    update(run, booking["id"], status="confirmed", version=0)
+    with pytest.raises(HTTPException) as raised:
+        update(run, booking["id"], status="cancelled", version=0)
+    assert raised.value.status_code == 409
+    assert raised.value.detail == "Booking was modified by another request"
+    assert run(db.bookings.find_one({"id": booking["id"]}))["status"] == "confirmed"
+
+
+def test_unversioned_booking_counts_as_version_zero(run, db, insert_booking):
+    booking = insert_booking()
+    run(db.bookings.update_one({"id": booking["id"]}, {"$unset": {"version": ""}}))
+    assert update(run, booking["id"], status="confirmed", version=0).version == 1
+
+
+def test_missing_booking_is_404(run, db):
+    with pytest.raises(HTTPException) as raised:
+        update(run, "nope", status="confirmed")
+    assert raised.value.status_code == 404
+
+
+def test_status_change_moves_dashboard_counters(run, db, insert_booking):
+    booking = insert_booking()
+    run(db.stats.insert_one({"_id": server.STATS_ID, "bookings_by_status": {"pending": 1}}))
+    update(run, booking["id"], status="cancelled")
+    counts = run(db.stats.find_one({"_id": server.STATS_ID}))["bookings_by_status"]
+    assert counts == {"pending": 0, "cancelled": 1}
@@ -0,0 +1,30 @@
+import server
+
+ITEM = {
+    "service_name": "Plumber",
+    "service_category": "repair-maintenance",
+    "booking_date": "2026-11-02",
+    "time_slot": server.TIME_SLOTS[0],
+    "location": "12, MG Road",
+    "pincode": "560001",
+    "description": "Leaking tap",
+    "estimated_price": 500.0,
+}
+
+
+def test_openapi_documents_booking_items():
+    spec = server.app.openapi()
+    body = spec["paths"]["/api/bookings/bulk"]["post"]["requestBody"]["content"]["application/json"]["schema"]
+    assert body["type"] == "array"
+    assert body["items"] == {"$ref": "#/components/schemas/BookingCreate"}
+    assert body["maxItems"] == server.BULK_BOOKING_MAX
+    assert "BookingCreate" in spec["components"]["schemas"]
+
+
+def test_invalid_items_fail_individually(run, db):
+    items = [ITEM, {**ITEM, "estimated_price": "lots"}, "not an object", {"service_name": "Cook"}]
+    response = run(server.create_bookings_bulk(items, current_user={"id": "customer-1"}))
+    assert (response.created, response.failed) == (1, 3)
+    assert [result.ok for result in response.results] == [True, False, False, False]
+    assert "estimated_price" in response.results[1].error
+    assert run(db.bookings.count_documents({})) == 1
@@ -0,0 +1,45 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import server
+
+CATEGORIES = [
+    {"id": "1", "slug": "repair-maintenance", "name": "Repair & Maintenance", "services": ["Plumber", "Electrician"]},
+    {"id": "2", "slug": "cleaning", "name": "Cleaning", "services": ["Deep Cleaning"]},
+]
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(server, "catalog", server.CatalogSnapshot(1, CATEGORIES))
+    return TestClient(server.app)
+
+
+def test_category_etag_revalidates(client):
+    first = client.get("/api/services/search", params={"category": "cleaning"})
+    assert first.status_code == 200
+    assert [category["slug"] for category in first.json()] == ["cleaning"]
+    again = client.get(
+        "/api/services/search", params={"category": "cleaning"}, headers={"If-None-Match": first.headers["etag"]}
+    )
+    assert again.status_code == 304
+
+
+def test_weak_if_none_match_still_revalidates(client):
+    etag = client.get("/api/services/categories").headers["etag"]
+    response = client.get("/api/services/categories", headers={"If-None-Match": f"W/{etag}, \"other\""})
+    assert response.status_code == 304
+
+
+@pytest.mark.parametrize("slug", ["中", "no-such-category", "a\"b"])
+def test_unknown_category_is_an_empty_list(client, slug):
+    response = client.get("/api/services/search", params={"category": slug})
+    assert response.status_code == 200
+    assert response.json() == []
+    assert response.headers["etag"] == server.EMPTY_CATEGORY[1]
+
+
+def test_category_etags_differ_per_slug(client):
+    etags = {client.get("/api/services/search", params={"category": slug}).headers["etag"]
+             for slug in ("cleaning", "repair-maintenance")}
+    assert len(etags) == 2
@@ -0,0 +1,82 @@
+import logging
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import server
+
+
+def fake_command(request_id: int, collection: str = "bookings"):
+    """Feed the command listener one successful find, as pymongo would."""
+    event = SimpleNamespace(
+        command_name="find",
+        command={"find": collection, "filter": {"id": "x"}},
+        connection_id=("localhost", 27017),
+        request_id=request_id,
+        duration_micros=250,
+        reply={"cursor": {"firstBatch": [{}]}},
+    )
+    server.mongo_command_metrics.started(event)
+    server.mongo_command_metrics.succeeded(event)
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    registry = server.MetricsRegistry()
+    monkeypatch.setattr(server, "metrics", registry)
+    monkeypatch.setattr(server, "DEBUG", True)
+    return registry
+
+
+@pytest.fixture
+def client(registry):
+    app = FastAPI()
+
+    @app.get("/work/{commands}")
+    @server.db_budget(2)
+    async def work(commands: int):
+        for request_id in range(commands):
+            fake_command(request_id)
+        return {"ok": True}
+
+    app.add_middleware(server.MetricsMiddleware)
+    return TestClient(app)
+
+
+def exceeded(registry):
+    return registry.counters.get(("db_budget_exceeded_total", (("method", "GET"), ("route", "/work/{commands}"))), 0)
+
+
+def test_within_budget(client, registry, caplog):
+    with caplog.at_level(logging.WARNING, logger="server"):
+        response = client.get("/work/2")
+    assert response.headers["x-db-calls"] == "2"
+    assert response.headers["x-db-budget"] == "2"
+    assert exceeded(registry) == 0
+    assert not [record for record in caplog.records if "budget" in record.getMessage()]
+
+
+def test_over_budget_is_logged_and_counted(client, registry, caplog):
+    with caplog.at_level(logging.WARNING, logger="server"):
+        response = client.get("/work/3")
+    assert response.headers["x-db-calls"] == "3"
+    assert response.headers["x-db-budget"] == "2"
+    assert exceeded(registry) == 1
+    [warning] = [record.getMessage() for record in caplog.records if "budget" in record.getMessage()]
+    assert "GET /work/{commands} issued 3 Mongo commands (budget 2)" in warning
+    assert "find bookings" in warning
+
+
+def test_headers_are_debug_only(client, monkeypatch):
+    monkeypatch.setattr(server, "DEBUG", False)
+    response = client.get("/work/3")
+    assert "x-db-calls" not in response.headers
+    assert "x-db-budget" not in response.headers
+
+
+def test_commands_outside_a_request_are_not_attributed(client, registry):
+    fake_command(99)
+    response = client.get("/work/0")
+    assert response.headers["x-db-calls"] == "0"
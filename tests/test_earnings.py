@@ -0,0 +1,90 @@
+from datetime import date
+
+import server
+
+PAID = {"status": "completed", "payment_status": "paid", "booking_date": "2026-11-04", "final_price": 800.0}
+
+
+def buckets(run, db):
+    rows = run(db.earnings_daily.find({}, {"_id": 0}).to_list(None))
+    return {(row["vendor_id"], row["day"]): (row["total"], row["count"]) for row in rows}
+
+
+def seed_days(run, db, days, vendor_id="vendor-1"):
+    run(db.earnings_daily.insert_many([
+        {"vendor_id": vendor_id, "day": day, "total": total, "count": 1} for day, total in days.items()
+    ]))
+
+
+def test_paying_a_booking_adds_to_its_service_day(run, db):
+    run(server.apply_earnings_delta({**PAID, "payment_status": "pending", "vendor_id": "vendor-1"}, {**PAID, "vendor_id": "vendor-1"}))
+    assert buckets(run, db) == {("vendor-1", "2026-11-04"): (800.0, 1)}
+
+
+def test_reassigning_a_paid_booking_moves_its_earnings(run, db):
+    booking = {**PAID, "vendor_id": "vendor-1"}
+    run(server.apply_earnings_delta({}, booking))
+    run(server.apply_earnings_delta(booking, {**booking, "vendor_id": "vendor-2"}))
+    assert buckets(run, db) == {
+        ("vendor-1", "2026-11-04"): (0.0, 0),
+        ("vendor-2", "2026-11-04"): (800.0, 1),
+    }
+
+
+def test_unpaying_a_booking_removes_its_earnings(run, db):
+    booking = {**PAID, "vendor_id": "vendor-1"}
+    run(server.apply_earnings_delta({}, booking))
+    run(server.apply_earnings_delta(booking, {**booking, "payment_status": "refunded"}))
+    assert buckets(run, db) == {("vendor-1", "2026-11-04"): (0.0, 0)}
+
+
+def test_repricing_a_paid_booking_adjusts_the_total_only(run, db):
+    booking = {**PAID, "vendor_id": "vendor-1"}
+    run(server.apply_earnings_delta({}, booking))
+    run(server.apply_earnings_delta(booking, {**booking, "final_price": 950.0}))
+    assert buckets(run, db) == {("vendor-1", "2026-11-04"): (950.0, 1)}
+
+
+def test_unrelated_edit_writes_nothing(run, db):
+    booking = {**PAID, "vendor_id": "vendor-1"}
+    run(server.apply_earnings_delta(booking, {**booking, "notes": "ring twice"}))
+    assert buckets(run, db) == {}
+
+
+def test_weekly_buckets_start_on_iso_monday(run, db):
+    # 2026-11-01 is a Sunday, 2026-11-02 a Monday
+    seed_days(run, db, {"2026-11-01": 100.0, "2026-11-02": 200.0, "2026-11-08": 300.0, "2026-11-09": 400.0})
+    series = run(server.earnings_series("vendor-1", date(2026, 10, 26), date(2026, 11, 15), "week"))
+    assert series == [
+        {"period": "2026-10-26", "total": 100.0, "count": 1},
+        {"period": "2026-11-02", "total": 500.0, "count": 2},
+        {"period": "2026-11-09", "total": 400.0, "count": 1},
+    ]
+
+
+def test_monthly_buckets_roll_over_the_year(run, db):
+    seed_days(run, db, {"2026-11-30": 100.0, "2026-12-01": 200.0, "2026-12-31": 300.0, "2027-01-01": 400.0})
+    series = run(server.earnings_series("vendor-1", date(2026, 11, 1), date(2027, 2, 28), "month"))
+    assert series == [
+        {"period": "2026-11-01", "total": 100.0, "count": 1},
+        {"period": "2026-12-01", "total": 500.0, "count": 2},
+        {"period": "2027-01-01", "total": 400.0, "count": 1},
+        {"period": "2027-02-01", "total": 0.0, "count": 0},
+    ]
+
+
+def test_partial_first_period_is_zero_filled_and_clipped_to_the_range(run, db):
+    # The range starts on a Wednesday; Monday's earnings fall before it
+    seed_days(run, db, {"2026-11-02": 999.0, "2026-11-05": 50.0})
+    series = run(server.earnings_series("vendor-1", date(2026, 11, 4), date(2026, 11, 20), "week"))
+    assert series == [
+        {"period": "2026-11-02", "total": 50.0, "count": 1},
+        {"period": "2026-11-09", "total": 0.0, "count": 0},
+        {"period": "2026-11-16", "total": 0.0, "count": 0},
+    ]
+
+
+def test_series_ignores_other_vendors(run, db):
+    seed_days(run, db, {"2026-11-04": 100.0}, vendor_id="vendor-2")
+    series = run(server.earnings_series("vendor-1", date(2026, 11, 4), date(2026, 11, 4), "day"))
+    assert series == [{"period": "2026-11-04", "total": 0.0, "count": 0}]
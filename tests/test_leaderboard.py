@@ -0,0 +1,71 @@
+import server
+
+
+def profile(user_id, rating=0.0, total_reviews=0, services=("Plumber",), **extra):
+    return {
+        "id": f"p-{user_id}", "user_id": user_id, "services": list(services), "experience_years": 3, "bio": "",
+        "approval_status": "approved", "rating": rating, "rating_sum": rating * total_reviews,
+        "total_reviews": total_reviews, **extra,
+    }
+
+
+def top(service="Plumber", k=10):
+    return [vendor["user_id"] for vendor in server.leaderboard_index.top(service, k)]
+
+
+def test_smoothed_rating_ranks_many_good_reviews_above_one_perfect_one():
+    board = server.leaderboard_index
+    board.upsert_vendor(profile("one-review", rating=5.0, total_reviews=1))
+    board.upsert_vendor(profile("veteran", rating=4.6, total_reviews=80))
+    board.upsert_vendor(profile("new"))
+    board.upsert_vendor(profile("poor", rating=2.0, total_reviews=30))
+    assert top() == ["veteran", "one-review", "new", "poor"]
+    assert top(k=2) == ["veteran", "one-review"]
+
+
+def test_ties_break_on_review_count_then_id():
+    board = server.leaderboard_index
+    for user_id in ("b", "a"):
+        board.upsert_vendor(profile(user_id))
+    assert top() == ["a", "b"]
+
+
+def test_vendor_appears_on_each_of_its_services():
+    server.leaderboard_index.upsert_vendor(profile("both", services=("Plumber", "Electrician")))
+    assert top("Plumber") == top("Electrician") == ["both"]
+
+
+def test_unapproved_update_removes_the_vendor():
+    board = server.leaderboard_index
+    board.upsert_vendor(profile("v"))
+    board.upsert_vendor(profile("v", approval_status="rejected"))
+    assert top() == []
+    assert board.boards["Plumber"] == []
+
+
+def test_body_keeps_only_declared_fields():
+    server.leaderboard_index.upsert_vendor(profile("v", ratings_rebuild="stamp", password_hash="x"))
+    [body] = server.leaderboard_index.top("Plumber", 1)
+    assert "ratings_rebuild" not in body and "password_hash" not in body
+    assert set(body) <= server.VENDOR_SHAPE.fields | {"score"}
+
+
+def test_reject_route_drops_vendor_and_approve_does_not_leak_fields(run, db):
+    run(db.service_providers.insert_one({**profile("v", ratings_rebuild="stamp"), "approval_status": "pending"}))
+    run(server.set_vendor_approval("p-v", "approved"))
+    [body] = server.leaderboard_index.top("Plumber", 1)
+    assert "ratings_rebuild" not in body
+    run(server.set_vendor_approval("p-v", "rejected"))
+    assert top() == []
+
+
+def test_review_reranks_the_vendor(run, db, insert_booking):
+    run(server.ensure_indexes())
+    for vendor in (profile("leader", rating=4.0, total_reviews=2), profile("chaser", rating=4.0, total_reviews=1)):
+        run(db.service_providers.insert_one(dict(vendor)))
+        server.leaderboard_index.upsert_vendor(vendor)
+    assert top() == ["leader", "chaser"]
+    booking = insert_booking(status="completed", vendor_id="chaser")
+    review = server.ReviewCreate(booking_id=booking["id"], rating=5, comment="Great")
+    run(server.create_review(review, current_user={"id": "customer-1"}))
+    assert top() == ["chaser", "leader"]
@@ -0,0 +1,104 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import server
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    registry = server.MetricsRegistry()
+    monkeypatch.setattr(server, "metrics", registry)
+    return registry
+
+
+def test_histogram_buckets_are_cumulative(registry):
+    registry.describe("latency_seconds", "histogram", "Latency")
+    for value in (0.0005, 0.003, 0.003, 20.0):
+        registry.observe("latency_seconds", (("route", "/a"),), value)
+    lines = registry.render().splitlines()
+    assert lines[:2] == ["# HELP latency_seconds Latency", "# TYPE latency_seconds histogram"]
+    buckets = [line for line in lines if line.startswith("latency_seconds_bucket")]
+    assert len(buckets) == len(server.LATENCY_BUCKETS) + 1
+    assert 'latency_seconds_bucket{route="/a",le="0.001"} 1' in buckets
+    assert 'latency_seconds_bucket{route="/a",le="0.0025"} 1' in buckets
+    assert 'latency_seconds_bucket{route="/a",le="0.005"} 3' in buckets
+    assert 'latency_seconds_bucket{route="/a",le="10.0"} 3' in buckets
+    assert buckets[-1] == 'latency_seconds_bucket{route="/a",le="+Inf"} 4'
+    counts = [int(line.rsplit(" ", 1)[1]) for line in buckets]
+    assert counts == sorted(counts)
+    assert 'latency_seconds_count{route="/a"} 4' in lines
+    assert any(line.startswith('latency_seconds_sum{route="/a"} 20.006') for line in lines)
+
+
+def test_bucket_bound_is_inclusive(registry):
+    registry.observe("latency_seconds", (), 0.01)
+    assert 'latency_seconds_bucket{le="0.01"} 1' in registry.render().splitlines()
+
+
+def test_label_values_are_escaped(registry):
+    registry.inc("events_total", (("path", 'a\\b"c\nd'),))
+    assert 'events_total{path="a\\\\b\\"c\\nd"} 1' in registry.render().splitlines()
+
+
+def test_undescribed_metric_is_untyped_and_sorted(registry):
+    registry.inc("zeta_total")
+    registry.add_gauge("alpha", amount=3)
+    assert registry.render() == (
+        "# HELP alpha alpha\n# TYPE alpha untyped\nalpha 3\n"
+        "# HELP zeta_total zeta_total\n# TYPE zeta_total untyped\nzeta_total 1\n"
+    )
+
+
+def test_collectors_run_before_rendering(registry):
+    registry.collectors.append(lambda: registry.inc("collected_total"))
+    assert "collected_total 1" in registry.render().splitlines()
+
+
+@pytest.fixture
+def client(registry):
+    app = FastAPI()
+    seen = {}
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: str):
+        seen["in_flight"] = in_flight(registry)
+        return {"id": item_id}
+
+    @app.get("/boom")
+    async def boom():
+        raise RuntimeError("boom")
+
+    app.add_middleware(server.MetricsMiddleware)
+    client = TestClient(app, raise_server_exceptions=False)
+    client.seen = seen
+    return client
+
+
+def in_flight(registry):
+    return registry.gauges[("http_requests_in_flight", ())]
+
+
+def test_requests_are_labelled_by_route_template(client, registry):
+    client.get("/items/1")
+    client.get("/items/2")
+    labels = (("method", "GET"), ("route", "/items/{item_id}"))
+    assert registry.counters[("http_responses_total", labels + (("status", 200),))] == 2
+    assert sum(registry.histograms[("http_request_duration_seconds", labels)].counts) == 2
+    assert client.seen["in_flight"] == 1
+    assert in_flight(registry) == 0
+
+
+def test_unmatched_paths_share_one_label(client, registry):
+    client.get("/nope/1")
+    client.get("/nope/2")
+    labels = (("method", "GET"), ("route", "unmatched"), ("status", 404))
+    assert registry.counters[("http_responses_total", labels)] == 2
+    assert 'route="unmatched"' in registry.render()
+    assert "/nope" not in registry.render()
+
+
+def test_in_flight_gauge_recovers_after_an_exception(client, registry):
+    assert client.get("/boom").status_code == 500
+    assert in_flight(registry) == 0
+    assert registry.counters[("http_responses_total", (("method", "GET"), ("route", "/boom"), ("status", 500)))] == 1
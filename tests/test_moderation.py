@@ -0,0 +1,47 @@
+import server
+
+
+def seed_vendors(run, db, statuses):
+    run(db.service_providers.insert_many([
+        {"id": f"v{index}", "user_id": f"u{index}", "services": ["Plumber"], "experience_years": 5,
+         "approval_status": status}
+        for index, status in enumerate(statuses)
+    ]))
+    run(db.stats.insert_one({"_id": server.STATS_ID, "pending_vendors": statuses.count("pending")}))
+
+
+def moderate(run, **fields):
+    return run(server.moderate_vendors(server.VendorModeration(**fields), current_user={"role": "admin"}))
+
+
+def test_filter_mode_counts_every_match(run, db):
+    seed_vendors(run, db, ["pending", "pending", "approved"])
+    result = moderate(run, decision="approve", filter={"approval_status": "pending"})
+    assert (result["matched"], result["modified"]) == (2, 2)
+    assert run(db.stats.find_one({"_id": server.STATS_ID}))["pending_vendors"] == 0
+
+
+def test_id_mode_counts_each_vendor_once(run, db):
+    seed_vendors(run, db, ["pending", "approved", "rejected"])
+    result = moderate(run, decision="reject", vendor_ids=["v0", "v1", "v2", "missing"])
+    assert result["matched"] == 3
+    assert result["modified"] == 2
+    assert result["not_found"] == ["missing"]
+    assert run(db.stats.find_one({"_id": server.STATS_ID}))["pending_vendors"] == 0
+
+
+def test_moderation_updates_only_the_affected_vendors_in_the_indexes(run, db, monkeypatch):
+    seed_vendors(run, db, ["pending", "pending", "approved"])
+    run(db.service_providers.update_many({}, {"$set": {"home_pincode": "110001"}}))
+
+    async def no_full_reload():
+        raise AssertionError("moderation must not reload every vendor")
+
+    monkeypatch.setattr(server, "refresh_vendor_indexes", no_full_reload)
+    moderate(run, decision="approve", vendor_ids=["v0"])
+    assert set(server.availability_index.vendors) == {"u0"}
+    assert set(server.proximity_index.vendors) == {"u0"}
+    assert [vendor["user_id"] for vendor in server.leaderboard_index.top("Plumber", 10)] == ["u0"]
+    moderate(run, decision="reject", vendor_ids=["v0"])
+    assert server.leaderboard_index.top("Plumber", 10) == []
+    assert server.proximity_index.vendors == {}
@@ -0,0 +1,86 @@
+import base64
+
+import orjson
+import pytest
+from fastapi import HTTPException
+
+import server
+
+STAMP = "2026-10-01T12:00:00+00:00"
+
+
+def page(limit=2, after=None, stream=False):
+    return server.PageParams(limit=limit, after=after, stream=stream)
+
+
+@pytest.fixture
+def bookings(run, db):
+    # Three rows share one created_at, so only "id" orders them
+    docs = [{"id": f"b{index}", "created_at": STAMP} for index in range(3)]
+    docs += [{"id": "newest", "created_at": "2026-10-02T00:00:00+00:00"}, {"id": "oldest", "created_at": "2026-09-01T00:00:00+00:00"}]
+    run(db.bookings.insert_many(docs))
+    return db.bookings
+
+
+def walk(run, collection, limit):
+    ids, after, pages = [], None, 0
+    while True:
+        docs, after = run(server.fetch_page(collection, {}, page(limit, after)))
+        ids += [doc["id"] for doc in docs]
+        pages += 1
+        if after is None:
+            return ids, pages
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 5, 10])
+def test_pages_cover_every_row_once_newest_first(run, bookings, limit):
+    ids, pages = walk(run, bookings, limit)
+    assert ids == ["newest", "b2", "b1", "b0", "oldest"]
+    assert pages == max(1, -(-5 // limit))
+
+
+def test_cursor_between_rows_with_the_same_created_at(run, bookings):
+    docs, after = run(server.fetch_page(bookings, {}, page(2)))
+    assert [doc["id"] for doc in docs] == ["newest", "b2"]
+    assert server.decode_cursor(after) == (STAMP, "b2")
+    docs, _ = run(server.fetch_page(bookings, {}, page(2, after)))
+    assert [doc["id"] for doc in docs] == ["b1", "b0"]
+
+
+def test_cursor_round_trip():
+    cursor = server.encode_cursor({"created_at": STAMP, "id": "b1"})
+    assert "=" not in cursor
+    assert server.decode_cursor(cursor) == (STAMP, "b1")
+
+
+@pytest.mark.parametrize("cursor", [
+    "!!!",
+    base64.urlsafe_b64encode(b"not json").decode(),
+    base64.urlsafe_b64encode(b"\xff\xfe").decode(),
+    base64.urlsafe_b64encode(b'["only one"]').decode(),
+    base64.urlsafe_b64encode(b"42").decode(),
+])
+def test_malformed_cursor_is_400(cursor):
+    with pytest.raises(HTTPException) as raised:
+        server.decode_cursor(cursor)
+    assert raised.value.status_code == 400
+
+
+def test_page_response_sets_next_cursor_only_when_more_rows_exist(run, bookings):
+    response = run(server.paginate(bookings, {}, page(4), server.BOOKING_SHAPE))
+    cursor = response.headers["x-next-cursor"]
+    response = run(server.paginate(bookings, {}, page(4, cursor), server.BOOKING_SHAPE))
+    assert "x-next-cursor" not in response.headers
+    assert [row["id"] for row in orjson.loads(response.body)] == ["oldest"]
+
+
+def test_stream_yields_every_row_from_the_cursor_as_ndjson(run, bookings):
+    _, after = run(server.fetch_page(bookings, {}, page(1)))
+    response = run(server.paginate(bookings, {}, page(1, after, stream=True), server.BOOKING_SHAPE))
+    assert response.media_type == "application/x-ndjson"
+
+    async def body():
+        return b"".join([chunk async for chunk in response.body_iterator])
+
+    lines = run(body()).splitlines()
+    assert [orjson.loads(line)["id"] for line in lines] == ["b2", "b1", "b0", "oldest"]
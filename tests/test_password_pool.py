@@ -0,0 +1,88 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+import pytest
+from fastapi import HTTPException
+
+import server
+
+
+@pytest.fixture
+def small_pool(monkeypatch):
+    """One worker and one queue slot, so the third concurrent job is rejected."""
+    executor = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(server, "password_executor", executor)
+    monkeypatch.setattr(server, "BCRYPT_WORKERS", 1)
+    monkeypatch.setattr(server, "BCRYPT_MAX_QUEUE", 1)
+    yield
+    executor.shutdown(wait=True)
+
+
+def test_saturated_pool_rejects_fast_with_retry_after(run, small_pool):
+    release = threading.Event()
+
+    async def scenario():
+        held = [asyncio.ensure_future(server.run_password_job(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0)
+        assert server._password_jobs == 2
+        with pytest.raises(HTTPException) as raised:
+            await server.run_password_job(release.wait)
+        release.set()
+        await asyncio.gather(*held)
+        return raised.value
+
+    error = run(scenario())
+    assert error.status_code == 503
+    assert error.headers == {"Retry-After": "1"}
+    assert server._password_jobs == 0
+
+
+def test_failed_job_frees_its_slot(run, small_pool):
+    def boom():
+        raise ValueError("bad hash")
+
+    with pytest.raises(ValueError):
+        run(server.run_password_job(boom))
+    assert server._password_jobs == 0
+
+
+def seed_user(run, db, cost):
+    hashed = bcrypt.hashpw(b"secret123", bcrypt.gensalt(cost)).decode()
+    run(db.users.insert_one({
+        "id": "u1", "email": "u1@example.com", "full_name": "U", "phone": "9000000000", "role": "customer",
+        "password_hash": hashed, "created_at": "2026-01-01T00:00:00+00:00",
+    }))
+    return hashed
+
+
+def login(run):
+    return run(server.login(server.UserLogin(email="u1@example.com", password="secret123")))
+
+
+def test_login_upgrades_a_cheaper_hash(run, db, monkeypatch):
+    old_hash = seed_user(run, db, 4)
+    monkeypatch.setattr(server, "BCRYPT_ROUNDS", 5)
+    login(run)
+    new_hash = run(db.users.find_one({"id": "u1"}))["password_hash"]
+    assert new_hash != old_hash and new_hash.startswith("$2b$05$")
+    assert bcrypt.checkpw(b"secret123", new_hash.encode())
+
+
+def test_login_leaves_a_current_hash_alone(run, db):
+    old_hash = seed_user(run, db, server.BCRYPT_ROUNDS)
+    login(run)
+    assert run(db.users.find_one({"id": "u1"}))["password_hash"] == old_hash
+
+
+def test_upgrade_is_skipped_when_the_pool_is_saturated(run, db, monkeypatch):
+    old_hash = seed_user(run, db, 4)
+    monkeypatch.setattr(server, "BCRYPT_ROUNDS", 5)
+
+    async def saturated(password):
+        raise HTTPException(status_code=503, detail="Server busy, please try again", headers={"Retry-After": "1"})
+
+    monkeypatch.setattr(server, "hash_password_async", saturated)
+    assert login(run).token
+    assert run(db.users.find_one({"id": "u1"}))["password_hash"] == old_hash
@@ -0,0 +1,64 @@
+import math
+import random
+
+import pytest
+
+import server
+
+
+def random_points(rng, count):
+    return [server.unit_vector((rng.uniform(-90, 90), rng.uniform(-180, 180))) for _ in range(count)]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_within_matches_brute_force(seed):
+    rng = random.Random(seed)
+    points = random_points(rng, 500)
+    tree = server.KDTree(points)
+    for center in random_points(rng, 20):
+        radius = rng.uniform(0.01, 1.5)
+        expected = {index for index, point in enumerate(points) if math.dist(center, point) <= radius}
+        found = tree.within(center, radius)
+        assert {index for index, _ in found} == expected
+        assert all(chord == pytest.approx(math.dist(center, points[index])) for index, chord in found)
+
+
+def test_within_includes_points_exactly_on_the_radius():
+    points = [(1.0, 0.0, 0.0), (0.0, 1.0, 0.0), (0.0, 0.0, 1.0)]
+    tree = server.KDTree(points)
+    assert sorted(index for index, _ in tree.within((1.0, 0.0, 0.0), math.dist(points[0], points[1]))) == [0, 1, 2]
+
+
+def test_empty_tree():
+    assert server.KDTree([]).within((1.0, 0.0, 0.0), 2.0) == []
+
+
+def test_chord_and_km_round_trip():
+    for km in (0.0, 1.0, 25.0, 1000.0, 20000.0):
+        assert server.km_for_chord(server.chord_for_km(km)) == pytest.approx(km, abs=1e-6)
+
+
+def test_nearest_filters_by_radius_and_service():
+    index = server.proximity_index
+    profiles = [
+        ("delhi", "110001", ["Plumber"], 4.0),
+        ("delhi-cook", "110001", ["Cook"], 5.0),
+        ("mumbai", "400001", ["Plumber"], 5.0),
+    ]
+    for vendor_id, pincode, services, rating in profiles:
+        index.upsert_vendor({
+            "user_id": vendor_id, "home_pincode": pincode, "services": services,
+            "rating": rating, "approval_status": "approved",
+        })
+    delhi = server.pincode_location("110001")
+    assert [vendor_id for vendor_id, _ in index.nearest(delhi, 50, "Plumber")] == ["delhi"]
+    assert [vendor_id for vendor_id, _ in index.nearest(delhi, 2000, "Plumber")] == ["delhi", "mumbai"]
+    assert [vendor_id for vendor_id, _ in index.nearest(delhi, 50)] == ["delhi-cook", "delhi"]
+
+
+def test_unapproved_vendor_is_dropped():
+    index = server.proximity_index
+    profile = {"user_id": "v", "home_pincode": "110001", "services": ["Plumber"], "approval_status": "approved"}
+    index.upsert_vendor(profile)
+    index.upsert_vendor(dict(profile, approval_status="rejected"))
+    assert index.nearest(server.pincode_location("110001"), 50) == []
@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+
+import server
+
+
+class Loader:
+    """Counts loads; each one waits for ``release`` so callers can overlap."""
+
+    def __init__(self):
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.calls += 1
+        await self.release.wait()
+        return f"value-{self.calls}"
+
+
+def test_concurrent_misses_share_one_load(run):
+    cache = server.QueryCache(100, 60)
+
+    async def scenario():
+        loader = Loader()
+        readers = [asyncio.ensure_future(cache.get_or_load(("vendors", None), (), loader)) for _ in range(5)]
+        await asyncio.sleep(0)
+        loader.release.set()
+        return loader, await asyncio.gather(*readers)
+
+    loader, values = run(scenario())
+    assert loader.calls == 1
+    assert values == ["value-1"] * 5
+    assert (cache.loads, cache.coalesced) == (1, 4)
+
+
+def test_hit_after_load(run):
+    cache = server.QueryCache(100, 60)
+    loader = Loader()
+    loader.release.set()
+    assert run(cache.get_or_load("group", (1,), loader)) == "value-1"
+    assert run(cache.get_or_load("group", (1,), loader)) == "value-1"
+    assert run(cache.get_or_load("group", (2,), loader)) == "value-2"
+    assert loader.calls == 2
+
+
+def test_invalidate_drops_every_variant_of_a_group(run):
+    cache = server.QueryCache(100, 60)
+    loader = Loader()
+    loader.release.set()
+    for params in [(1,), (2,)]:
+        run(cache.get_or_load("group", params, loader))
+    run(cache.get_or_load("other", (1,), loader))
+    cache.invalidate("group")
+    run(cache.get_or_load("group", (1,), loader))
+    run(cache.get_or_load("group", (2,), loader))
+    run(cache.get_or_load("other", (1,), loader))
+    assert loader.calls == 5
+
+
+def test_load_in_flight_during_invalidation_is_not_served_afterwards(run):
+    cache = server.QueryCache(100, 60)
+
+    async def scenario():
+        stale = Loader()
+        pending = asyncio.ensure_future(cache.get_or_load("group", (), stale))
+        await asyncio.sleep(0)
+        cache.invalidate("group")
+        stale.release.set()
+        assert await pending == "value-1"
+        fresh = Loader()
+        fresh.release.set()
+        return await cache.get_or_load("group", (), fresh), fresh.calls
+
+    assert run(scenario()) == ("value-1", 1)
+
+
+def test_failed_load_is_not_cached(run):
+    cache = server.QueryCache(100, 60)
+
+    async def broken():
+        raise RuntimeError("database down")
+
+    with pytest.raises(RuntimeError):
+        run(cache.get_or_load("group", (), broken))
+    loader = Loader()
+    loader.release.set()
+    assert run(cache.get_or_load("group", (), loader)) == "value-1"
+
+
+def test_invalidate_vendor_reads_covers_unfiltered_and_per_service_lists(run):
+    loader = Loader()
+    loader.release.set()
+    cache = server.query_cache
+    for service in [None, "Plumber", "Cook"]:
+        run(cache.get_or_load(("vendors", service), (), loader))
+    server.invalidate_vendor_reads(["Plumber"])
+    for service in [None, "Plumber", "Cook"]:
+        run(cache.get_or_load(("vendors", service), (), loader))
+    assert loader.calls == 5
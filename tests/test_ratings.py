@@ -0,0 +1,35 @@
+import pytest
+from fastapi import HTTPException
+
+import server
+
+
+@pytest.fixture
+def vendors(run, db):
+    run(server.ensure_indexes())
+    run(db.service_providers.insert_many([
+        {"id": f"p-{user_id}", "user_id": user_id, "services": ["Plumber"], "approval_status": "approved",
+         "rating": 0.0, "rating_sum": 0.0, "total_reviews": 0}
+        for user_id in ("v1", "v2")
+    ]))
+
+
+def review(run, booking_id, rating=5, vendor_id=None):
+    data = server.ReviewCreate(booking_id=booking_id, vendor_id=vendor_id, rating=rating, comment="ok")
+    return run(server.create_review(data, current_user={"id": "customer-1"}))
+
+
+def test_review_is_applied_to_the_bookings_vendor(run, db, vendors, insert_booking):
+    booking = insert_booking(status="completed", vendor_id="v1")
+    created = review(run, booking["id"], rating=4, vendor_id="v2")
+    assert created.vendor_id == "v1"
+    ratings = {vendor["user_id"]: vendor["total_reviews"] for vendor in run(db.service_providers.find().to_list(None))}
+    assert ratings == {"v1": 1, "v2": 0}
+
+
+def test_booking_without_vendor_cannot_be_reviewed(run, db, vendors, insert_booking):
+    booking = insert_booking(status="completed")
+    with pytest.raises(HTTPException) as raised:
+        review(run, booking["id"])
+    assert raised.value.status_code == 400
+    assert run(db.reviews.count_documents({})) == 0
@@ -0,0 +1,49 @@
+import orjson
+import pytest
+
+import server
+
+
+@pytest.fixture
+def started(monkeypatch):
+    """Pool warmed and seed done, so only the index check decides readiness."""
+    monkeypatch.setattr(server, "readiness", {"pool_warmed": True, "indexes_built": False, "seed_complete": True})
+    monkeypatch.setattr(server, "unbuilt_indexes", [])
+
+
+def fake_ensure_indexes(monkeypatch, *results):
+    calls = iter(results)
+
+    async def ensure_indexes():
+        return list(next(calls))
+
+    monkeypatch.setattr(server, "ensure_indexes", ensure_indexes)
+
+
+def probe(run):
+    response = run(server.readyz())
+    return response.status_code, orjson.loads(response.body)
+
+
+def test_unbuilt_index_fails_readiness_and_is_listed(run, started, monkeypatch):
+    fake_ensure_indexes(monkeypatch, ["users.email_unique"], ["users.email_unique"])
+    run(server.startup_ensure_indexes())
+    status, body = probe(run)
+    assert status == 503
+    assert body["checks"]["indexes_built"] is False
+    assert body["checks"]["unbuilt_indexes"] == ["users.email_unique"]
+
+
+def test_probe_retries_the_build_until_it_succeeds(run, started, monkeypatch):
+    fake_ensure_indexes(monkeypatch, ["users.email_unique"], [])
+    run(server.startup_ensure_indexes())
+    status, body = probe(run)
+    assert status == 200
+    assert body["checks"]["unbuilt_indexes"] == []
+
+
+def test_ready_when_every_index_builds(run, started, monkeypatch):
+    fake_ensure_indexes(monkeypatch, [])
+    run(server.startup_ensure_indexes())
+    status, body = probe(run)
+    assert (status, body["status"]) == (200, "ready")
@@ -0,0 +1,61 @@
+import server
+
+CATEGORIES = [
+    {"id": "1", "slug": "repair-maintenance", "name": "Repair & Maintenance",
+     "description": "Fix leaks, wiring and broken fittings", "services": ["Plumber", "Electrician", "Carpenter"]},
+    {"id": "2", "slug": "cleaning", "name": "Cleaning", "description": "Homes and offices, top to bottom",
+     "services": ["Deep Cleaning", "Sofa Cleaning"]},
+]
+
+
+def index(categories=CATEGORIES):
+    search_index = server.ServiceSearchIndex()
+    search_index.sync(categories)
+    return search_index
+
+
+def services(results):
+    return [result["service"] for result in results if result["type"] == "service"]
+
+
+def test_prefix_matches_service():
+    assert services(index().search("plum")) == ["Plumber"]
+
+
+def test_typo_matches_service():
+    assert services(index().search("electrcian")) == ["Electrician"]
+    assert services(index().search("carpentr")) == ["Carpenter"]
+
+
+def test_short_terms_need_an_exact_or_prefix_match():
+    assert index().search("xyz") == []
+
+
+def test_service_outranks_description_match():
+    results = index().search("cleaning")
+    assert results[0]["type"] == "service"
+    assert {"Deep Cleaning", "Sofa Cleaning"} <= set(services(results))
+
+
+def test_category_filter():
+    results = index().search("cleaning", category="repair-maintenance")
+    assert results == []
+
+
+def test_sync_removes_dropped_services_and_categories():
+    search_index = index()
+    edited = [dict(CATEGORIES[0], services=["Electrician"])]
+    search_index.sync(edited)
+    assert search_index.search("plumber") == []
+    assert search_index.search("cleaning") == []
+    assert "plumber" not in search_index.postings
+    assert "plumber" not in search_index.vocabulary
+    assert not any("plumber" in tokens for tokens in search_index.deletes.values())
+    assert services(search_index.search("electrician")) == ["Electrician"]
+
+
+def test_sync_is_idempotent():
+    search_index = index()
+    docs = dict(search_index.docs)
+    search_index.sync(CATEGORIES)
+    assert search_index.docs == docs
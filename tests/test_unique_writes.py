@@ -0,0 +1,51 @@
+import asyncio
+
+from fastapi import HTTPException
+
+import server
+
+
+def registration():
+    return server.UserRegister(email="dup@example.com", full_name="Dup", phone="9000000000", password="secret123")
+
+
+def test_concurrent_registrations_with_one_email_get_400(run, db):
+    run(server.ensure_indexes())
+
+    async def register_three():
+        return await asyncio.gather(*(server.register(registration()) for _ in range(3)), return_exceptions=True)
+
+    results = run(register_three())
+    errors = [result for result in results if isinstance(result, Exception)]
+    assert len(errors) == 2
+    assert all(isinstance(error, HTTPException) and error.status_code == 400 for error in errors)
+    assert run(db.users.count_documents({"email": "dup@example.com"})) == 1
+    assert run(db.stats.find_one({"_id": server.STATS_ID}))["total_users"] == 1
+
+
+def test_ensure_indexes_skips_unique_index_over_duplicates(run, db):
+    run(db.users.insert_many([{"id": "a", "email": "same@example.com"}, {"id": "b", "email": "same@example.com"}]))
+    failed = run(server.ensure_indexes())
+    email_index = [name for name in failed if name.startswith("users.")]
+    assert len(email_index) == 1
+    assert failed == email_index
+    built = run(db.users.index_information())
+    assert email_index[0].split(".", 1)[1] not in built
+    assert len(built) > 1
+
+
+def test_concurrent_reviews_of_one_booking_count_once(run, db):
+    run(server.ensure_indexes())
+    run(db.bookings.insert_one({"id": "b1", "customer_id": "c1", "vendor_id": "v1", "status": "completed"}))
+    run(db.service_providers.insert_one({"id": "p1", "user_id": "v1", "services": [], "rating_sum": 0.0, "total_reviews": 0}))
+    review = server.ReviewCreate(booking_id="b1", vendor_id="v1", rating=5, comment="Great")
+
+    async def review_twice():
+        return await asyncio.gather(
+            *(server.create_review(review, current_user={"id": "c1"}) for _ in range(2)), return_exceptions=True
+        )
+
+    results = run(review_twice())
+    errors = [result for result in results if isinstance(result, HTTPException)]
+    assert [error.status_code for error in errors] == [400]
+    assert run(db.service_providers.find_one({"user_id": "v1"}))["total_reviews"] == 1